@@ -4,7 +4,8 @@
 """
 
 import fitz
-from typing import Optional, List, Tuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, List, Tuple
 from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtGui import QColor
 
@@ -22,18 +23,27 @@ class AnnotationType:
 
 
 class AnnotationManager(QObject):
-    """註解管理器"""
+    """
+    註解管理器
+
+    在 transaction() 區塊中新增或刪除的註解不會立即寫入頁面，
+    區塊結束時依頁面分組一次套用，並只發出一次 annotations_changed，
+    大量新增（例如匯入檢查工具的標記）時只需重新渲染一次
+    """
     
     # 信號定義
     annotation_added = pyqtSignal(int, object)  # 新增註解
     annotation_removed = pyqtSignal(int, object)  # 刪除註解
     annotation_modified = pyqtSignal(int, object)  # 修改註解
+    annotations_changed = pyqtSignal(object)  # 註解變更完成 (變更的頁碼列表)
     
     def __init__(self, pdf_handler):
         super().__init__()
         self.pdf_handler = pdf_handler
         self.current_tool = None
         self.current_color = QColor(255, 255, 0, 100)  # 預設黃色半透明
+        self._transaction_depth = 0
+        self._pending: Dict[int, List[Tuple[Callable, str]]] = {}  # {頁碼: [(操作, 錯誤訊息)]}
     
     def set_tool(self, tool_type: str):
         """設定當前工具"""
@@ -43,78 +53,169 @@ class AnnotationManager(QObject):
         """設定當前顏色"""
         self.current_color = color
     
-    def add_highlight(self, page_num: int, rect: fitz.Rect, color: Optional[Tuple] = None) -> bool:
+    @contextmanager
+    def transaction(self):
         """
-        新增高亮註解
+        批次變更註解
+
+        區塊中的新增與刪除先依頁面暫存，結束時每頁只載入一次並依序套用，
+        不發出個別的 annotation_added / annotation_removed，
+        最後以 annotations_changed 通知一次。區塊中發生例外時捨棄所有暫存的變更；
+        巢狀使用時在最外層結束時才套用
+
+        用法:
+            with manager.transaction():
+                for page_num, rect in marks:
+                    manager.add_highlight(page_num, rect)
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._pending = {}
+            raise
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self._commit()
+    
+    def in_transaction(self) -> bool:
+        """是否在批次變更中"""
+        return self._transaction_depth > 0
+    
+    def _commit(self) -> int:
+        """
+        套用暫存的變更
+
+        Returns:
+            失敗的操作數
+        """
+        pending, self._pending = self._pending, {}
+        changed = []
+        failed = 0
+        for page_num in sorted(pending):
+            page = self.pdf_handler.get_page(page_num)
+            if not page:
+                failed += len(pending[page_num])
+                continue
+            applied = 0
+            for operation, error_message in pending[page_num]:
+                try:
+                    operation(page)
+                    applied += 1
+                except Exception as e:
+                    print(f"{error_message}: {e}")
+                    failed += 1
+            if applied:
+                changed.append(page_num)
         
+        if failed:
+            print(f"批次註解有 {failed} 項失敗")
+        if changed:
+            self.annotations_changed.emit(changed)
+        return failed
+    
+    def _is_valid_page(self, page_num: int) -> bool:
+        """頁碼是否有效（不載入頁面）"""
+        return self.pdf_handler.document is not None and 0 <= page_num < self.pdf_handler.page_count
+    
+    def _add(self, page_num: int, create: Callable, error_message: str) -> bool:
+        """
+        新增註解（批次變更中只暫存）
+
         Args:
             page_num: 頁碼
-            rect: 矩形區域
-            color: RGB 顏色元組 (r, g, b)，範圍 0-1
-            
-        Returns:
-            成功返回 True
+            create: 在頁面上建立註解的函式，接收頁面並返回註解
+            error_message: 失敗時的訊息
         """
+        if self._transaction_depth:
+            if not self._is_valid_page(page_num):
+                return False
+            self._pending.setdefault(page_num, []).append((create, error_message))
+            return True
+        
         try:
             page = self.pdf_handler.get_page(page_num)
             if not page:
                 return False
             
-            if color is None:
-                color = (1, 1, 0)  # 預設黃色
-            
-            annot = page.add_highlight_annot(rect)
-            annot.set_colors(stroke=color)
-            annot.update()
+            annot = create(page)
             
             self.annotation_added.emit(page_num, annot)
+            self.annotations_changed.emit([page_num])
             return True
             
         except Exception as e:
-            print(f"新增高亮失敗: {e}")
+            print(f"{error_message}: {e}")
             return False
     
-    def add_underline(self, page_num: int, rect: fitz.Rect, color: Optional[Tuple] = None) -> bool:
-        """新增底線註解"""
-        try:
-            page = self.pdf_handler.get_page(page_num)
-            if not page:
-                return False
+    def add_highlight(self, page_num: int, rect: fitz.Rect, color: Optional[Tuple] = None) -> bool:
+        """
+        新增高亮註解
+        
+        Args:
+            page_num: 頁碼
+            rect: 矩形區域
+            color: RGB 顏色元組 (r, g, b)，範圍 0-1
             
-            if color is None:
-                color = (0, 0, 1)  # 預設藍色
+        Returns:
+            成功返回 True（批次變更中為成功加入批次）
+        """
+        if color is None:
+            color = (1, 1, 0)  # 預設黃色
+        
+        def create(page):
+            annot = page.add_highlight_annot(rect)
+            annot.set_colors(stroke=color)
+            annot.update()
+            return annot
+        
+        return self._add(page_num, create, "新增高亮失敗")
+    
+    def add_highlights(self, marks: Iterable[Tuple[int, fitz.Rect]],
+                       color: Optional[Tuple] = None) -> int:
+        """
+        批次新增高亮註解（例如匯入檢查工具的標記），只重新渲染一次
+        
+        Args:
+            marks: (頁碼, 矩形區域) 列表
+            color: RGB 顏色元組 (r, g, b)，範圍 0-1
             
+        Returns:
+            加入批次的註解數（無效頁碼不計）
+        """
+        added = 0
+        with self.transaction():
+            for page_num, rect in marks:
+                added += self.add_highlight(page_num, rect, color)
+        return added
+    
+    def add_underline(self, page_num: int, rect: fitz.Rect, color: Optional[Tuple] = None) -> bool:
+        """新增底線註解"""
+        if color is None:
+            color = (0, 0, 1)  # 預設藍色
+        
+        def create(page):
             annot = page.add_underline_annot(rect)
             annot.set_colors(stroke=color)
             annot.update()
-            
-            self.annotation_added.emit(page_num, annot)
-            return True
-            
-        except Exception as e:
-            print(f"新增底線失敗: {e}")
-            return False
+            return annot
+        
+        return self._add(page_num, create, "新增底線失敗")
     
     def add_strikeout(self, page_num: int, rect: fitz.Rect, color: Optional[Tuple] = None) -> bool:
         """新增刪除線註解"""
-        try:
-            page = self.pdf_handler.get_page(page_num)
-            if not page:
-                return False
-            
-            if color is None:
-                color = (1, 0, 0)  # 預設紅色
-            
+        if color is None:
+            color = (1, 0, 0)  # 預設紅色
+        
+        def create(page):
             annot = page.add_strikeout_annot(rect)
             annot.set_colors(stroke=color)
             annot.update()
-            
-            self.annotation_added.emit(page_num, annot)
-            return True
-            
-        except Exception as e:
-            print(f"新增刪除線失敗: {e}")
-            return False
+            return annot
+        
+        return self._add(page_num, create, "新增刪除線失敗")
     
     def add_text_annotation(self, page_num: int, point: fitz.Point, text: str) -> bool:
         """
@@ -128,20 +229,12 @@ class AnnotationManager(QObject):
         Returns:
             成功返回 True
         """
-        try:
-            page = self.pdf_handler.get_page(page_num)
-            if not page:
-                return False
-            
+        def create(page):
             annot = page.add_text_annot(point, text)
             annot.update()
-            
-            self.annotation_added.emit(page_num, annot)
-            return True
-            
-        except Exception as e:
-            print(f"新增文字註解失敗: {e}")
-            return False
+            return annot
+        
+        return self._add(page_num, create, "新增文字註解失敗")
     
     def add_freehand(self, page_num: int, points: List[fitz.Point], color: Optional[Tuple] = None, width: float = 1.0) -> bool:
         """
@@ -156,70 +249,46 @@ class AnnotationManager(QObject):
         Returns:
             成功返回 True
         """
-        try:
-            page = self.pdf_handler.get_page(page_num)
-            if not page:
-                return False
-            
-            if color is None:
-                color = (0, 0, 0)  # 預設黑色
-            
+        if color is None:
+            color = (0, 0, 0)  # 預設黑色
+        
+        def create(page):
             annot = page.add_ink_annot([points])
             annot.set_colors(stroke=color)
             annot.set_border(width=width)
             annot.update()
-            
-            self.annotation_added.emit(page_num, annot)
-            return True
-            
-        except Exception as e:
-            print(f"新增手繪註解失敗: {e}")
-            return False
+            return annot
+        
+        return self._add(page_num, create, "新增手繪註解失敗")
     
     def add_rectangle(self, page_num: int, rect: fitz.Rect, color: Optional[Tuple] = None, fill_color: Optional[Tuple] = None) -> bool:
         """新增矩形註解"""
-        try:
-            page = self.pdf_handler.get_page(page_num)
-            if not page:
-                return False
-            
-            if color is None:
-                color = (1, 0, 0)  # 預設紅色邊框
-            
+        if color is None:
+            color = (1, 0, 0)  # 預設紅色邊框
+        
+        def create(page):
             annot = page.add_rect_annot(rect)
             annot.set_colors(stroke=color, fill=fill_color)
             annot.update()
-            
-            self.annotation_added.emit(page_num, annot)
-            return True
-            
-        except Exception as e:
-            print(f"新增矩形失敗: {e}")
-            return False
+            return annot
+        
+        return self._add(page_num, create, "新增矩形失敗")
     
     def add_circle(self, page_num: int, rect: fitz.Rect, color: Optional[Tuple] = None, fill_color: Optional[Tuple] = None) -> bool:
         """新增圓形註解"""
-        try:
-            page = self.pdf_handler.get_page(page_num)
-            if not page:
-                return False
-            
-            if color is None:
-                color = (0, 1, 0)  # 預設綠色邊框
-            
+        if color is None:
+            color = (0, 1, 0)  # 預設綠色邊框
+        
+        def create(page):
             annot = page.add_circle_annot(rect)
             annot.set_colors(stroke=color, fill=fill_color)
             annot.update()
-            
-            self.annotation_added.emit(page_num, annot)
-            return True
-            
-        except Exception as e:
-            print(f"新增圓形失敗: {e}")
-            return False
+            return annot
+        
+        return self._add(page_num, create, "新增圓形失敗")
     
     def get_annotations(self, page_num: int) -> List:
-        """獲取頁面所有註解"""
+        """獲取頁面所有註解（不含批次變更中尚未套用的註解）"""
         page = self.pdf_handler.get_page(page_num)
         if not page:
             return []
@@ -231,6 +300,14 @@ class AnnotationManager(QObject):
     
     def delete_annotation(self, page_num: int, annot) -> bool:
         """刪除註解"""
+        if self._transaction_depth:
+            if not self._is_valid_page(page_num):
+                return False
+            self._pending.setdefault(page_num, []).append(
+                (lambda page: page.delete_annot(annot), "刪除註解失敗")
+            )
+            return True
+        
         try:
             page = self.pdf_handler.get_page(page_num)
             if not page:
@@ -238,6 +315,7 @@ class AnnotationManager(QObject):
             
             page.delete_annot(annot)
             self.annotation_removed.emit(page_num, annot)
+            self.annotations_changed.emit([page_num])
             return True
             
         except Exception as e:
@@ -245,9 +323,20 @@ class AnnotationManager(QObject):
             return False
     
     def clear_all_annotations(self, page_num: int) -> bool:
-        """清除頁面所有註解"""
-        annotations = self.get_annotations(page_num)
-        for annot in annotations:
-            self.delete_annotation(page_num, annot)
-        return True
+        """
+        清除頁面所有註解
 
+        以單一批次刪除，套用時才讀取頁面上的註解，
+        因此同一批次中先前新增的註解也會一併清除
+        """
+        if not self._is_valid_page(page_num):
+            return False
+        
+        def clear(page):
+            # 先取出全部註解再刪除，避免邊走訪邊修改
+            for annot in list(page.annots()):
+                page.delete_annot(annot)
+        
+        with self.transaction():
+            self._pending.setdefault(page_num, []).append((clear, "清除註解失敗"))
+        return True
@@ -0,0 +1,148 @@
+"""
+語言偵測模組
+以文字系統統計與常用字判斷來源語言，不需連線；
+「自動偵測」在送出翻譯前先在本機決定語言，快取與離線模型都以偵測到的語言為準
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+
+# 各語言的常用虛詞（出現次數作為分數）
+STOPWORDS = {
+    "en": {"the", "and", "of", "to", "is", "in", "that", "it", "for", "with", "was", "on",
+           "are", "this", "be", "by", "as", "not", "or", "from", "have", "which", "you"},
+    "fr": {"le", "les", "des", "et", "est", "une", "du", "dans", "qui", "pour", "pas",
+           "sur", "au", "ce", "avec", "sont", "ne", "nous", "vous", "aux", "cette"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "ein", "eine", "zu", "den", "mit",
+           "von", "sich", "des", "auf", "für", "im", "dem", "auch", "werden", "wird"},
+    "es": {"el", "los", "las", "que", "y", "en", "una", "es", "por", "con", "para", "no",
+           "se", "del", "al", "como", "su", "lo", "más", "pero", "está"},
+    "it": {"il", "di", "che", "è", "la", "per", "non", "sono", "della", "con", "gli",
+           "nel", "anche", "questo", "alla", "delle", "degli", "dei", "una", "si"},
+    "pt": {"o", "os", "que", "do", "da", "em", "um", "uma", "para", "com", "não", "é",
+           "dos", "das", "no", "na", "ao", "pelo", "pela", "são", "também"},
+}
+
+# 只出現在特定語言的字母
+LETTER_HINTS = {
+    "ñ": "es", "¿": "es", "¡": "es",
+    "ß": "de", "ä": "de", "ö": "de", "ü": "de",
+    "ã": "pt", "õ": "pt",
+    "ç": "fr", "œ": "fr", "ê": "fr", "è": "fr", "î": "fr",
+    "ò": "it", "ì": "it",
+}
+
+# 常用字的繁簡對照（用於區分繁體中文與簡體中文）
+_ZH_PAIRS = (
+    "這这個个們们說说會会來来時时對对國国為为與与學学過过還还發发經经從从"
+    "關关動动種种體体開开問问題题點点實实電电現现長长將将應应該该機机進进"
+    "東东車车書书見见門门頭头買买賣卖讓让認认識识語语當当樣样處处區区務务"
+    "產产業业資资訊讯網网頁页檔档標标"
+)
+TRADITIONAL_CHARS = set(_ZH_PAIRS[0::2])
+SIMPLIFIED_CHARS = set(_ZH_PAIRS[1::2])
+
+_LATIN_WORD = re.compile(r"[a-zà-öø-ÿœß]+")
+
+SAMPLE_CHARS = 4000  # 偵測文件語言時取樣的字元數
+
+
+def _script(char: str) -> Optional[str]:
+    """字元所屬的文字系統"""
+    code = ord(char)
+    if code < 0x80:
+        return "latin" if char.isalpha() else None
+    if 0x3040 <= code <= 0x30FF:
+        return "kana"
+    if 0xAC00 <= code <= 0xD7AF or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+        return "hangul"
+    if 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF:
+        return "han"
+    if 0x0400 <= code <= 0x04FF:
+        return "cyrillic"
+    if 0x0600 <= code <= 0x06FF:
+        return "arabic"
+    if char.isalpha() and code <= 0x024F:
+        return "latin"
+    return None
+
+
+def _detect_chinese(text: str) -> str:
+    """以繁簡特有字的數量區分（無法判斷時視為繁體）"""
+    traditional = sum(1 for char in text if char in TRADITIONAL_CHARS)
+    simplified = sum(1 for char in text if char in SIMPLIFIED_CHARS)
+    return "zh-CN" if simplified > traditional else "zh-TW"
+
+
+def _detect_latin(text: str, min_score: int) -> Optional[str]:
+    """以常用虛詞與特有字母判斷拉丁字母語言"""
+    lowered = text.lower()
+    scores: Dict[str, int] = {code: 0 for code in STOPWORDS}
+    for word in _LATIN_WORD.findall(lowered):
+        for code, words in STOPWORDS.items():
+            if word in words:
+                scores[code] += 1
+    for char, code in LETTER_HINTS.items():
+        scores[code] += lowered.count(char)
+
+    best = max(scores, key=scores.get)
+    ranked = sorted(scores.values(), reverse=True)
+    if ranked[0] < min_score or ranked[0] == ranked[1]:
+        return None
+    return best
+
+
+def detect_language(text: str, min_letters: int = 3, min_score: int = 2) -> Optional[str]:
+    """
+    偵測文字的語言
+
+    Args:
+        text: 要偵測的文字
+        min_letters: 最少的字母數，不足則無法判斷
+        min_score: 拉丁字母語言最少需要的常用字分數
+
+    Returns:
+        語言代碼（與 TranslationManager.LANGUAGES 相同），無法判斷則返回 None
+    """
+    counts: Dict[str, int] = {}
+    for char in text:
+        script = _script(char)
+        if script:
+            counts[script] = counts.get(script, 0) + 1
+    if sum(counts.values()) < min_letters:
+        return None
+
+    kana = counts.get("kana", 0)
+    cjk = kana + counts.get("han", 0)
+    dominant = max(counts, key=counts.get)
+    if cjk >= counts.get(dominant, 0) and cjk > counts.get("hangul", 0):
+        # 日文漢字之間一定夾雜假名；純漢字視為中文
+        if kana and kana >= cjk * 0.05:
+            return "ja"
+        return _detect_chinese(text)
+    if dominant == "hangul":
+        return "ko"
+    if dominant == "cyrillic":
+        return "ru"
+    if dominant == "arabic":
+        return "ar"
+    return _detect_latin(text, min_score)
+
+
+def detect_document_language(texts: Iterable[str], sample_chars: int = SAMPLE_CHARS) -> Optional[str]:
+    """
+    偵測整份文件的語言（只取前面一部分文字）
+
+    Args:
+        texts: 各頁或各區塊的文字
+        sample_chars: 取樣的字元數
+    """
+    parts = []
+    length = 0
+    for text in texts:
+        if length >= sample_chars:
+            break
+        parts.append(text[:sample_chars - length])
+        length += len(parts[-1])
+    return detect_language("\n".join(parts))
@@ -0,0 +1,472 @@
+"""
+文件庫搜尋模組
+以多個行程平行索引資料夾中的 PDF，並跨文件搜尋
+
+用法（無介面）:
+    python -m src.library index <資料夾>
+    python -m src.library search <查詢文字>
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, List, Dict, Tuple, Callable, Iterable
+
+from .search_index import normalize_for_search, tokenize, query_tokens, split_runs
+
+
+DEFAULT_LIBRARY_DB = Path.home() / ".pdfreader_library.db"
+
+
+def file_fingerprint(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """計算檔案內容指紋（BLAKE2b）"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract_document(file_path: str, known_fingerprint: Optional[str] = None) -> dict:
+    """
+    擷取單一文件的頁面文字（在子行程中執行）
+
+    Args:
+        file_path: PDF 檔案路徑
+        known_fingerprint: 索引中已記錄的指紋，內容未變時不重新擷取
+
+    Returns:
+        結果字典 {path, mtime, size, fingerprint, pages, unchanged, error}
+    """
+    result = {"path": file_path, "pages": [], "unchanged": False, "error": None}
+    try:
+        stat = os.stat(file_path)
+        result["mtime"] = stat.st_mtime
+        result["size"] = stat.st_size
+        result["fingerprint"] = file_fingerprint(file_path)
+
+        # 只有修改時間變動、內容相同時不需重新擷取
+        if known_fingerprint and result["fingerprint"] == known_fingerprint:
+            result["unchanged"] = True
+            return result
+
+        # 延後匯入，只有子行程需要載入 PyMuPDF 與 Qt
+        from .pdf_handler import PDFHandler
+
+        handler = PDFHandler()
+        if not handler.open_document(file_path):
+            result["error"] = "無法開啟 PDF 檔案"
+            return result
+        try:
+            for page_num in range(handler.page_count):
+                layer = handler.get_text_layer(page_num)
+                result["pages"].append(layer.text if layer else "")
+        finally:
+            handler.close_document()
+
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def _phrase(text: str) -> str:
+    """FTS5 查詢字串（整段作為一個片語）"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class LibraryHit:
+    """文件庫搜尋結果（單一文件）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pages: List[Tuple[int, int, str]] = []  # (頁碼, 命中次數, 摘要)
+        self.score = 0.0
+
+    def hit_count(self) -> int:
+        """命中總次數"""
+        return sum(count for _, count, _ in self.pages)
+
+
+class LibraryIndex:
+    """
+    文件庫索引
+
+    以 SQLite 保存每份文件的頁面文字與倒排索引，
+    依修改時間、檔案大小與內容指紋增量更新
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL,
+            page_count INTEGER NOT NULL,
+            indexed_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS pages (
+            doc_id INTEGER NOT NULL,
+            page_num INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (doc_id, page_num)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS terms (
+            token TEXT PRIMARY KEY
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS postings (
+            token TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            page_num INTEGER NOT NULL,
+            PRIMARY KEY (token, doc_id, page_num)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS terms_trigram USING fts5(token, tokenize='trigram');
+    """
+    SCHEMA_VERSION = 2  # 2: 中日韓片段結尾的字元另以單字索引，並加入詞彙的三元組索引
+
+    def __init__(self, db_path: Optional[str] = None, ngram: int = 2):
+        self.db_path = str(db_path or DEFAULT_LIBRARY_DB)
+        self.ngram = ngram
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """升級舊版索引：建立詞彙的三元組索引，並讓下次更新重新擷取所有文件"""
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+        with self.connection:
+            self.connection.execute("DELETE FROM terms_trigram")
+            self.connection.execute(
+                "INSERT INTO terms_trigram (token) SELECT token FROM terms WHERE length(token) >= 3"
+            )
+            self.connection.execute("UPDATE documents SET mtime = -1, fingerprint = ''")
+            self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def close(self):
+        """關閉資料庫"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def document_count(self) -> int:
+        """已索引的文件數"""
+        return self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    @staticmethod
+    def scan_folder(folder: str) -> List[str]:
+        """遞迴列出資料夾中的 PDF 檔案"""
+        paths = []
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if name.lower().endswith(".pdf"):
+                    paths.append(os.path.abspath(os.path.join(root, name)))
+        return sorted(paths)
+
+    def update(self, folder: str, max_workers: Optional[int] = None,
+               progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, int]:
+        """
+        增量更新資料夾的索引
+
+        Args:
+            folder: 資料夾路徑
+            max_workers: 子行程數量，None 表示使用 CPU 核心數
+            progress: 進度回調 (已完成, 總數, 檔案路徑)
+
+        Returns:
+            統計 {"added", "updated", "unchanged", "removed", "failed"}
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        folder = os.path.abspath(folder)
+        paths = self.scan_folder(folder)
+        path_set = set(paths)
+
+        # 以字串前綴比較（資料夾名稱可能含有 LIKE 的萬用字元 % 與 _）
+        prefix = os.path.join(folder, "")
+        known = {
+            row[0]: (row[1], row[2], row[3])
+            for row in self.connection.execute(
+                "SELECT path, mtime, size, fingerprint FROM documents "
+                "WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+            )
+        }
+
+        # 移除已刪除的檔案
+        for path in known:
+            if path not in path_set:
+                self._remove_document(path)
+                stats["removed"] += 1
+        self.connection.commit()
+
+        # 修改時間與大小都未變的檔案直接略過
+        pending = []
+        for path in paths:
+            entry = known.get(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if entry and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+                stats["unchanged"] += 1
+            else:
+                pending.append((path, entry[2] if entry else None))
+
+        total = len(pending)
+        if not total:
+            return stats
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(extract_document, path, fingerprint)
+                for path, fingerprint in pending
+            ]
+            # 子行程只負責擷取文字，寫入由主行程單一連線完成
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                if result["error"]:
+                    stats["failed"] += 1
+                elif result["unchanged"]:
+                    self._touch_document(result)
+                    stats["unchanged"] += 1
+                else:
+                    is_new = result["path"] not in known
+                    self._store_document(result)
+                    stats["added" if is_new else "updated"] += 1
+                self.connection.commit()
+
+                if progress:
+                    progress(done, total, result["path"])
+
+        return stats
+
+    def _remove_document(self, path: str):
+        """刪除文件的索引資料"""
+        row = self.connection.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+        if not row:
+            return
+        doc_id = row[0]
+        tokens = [token for (token,) in self.connection.execute(
+            "SELECT DISTINCT token FROM postings WHERE doc_id = ?", (doc_id,)
+        )]
+        self.connection.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+        self.connection.execute("DELETE FROM pages WHERE doc_id = ?", (doc_id,))
+        self.connection.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+        # 刪除沒有其他文件使用的詞彙
+        orphans = [
+            token for token in tokens
+            if not self.connection.execute(
+                "SELECT 1 FROM postings WHERE token = ? LIMIT 1", (token,)
+            ).fetchone()
+        ]
+        self.connection.executemany("DELETE FROM terms WHERE token = ?", ((t,) for t in orphans))
+        self.connection.executemany(
+            "DELETE FROM terms_trigram WHERE terms_trigram MATCH ? AND token = ?",
+            ((_phrase(t), t) for t in orphans if len(t) >= 3)
+        )
+
+    def _touch_document(self, result: dict):
+        """內容未變時只更新修改時間與大小"""
+        self.connection.execute(
+            "UPDATE documents SET mtime = ?, size = ? WHERE path = ?",
+            (result["mtime"], result["size"], result["path"])
+        )
+
+    def _store_document(self, result: dict):
+        """寫入文件的頁面文字與倒排索引"""
+        self._remove_document(result["path"])
+        cursor = self.connection.execute(
+            "INSERT INTO documents (path, mtime, size, fingerprint, page_count, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (result["path"], result["mtime"], result["size"], result["fingerprint"],
+             len(result["pages"]), time.time())
+        )
+        doc_id = cursor.lastrowid
+
+        page_rows = []
+        posting_rows = []
+        tokens = set()
+        for page_num, text in enumerate(result["pages"]):
+            page_rows.append((doc_id, page_num, text))
+            page_tokens = self._index_tokens(normalize_for_search(text))
+            tokens.update(page_tokens)
+            posting_rows.extend((token, doc_id, page_num) for token in page_tokens)
+
+        new_tokens = [
+            token for token in tokens
+            if not self.connection.execute("SELECT 1 FROM terms WHERE token = ?", (token,)).fetchone()
+        ]
+        self.connection.executemany("INSERT INTO pages VALUES (?, ?, ?)", page_rows)
+        self.connection.executemany("INSERT INTO terms VALUES (?)", ((t,) for t in new_tokens))
+        self.connection.executemany(
+            "INSERT INTO terms_trigram (token) VALUES (?)", ((t,) for t in new_tokens if len(t) >= 3)
+        )
+        self.connection.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?)", posting_rows)
+
+    def _index_tokens(self, text: str) -> set:
+        """
+        頁面的索引詞彙
+
+        除了 tokenize 的詞彙外，中日韓片段結尾不足 n 個的字元另以單字索引，
+        讓每個字元都是某個詞彙的開頭，單一漢字可以用前綴範圍查詢
+        """
+        tokens = set(tokenize(text, self.ngram))
+        for run_type, run, _, _ in split_runs(text):
+            if run_type == "cjk" and len(run) >= self.ngram:
+                tokens.update(run[len(run) - self.ngram + 1:])
+        return tokens
+
+    def _pages_for_tokens(self, tokens: Iterable[str]) -> Optional[set]:
+        """以詞彙取交集得到候選頁面 {(doc_id, page_num)}"""
+        candidates = None
+        # 先查最少文件的詞彙，交集能最快縮小
+        counted = []
+        for token in set(tokens):
+            count = self.connection.execute(
+                "SELECT COUNT(*) FROM postings WHERE token = ?", (token,)
+            ).fetchone()[0]
+            if not count:
+                return set()
+            counted.append((count, token))
+
+        for _, token in sorted(counted):
+            pages = set(self.connection.execute(
+                "SELECT doc_id, page_num FROM postings WHERE token = ?", (token,)
+            ))
+            candidates = pages if candidates is None else candidates & pages
+            if not candidates:
+                break
+        return candidates
+
+    def _pages_for_partial_word(self, word: str, cjk: bool) -> set:
+        """
+        以包含部分單詞或字元的詞彙取得候選頁面（只查詢詞彙表，不讀取頁面文字）
+
+        三個字元以上以三元組索引比對；較短的中日韓片段以第一個字元的前綴範圍查詢；
+        只有一兩個字母的拉丁單詞無法使用索引，掃描詞彙表
+        """
+        if len(word) >= 3:
+            terms = self.connection.execute(
+                "SELECT token FROM terms_trigram WHERE terms_trigram MATCH ?", (_phrase(word),)
+            ).fetchall()
+        elif cjk:
+            first = word[0]
+            terms = self.connection.execute(
+                "SELECT token FROM terms WHERE token >= ? AND token < ?", (first, chr(ord(first) + 1))
+            ).fetchall()
+        else:
+            terms = self.connection.execute(
+                "SELECT token FROM terms WHERE instr(token, ?) > 0", (word,)
+            ).fetchall()
+
+        pages = set()
+        for (token,) in terms:
+            pages.update(self.connection.execute(
+                "SELECT doc_id, page_num FROM postings WHERE token = ?", (token,)
+            ))
+        return pages
+
+    def search(self, query: str, limit: int = 20) -> List[LibraryHit]:
+        """
+        跨文件搜尋
+
+        Args:
+            query: 查詢文字
+            limit: 最多返回的文件數
+
+        Returns:
+            依分數排序的文件結果列表
+        """
+        normalized = normalize_for_search(query).strip()
+        if not normalized:
+            return []
+
+        candidates = self._pages_for_tokens(query_tokens(normalized, self.ngram))
+        if candidates is None:
+            # 查詢只有邊緣的拉丁單詞或短於 n-gram 的中日韓片段（例如單一漢字），
+            # 改以最長的片段在詞彙表中做部分比對
+            runs = [(run, run_type == "cjk") for run_type, run, _, _ in split_runs(normalized)]
+            if runs:
+                candidates = self._pages_for_partial_word(*max(runs, key=lambda run: len(run[0])))
+            else:
+                # 只有標點符號：不在索引中，只能逐頁比對
+                candidates = set(self.connection.execute("SELECT doc_id, page_num FROM pages"))
+
+        # 以頁面文字驗證並計算命中次數
+        hits: Dict[int, LibraryHit] = {}
+        paths = {}
+        for doc_id, page_num in sorted(candidates):
+            row = self.connection.execute(
+                "SELECT text FROM pages WHERE doc_id = ? AND page_num = ?", (doc_id, page_num)
+            ).fetchone()
+            if not row:
+                continue
+            folded = normalize_for_search(row[0])
+            count = folded.count(normalized)
+            if not count:
+                continue
+
+            if doc_id not in paths:
+                paths[doc_id] = self.connection.execute(
+                    "SELECT path FROM documents WHERE id = ?", (doc_id,)
+                ).fetchone()[0]
+                hits[doc_id] = LibraryHit(paths[doc_id])
+
+            position = folded.find(normalized)
+            snippet = folded[max(0, position - 30):position + len(normalized) + 30]
+            hits[doc_id].pages.append((page_num, count, snippet))
+
+        # 分數：命中次數為主，命中頁數為輔
+        for hit in hits.values():
+            hit.score = hit.hit_count() + 0.5 * len(hit.pages)
+
+        return sorted(hits.values(), key=lambda h: h.score, reverse=True)[:limit]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列入口"""
+    parser = argparse.ArgumentParser(description="PDF 文件庫索引與搜尋")
+    parser.add_argument("--db", default=str(DEFAULT_LIBRARY_DB), help="索引資料庫路徑")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="索引資料夾")
+    index_parser.add_argument("folder", help="PDF 資料夾")
+    index_parser.add_argument("--workers", type=int, default=None, help="子行程數量")
+
+    search_parser = subparsers.add_parser("search", help="搜尋文件庫")
+    search_parser.add_argument("query", help="查詢文字")
+    search_parser.add_argument("--limit", type=int, default=20, help="最多顯示的文件數")
+
+    args = parser.parse_args(argv)
+    library = LibraryIndex(args.db)
+    try:
+        if args.command == "index":
+            def report(done, total, path):
+                print(f"[{done}/{total}] {path}")
+
+            start = time.time()
+            stats = library.update(args.folder, args.workers, report)
+            print(
+                f"完成（{time.time() - start:.1f} 秒）: 新增 {stats['added']}，更新 {stats['updated']}，"
+                f"未變 {stats['unchanged']}，移除 {stats['removed']}，失敗 {stats['failed']}"
+            )
+        else:
+            for hit in library.search(args.query, args.limit):
+                print(f"{hit.path}  （{hit.hit_count()} 次，{len(hit.pages)} 頁）")
+                for page_num, count, snippet in hit.pages[:3]:
+                    print(f"    頁 {page_num + 1} ×{count}: {' '.join(snippet.split())}")
+    finally:
+        library.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,10 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QFileDialog, QMessageBox, QInputDialog, QDockWidget,
                              QPushButton, QDialog, QTextEdit, QDialogButtonBox,
-                             QLabel, QLineEdit, QApplication)
+                             QLabel, QLineEdit, QApplication, QCheckBox)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QAction, QKeySequence
+import os
 import fitz
 
 from .pdf_handler import PDFHandler
@@ -19,7 +20,12 @@ from .annotation import AnnotationManager
 from .bookmark import BookmarkManager
 from .form_editor import FormEditor
 from .signature import SignatureManager
-from .translator import TranslationManager
+from .translator import TranslationManager, OfflinePackWorker
+from .translation_pack import PACK_EXTENSION
+from .translation_overlay import visible_blocks
+from .translation_export import TranslationExportWorker
+from .search import SearchManager
+from .search_index import SearchOptions
 from .utils import Config
 
 
@@ -39,6 +45,14 @@ class SearchDialog(QDialog):
         self.search_edit = QLineEdit()
         layout.addWidget(self.search_edit)
         
+        # 搜尋選項
+        self.regex_check = QCheckBox("規則運算式")
+        self.case_check = QCheckBox("區分大小寫")
+        self.width_check = QCheckBox("區分全形/半形")
+        self.diacritic_check = QCheckBox("區分重音符號")
+        for check in (self.regex_check, self.case_check, self.width_check, self.diacritic_check):
+            layout.addWidget(check)
+        
         buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
         )
@@ -49,6 +63,15 @@ class SearchDialog(QDialog):
     def get_search_text(self) -> str:
         """獲取搜尋文字"""
         return self.search_edit.text()
+    
+    def get_search_options(self) -> SearchOptions:
+        """獲取搜尋選項"""
+        return SearchOptions(
+            regex=self.regex_check.isChecked(),
+            case_sensitive=self.case_check.isChecked(),
+            width_sensitive=self.width_check.isChecked(),
+            diacritic_sensitive=self.diacritic_check.isChecked(),
+        )
 
 
 class TextAnnotationDialog(QDialog):
@@ -95,12 +118,48 @@ class MainWindow(QMainWindow):
         self.bookmark_manager = BookmarkManager()
         self.form_editor = FormEditor(self.pdf_handler)
         self.signature_manager = SignatureManager(self.pdf_handler)
-        self.translation_manager = TranslationManager(use_offline=False)  # 預設線上模式（可自動快取）
+        self.translation_manager = TranslationManager(
+            use_offline=self.config.get_translation_offline(),  # 預設線上模式（可自動快取）
+            cache_max_entries=self.config.get_translation_cache_limit(),
+            cache_policy=self.config.get_translation_cache_policy(),
+            max_concurrency=self.config.get_translation_concurrency(),
+            requests_per_second=self.config.get_translation_rate_limit(),
+        )
+        self.search_manager = SearchManager()
         
         # 當前狀態
         self.current_file = None
         self.current_page = 0
         self.current_zoom = 1.0
+        self.search_hit_count = 0
+        self.export_worker = None  # 翻譯後 PDF 匯出執行緒
+        self.pack_worker = None  # 準備離線翻譯執行緒
+        
+        # 預先翻譯：翻頁後稍候再開始，快速翻頁時不送出請求
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(500)
+        self.prefetch_timer.timeout.connect(self.prefetch_translations)
+        
+        # 翻譯疊加：捲動停止後才翻譯新出現的區塊
+        self.translation_overlay_enabled = False
+        self.overlay_timer = QTimer(self)
+        self.overlay_timer.setSingleShot(True)
+        self.overlay_timer.setInterval(200)
+        self.overlay_timer.timeout.connect(self.update_translation_overlay)
+        
+        # 註解變更：合併短時間內的多次變更，只重新渲染一次
+        self.changed_annotation_pages = set()
+        self.annotation_render_timer = QTimer(self)
+        self.annotation_render_timer.setSingleShot(True)
+        self.annotation_render_timer.setInterval(100)
+        self.annotation_render_timer.timeout.connect(self.refresh_annotated_pages)
+        
+        # 翻譯統計：翻譯面板開啟時定期更新
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(2000)
+        self.metrics_timer.timeout.connect(self.update_translation_metrics)
+        self.metrics_timer.start()
         
         # 建立 UI
         self.setup_ui()
@@ -184,6 +243,16 @@ class MainWindow(QMainWindow):
         search_action.triggered.connect(self.search_text)
         edit_menu.addAction(search_action)
         
+        find_next_action = QAction("找下一個", self)
+        find_next_action.setShortcut(QKeySequence.StandardKey.FindNext)
+        find_next_action.triggered.connect(self.goto_next_search_hit)
+        edit_menu.addAction(find_next_action)
+        
+        find_prev_action = QAction("找上一個", self)
+        find_prev_action.setShortcut(QKeySequence.StandardKey.FindPrevious)
+        find_prev_action.triggered.connect(self.goto_previous_search_hit)
+        edit_menu.addAction(find_prev_action)
+        
         # 檢視選單
         view_menu = menubar.addMenu("檢視")
         
@@ -199,6 +268,12 @@ class MainWindow(QMainWindow):
         
         view_menu.addSeparator()
         
+        overlay_action = QAction("在頁面上顯示譯文", self)
+        overlay_action.setShortcut("Ctrl+Shift+T")
+        overlay_action.setCheckable(True)
+        overlay_action.toggled.connect(self.toggle_translation_overlay)
+        view_menu.addAction(overlay_action)
+        
         fullscreen_action = QAction("全螢幕", self)
         fullscreen_action.setShortcut("F11")
         fullscreen_action.triggered.connect(self.toggle_fullscreen)
@@ -240,6 +315,22 @@ class MainWindow(QMainWindow):
         translate_doc_action.triggered.connect(self.translate_document)
         tools_menu.addAction(translate_doc_action)
         
+        export_translation_action = QAction("匯出翻譯後的 PDF...", self)
+        export_translation_action.triggered.connect(self.export_translated_pdf)
+        tools_menu.addAction(export_translation_action)
+        
+        prepare_offline_action = QAction("準備離線翻譯...", self)
+        prepare_offline_action.triggered.connect(self.prepare_offline_translation)
+        tools_menu.addAction(prepare_offline_action)
+        
+        export_pack_action = QAction("匯出翻譯快取包...", self)
+        export_pack_action.triggered.connect(self.export_translation_pack)
+        tools_menu.addAction(export_pack_action)
+        
+        import_pack_action = QAction("匯入翻譯快取包...", self)
+        import_pack_action.triggered.connect(self.import_translation_pack)
+        tools_menu.addAction(import_pack_action)
+        
         # 說明選單
         help_menu = menubar.addMenu("說明")
         
@@ -274,10 +365,12 @@ class MainWindow(QMainWindow):
         # 側邊欄信號
         self.sidebar.page_selected.connect(self.goto_page)
         self.sidebar.add_bookmark_requested.connect(self.add_bookmark)
+        self.sidebar.get_search_widget().hit_selected.connect(self.goto_search_hit)
         
         # PDF 檢視器信號
         self.pdf_viewer.page_changed.connect(self.on_page_changed)
         self.pdf_viewer.zoom_changed.connect(self.on_zoom_changed)
+        self.pdf_viewer.visible_area_changed.connect(self.schedule_translation_overlay)
         
         # 頁面元件信號
         page_widget = self.pdf_viewer.get_page_widget()
@@ -285,6 +378,9 @@ class MainWindow(QMainWindow):
         page_widget.point_clicked.connect(self.on_point_clicked)
         page_widget.text_selected.connect(self.on_text_selected)
         
+        # 註解管理器信號
+        self.annotation_manager.annotations_changed.connect(self.on_annotations_changed)
+        
         # 書籤管理器信號
         self.bookmark_manager.bookmark_added.connect(self.on_bookmark_added)
         
@@ -293,10 +389,22 @@ class MainWindow(QMainWindow):
         translation_widget.translate_selected_requested.connect(self.on_translate_selected_requested)
         translation_widget.translate_document_requested.connect(self.on_translate_document_requested)
         translation_widget.selection_mode_changed.connect(self.on_selection_mode_changed)
+        translation_widget.from_lang_combo.currentTextChanged.connect(lambda _: self.schedule_translation_overlay())
+        translation_widget.to_lang_combo.currentTextChanged.connect(lambda _: self.schedule_translation_overlay())
         
         # 翻譯管理器信號
         self.translation_manager.translation_ready.connect(self.on_translation_ready)
+        self.translation_manager.page_translated.connect(translation_widget.add_page_translation)
+        self.translation_manager.selection_translated.connect(self.on_selection_translated)
+        self.translation_manager.blocks_translated.connect(self.on_blocks_translated)
         self.translation_manager.error_occurred.connect(self.on_translation_error)
+        
+        # 搜尋管理器信號
+        self.search_manager.results_found.connect(self.on_search_results_found)
+        self.search_manager.progress_updated.connect(self.on_search_progress)
+        self.search_manager.search_finished.connect(self.on_search_finished)
+        self.search_manager.index_ready.connect(self.on_search_index_ready)
+        self.search_manager.error_occurred.connect(self.show_error)
     
     def open_file(self):
         """開啟檔案"""
@@ -309,7 +417,13 @@ class MainWindow(QMainWindow):
     
     def load_pdf(self, file_path: str):
         """載入 PDF"""
+        # 取消針對前一份文件的搜尋並清除結果
+        self.search_manager.clear_results()
+        self.sidebar.get_search_widget().clear_results()
+        
         if self.pdf_handler.open_document(file_path):
+            self.translation_manager.cancel_overlay()
+            self.translation_manager.overlay_cache.clear()
             self.current_file = file_path
             self.config.add_recent_file(file_path)
             self.setWindowTitle(f"PDF 閱讀器 - {file_path}")
@@ -328,6 +442,12 @@ class MainWindow(QMainWindow):
         
         # 載入表單欄位
         self.form_editor.load_form_fields()
+        
+        # 背景建立搜尋索引
+        if self.pdf_handler.file_path:
+            self.search_manager.build_index(
+                self.pdf_handler.file_path, self.pdf_handler.text_layers
+            )
     
     def generate_thumbnails(self):
         """生成縮圖"""
@@ -354,6 +474,19 @@ class MainWindow(QMainWindow):
                 page_widget = self.pdf_viewer.get_page_widget()
                 page_widget.set_page_words(words, page_num)
                 page_widget.pdf_handler = self.pdf_handler
+                
+                # 套用此頁的搜尋結果高亮
+                self.update_search_highlights()
+                
+                # 翻譯面板開啟時預先翻譯後面幾頁
+                self.translation_manager.cancel_prefetch()
+                self.prefetch_timer.start()
+                
+                # 疊加顯示此頁已翻譯的區塊，其餘可見區塊稍候翻譯
+                page_widget.clear_translation_overlay()
+                if self.translation_overlay_enabled:
+                    self.show_translation_overlay()
+                    self.schedule_translation_overlay()
     
     def on_page_changed(self, page_num: int):
         """頁面變更事件"""
@@ -370,6 +503,7 @@ class MainWindow(QMainWindow):
         pixmap = self.pdf_handler.render_page(self.current_page, zoom)
         if pixmap:
             self.pdf_viewer.page_widget.set_pixmap(pixmap)
+        self.schedule_translation_overlay()
     
     def zoom_in(self):
         """放大"""
@@ -416,20 +550,107 @@ class MainWindow(QMainWindow):
     
     def search_text(self):
         """搜尋文字"""
+        if not self.pdf_handler.document or not self.current_file:
+            QMessageBox.information(self, "搜尋", "請先開啟 PDF 文件")
+            return
+        
         dialog = SearchDialog(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             search_text = dialog.get_search_text()
             if search_text:
-                results = self.pdf_handler.search_text(search_text)
-                if results:
-                    # 跳轉到第一個結果
-                    first_page, rects = results[0]
-                    self.goto_page(first_page)
-                    self.statusBar().showMessage(
-                        f"找到 {len(results)} 個結果"
-                    )
-                else:
-                    QMessageBox.information(self, "搜尋", "找不到相符的內容")
+                self.start_search(search_text, dialog.get_search_options())
+    
+    def start_search(self, search_text: str, options: SearchOptions = None):
+        """開始背景搜尋（從目前頁面開始，取消先前的搜尋）"""
+        self.search_hit_count = 0
+        
+        search_widget = self.sidebar.get_search_widget()
+        search_widget.clear_results()
+        search_widget.set_status(f"搜尋中: {search_text}")
+        self.sidebar.tab_widget.setCurrentWidget(search_widget)
+        self.pdf_viewer.get_page_widget().clear_search_highlights()
+        
+        self.statusBar().showMessage(f"搜尋中: {search_text}")
+        self.search_manager.start_search(
+            self.current_file, search_text, self.pdf_handler.text_layers,
+            self.current_page, options
+        )
+    
+    def on_search_results_found(self, page_num: int, index: int, hits: list):
+        """收到單頁搜尋結果"""
+        self.search_hit_count += len(hits)
+        
+        search_widget = self.sidebar.get_search_widget()
+        search_widget.insert_hits(index, hits)
+        
+        if search_widget.current_index < 0:
+            # 第一筆結果立即跳轉，不等待整份文件搜尋完成
+            self.goto_search_hit(index)
+        elif page_num == self.current_page:
+            self.update_search_highlights()
+    
+    def goto_search_hit(self, index: int):
+        """跳轉到指定的搜尋結果（使用已儲存的矩形，不重新搜尋）"""
+        results = self.search_manager.results
+        if not 0 <= index < len(results):
+            return
+        
+        hit = results[index]
+        search_widget = self.sidebar.get_search_widget()
+        search_widget.set_current_index(index)
+        
+        if hit.page_num != self.current_page:
+            # 換頁時 goto_page 會套用該頁的高亮
+            self.goto_page(hit.page_num)
+        else:
+            self.update_search_highlights()
+        
+        self.pdf_viewer.scroll_to_pdf_rect(hit.rect)
+    
+    def goto_next_search_hit(self):
+        """下一個搜尋結果"""
+        self.sidebar.get_search_widget().select_next()
+    
+    def goto_previous_search_hit(self):
+        """上一個搜尋結果"""
+        self.sidebar.get_search_widget().select_previous()
+    
+    def update_search_highlights(self):
+        """更新目前頁面的搜尋結果高亮"""
+        results = self.search_manager.results
+        page_hits = results.hits_on_page(self.current_page)
+        
+        current_rects = []
+        index = self.sidebar.get_search_widget().current_index
+        if 0 <= index < len(results) and results[index].page_num == self.current_page:
+            current_rects = results[index].rects
+        
+        self.pdf_viewer.get_page_widget().set_search_highlights(
+            [rect for hit in page_hits for rect in hit.rects], current_rects
+        )
+    
+    def on_search_progress(self, current: int, total: int):
+        """搜尋進度"""
+        self.statusBar().showMessage(
+            f"搜尋中... ({current}/{total} 頁，找到 {self.search_hit_count} 個結果)"
+        )
+    
+    def on_search_finished(self, hit_count: int):
+        """搜尋完成"""
+        if hit_count:
+            self.statusBar().showMessage(
+                f"找到 {hit_count} 個結果（{self.search_manager.results.page_count()} 頁）"
+            )
+            self.sidebar.get_search_widget().update_count_label()
+        else:
+            self.sidebar.get_search_widget().set_status("找不到相符的內容")
+            self.statusBar().showMessage("搜尋完成")
+            QMessageBox.information(self, "搜尋", "找不到相符的內容")
+    
+    def on_search_index_ready(self, page_count: int):
+        """搜尋索引建立完成"""
+        if not self.search_manager.is_searching():
+            self.statusBar().showMessage(f"搜尋索引已建立（{page_count} 頁）", 3000)
     
     def add_bookmark(self):
         """新增書籤"""
@@ -477,9 +698,6 @@ class MainWindow(QMainWindow):
         elif tool == "circle":
             self.annotation_manager.add_circle(self.current_page, fitz_rect)
             self.statusBar().showMessage("已新增圓形")
-        
-        # 重新渲染頁面以顯示註解
-        QTimer.singleShot(100, lambda: self.goto_page(self.current_page))
     
     def on_point_clicked(self, point):
         """點擊位置"""
@@ -495,8 +713,20 @@ class MainWindow(QMainWindow):
                         self.current_page, fitz_point, text
                     )
                     self.statusBar().showMessage("已新增文字註解")
-                    # 重新渲染頁面
-                    QTimer.singleShot(100, lambda: self.goto_page(self.current_page))
+    
+    def on_annotations_changed(self, pages):
+        """註解變更事件（批次變更只通知一次）"""
+        self.changed_annotation_pages.update(pages)
+        self.annotation_render_timer.start()
+    
+    def refresh_annotated_pages(self):
+        """重新渲染註解有變更的當前頁面（只更新頁面圖片，不重新載入文字與搜尋結果）"""
+        pages, self.changed_annotation_pages = self.changed_annotation_pages, set()
+        if self.current_page not in pages:
+            return
+        pixmap = self.pdf_handler.render_page(self.current_page, self.current_zoom)
+        if pixmap:
+            self.pdf_viewer.get_page_widget().set_pixmap(pixmap)
     
     def toggle_annotation_toolbar(self):
         """切換註解工具列"""
@@ -735,6 +965,215 @@ class MainWindow(QMainWindow):
         # 觸發翻譯
         translation_widget.on_translate_document()
     
+    def export_translated_pdf(self):
+        """匯出翻譯後的 PDF（以磁碟上的檔案為來源，未儲存的變更不包含在內）"""
+        if not self.pdf_handler.document or not self.current_file:
+            QMessageBox.information(self, "翻譯", "請先開啟 PDF 文件")
+            return
+        if self.export_worker and self.export_worker.isRunning():
+            QMessageBox.information(self, "翻譯", "匯出進行中，請稍候")
+            return
+        
+        from_code, to_code = self.get_translation_codes()
+        # 自動偵測時以文件前面的文字決定語言，整份文件使用同一個語言
+        from_code = self.translation_manager.resolve_source_language(
+            from_code,
+            (self.pdf_handler.get_page_text(page_num) for page_num in range(self.pdf_handler.page_count))
+        )
+        base, _ = os.path.splitext(self.current_file)
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "匯出翻譯後的 PDF", f"{base}_{to_code}.pdf", "PDF 檔案 (*.pdf)"
+        )
+        if not output_path:
+            return
+        if os.path.abspath(output_path) == os.path.abspath(self.current_file):
+            QMessageBox.warning(self, "翻譯", "請選擇與原文件不同的檔案")
+            return
+        
+        self.export_worker = TranslationExportWorker(
+            self.current_file, output_path, from_code, to_code,
+            self.translation_manager, self.pdf_handler.text_layers
+        )
+        self.export_worker.progress_updated.connect(self.on_export_progress)
+        self.export_worker.export_completed.connect(self.on_export_completed)
+        self.export_worker.error_occurred.connect(self.show_error)
+        self.export_worker.start()
+        self.statusBar().showMessage("開始匯出翻譯...")
+    
+    def on_export_progress(self, done: int, total: int, pages_per_second: float):
+        """匯出進度"""
+        self.statusBar().showMessage(f"匯出翻譯: {done}/{total} 頁（每秒 {pages_per_second:.1f} 頁）")
+    
+    def on_export_completed(self, output_path: str, failed: int, overflowed: int):
+        """匯出完成"""
+        self.statusBar().showMessage(f"已匯出: {output_path}")
+        message = f"翻譯後的 PDF 已匯出至:\n{output_path}"
+        if failed:
+            message += f"\n\n{failed} 個句子翻譯失敗，保留原文"
+        if overflowed:
+            message += f"\n\n{overflowed} 個區塊的譯文放不下，已以最小字級超出原區塊或縮小寫入"
+        QMessageBox.information(self, "匯出完成", message)
+    
+    def prepare_offline_translation(self):
+        """在背景翻譯整份文件的所有句子，並匯出為翻譯快取包（供離線電腦匯入）"""
+        if not self.pdf_handler.document or not self.current_file:
+            QMessageBox.information(self, "翻譯", "請先開啟 PDF 文件")
+            return
+        if self.pack_worker and self.pack_worker.isRunning():
+            QMessageBox.information(self, "翻譯", "正在準備離線翻譯，請稍候")
+            return
+        
+        texts = [self.pdf_handler.get_page_text(page_num) for page_num in range(self.pdf_handler.page_count)]
+        from_code, to_code = self.get_translation_codes()
+        from_code = self.translation_manager.resolve_source_language(from_code, texts)
+        base, _ = os.path.splitext(self.current_file)
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "儲存翻譯快取包", f"{base}_{from_code}-{to_code}{PACK_EXTENSION}",
+            f"翻譯快取包 (*{PACK_EXTENSION})"
+        )
+        if not output_path:
+            return
+        
+        self.pack_worker = OfflinePackWorker(texts, from_code, to_code, output_path, self.current_file)
+        self.pack_worker.set_translation_manager(self.translation_manager)
+        self.pack_worker.progress_updated.connect(
+            lambda done, total: self.statusBar().showMessage(f"準備離線翻譯: {done}/{total} 句")
+        )
+        self.pack_worker.pack_completed.connect(self.on_pack_completed)
+        self.pack_worker.error_occurred.connect(self.show_error)
+        self.pack_worker.start()
+    
+    def on_pack_completed(self, output_path: str, count: int):
+        """翻譯快取包匯出完成"""
+        self.statusBar().showMessage(f"已匯出翻譯快取包: {output_path}")
+        QMessageBox.information(
+            self, "準備離線翻譯",
+            f"已匯出 {count} 句翻譯至:\n{output_path}\n\n在離線電腦上以「匯入翻譯快取包」載入即可離線閱讀"
+        )
+    
+    def export_translation_pack(self):
+        """將目前語言對的翻譯快取匯出為翻譯快取包"""
+        from_code, to_code = self.get_translation_codes()
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "匯出翻譯快取包", f"translations_{from_code}-{to_code}{PACK_EXTENSION}",
+            f"翻譯快取包 (*{PACK_EXTENSION})"
+        )
+        if not output_path:
+            return
+        try:
+            count = self.translation_manager.export_pack(
+                output_path, None if from_code == "auto" else from_code, to_code
+            )
+        except OSError as e:
+            self.show_error(f"匯出翻譯快取包失敗: {e}")
+            return
+        self.statusBar().showMessage(f"已匯出 {count} 筆翻譯至 {output_path}")
+    
+    def import_translation_pack(self):
+        """匯入翻譯快取包（與本機快取合併）"""
+        pack_path, _ = QFileDialog.getOpenFileName(
+            self, "匯入翻譯快取包", "", f"翻譯快取包 (*{PACK_EXTENSION});;所有檔案 (*)"
+        )
+        if not pack_path:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            header, added = self.translation_manager.import_pack(pack_path)
+        except (OSError, ValueError) as e:
+            self.show_error(f"匯入翻譯快取包失敗: {e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        document = header.get("document")
+        source = f"（{document}）" if document else ""
+        self.statusBar().showMessage(f"已匯入 {added} 筆新翻譯{source}")
+    
+    def prefetch_translations(self):
+        """在背景預先翻譯目前頁面與後面幾頁（翻譯面板開啟時）"""
+        page_count = self.config.get_translation_prefetch_pages()
+        translation_widget = self.sidebar.get_translation_widget()
+        if (not self.pdf_handler.document or page_count <= 0
+                or not self.sidebar.isVisible()
+                or self.sidebar.tab_widget.currentWidget() is not translation_widget):
+            return
+        
+        from_code, to_code = self.get_translation_codes()
+        last_page = min(self.current_page + page_count, self.pdf_handler.page_count - 1)
+        # 與「翻譯目前頁面」使用相同的文字，才能命中快取
+        texts = [self.pdf_handler.get_page_text(page_num)
+                 for page_num in range(self.current_page, last_page + 1)]
+        self.translation_manager.prefetch(texts, from_code, to_code)
+    
+    def update_translation_metrics(self):
+        """在翻譯面板顯示翻譯統計"""
+        translation_widget = self.sidebar.get_translation_widget()
+        if translation_widget.isVisible():
+            translation_widget.set_metrics(self.translation_manager.metrics.summary())
+    
+    def get_translation_codes(self):
+        """獲取翻譯面板選擇的 (來源語言代碼, 目標語言代碼)"""
+        translation_widget = self.sidebar.get_translation_widget()
+        return (
+            self.translation_manager.get_language_code(translation_widget.from_lang_combo.currentText()),
+            self.translation_manager.get_language_code(translation_widget.to_lang_combo.currentText()),
+        )
+    
+    def toggle_translation_overlay(self, enabled: bool):
+        """切換在頁面上疊加顯示譯文"""
+        self.translation_overlay_enabled = enabled
+        if enabled:
+            self.update_translation_overlay()
+        else:
+            self.overlay_timer.stop()
+            self.translation_manager.cancel_overlay()
+            self.pdf_viewer.get_page_widget().clear_translation_overlay()
+    
+    def schedule_translation_overlay(self):
+        """可見範圍改變後稍候翻譯新出現的區塊"""
+        if self.translation_overlay_enabled:
+            self.overlay_timer.start()
+    
+    def update_translation_overlay(self):
+        """翻譯目前頁面可見的文字區塊"""
+        if not self.translation_overlay_enabled or not self.pdf_handler.document:
+            return
+        layer = self.pdf_handler.get_text_layer(self.current_page)
+        if layer is None:
+            return
+        
+        blocks = layer.text_blocks()
+        # 可見範圍上下多翻譯一些，捲動時譯文已就緒
+        indices = visible_blocks(blocks, self.pdf_viewer.visible_pdf_rect(), margin=200)
+        from_code, to_code = self.get_translation_codes()
+        done = self.translation_manager.translate_blocks_async(
+            self.current_page, {index: blocks[index][0] for index in indices}, from_code, to_code
+        )
+        self.show_translation_overlay()
+        if not done:
+            self.statusBar().showMessage("翻譯頁面區塊中...")
+    
+    def show_translation_overlay(self):
+        """在頁面上顯示已翻譯的區塊"""
+        layer = self.pdf_handler.get_text_layer(self.current_page)
+        if layer is None:
+            return
+        blocks = layer.text_blocks()
+        from_code, to_code = self.get_translation_codes()
+        translations = self.translation_manager.get_block_translations(self.current_page, from_code, to_code)
+        overlay = [(blocks[index][1], text) for index, text in sorted(translations.items())
+                   if index < len(blocks)]
+        page_widget = self.pdf_viewer.get_page_widget()
+        if overlay != page_widget.translation_overlay:
+            page_widget.set_translation_overlay(overlay)
+    
+    def on_blocks_translated(self, page_num: int, from_code: str, to_code: str):
+        """頁面區塊翻譯完成"""
+        if (self.translation_overlay_enabled and page_num == self.current_page
+                and (from_code, to_code) == self.get_translation_codes()):
+            self.show_translation_overlay()
+            self.statusBar().showMessage("翻譯完成")
+    
     def on_translate_selected_requested(self, from_lang: str, to_lang: str):
         """處理翻譯選取文字請求"""
         translation_widget = self.sidebar.get_translation_widget()
@@ -744,19 +1183,25 @@ class MainWindow(QMainWindow):
             translation_widget.show_error("沒有要翻譯的文字")
             return
         
-        # 清除之前的翻譯結果
+        # 清除之前的翻譯結果（按鈕保持可用，新的選取會取代進行中的翻譯）
         translation_widget.clear_translation()
-        translation_widget.enable_buttons(False)
         
         # 獲取語言代碼
         from_code = self.translation_manager.get_language_code(from_lang)
         to_code = self.translation_manager.get_language_code(to_lang)
         
-        # 執行翻譯
-        self.statusBar().showMessage("翻譯中...")
-        translated = self.translation_manager.translate(text, from_code, to_code)
+        # 在背景翻譯；已有快取時直接顯示
+        translated = self.translation_manager.translate_async(text, from_code, to_code)
+        if translated is not None:
+            self.on_selection_translated(0, translated)
+            return
         
-        # 顯示結果
+        translation_widget.show_busy()
+        self.statusBar().showMessage("翻譯中...")
+    
+    def on_selection_translated(self, request_id: int, translated: str):
+        """選取文字翻譯完成"""
+        translation_widget = self.sidebar.get_translation_widget()
         translation_widget.set_translation_result(translated)
         translation_widget.enable_buttons(True)
         translation_widget.hide_progress()
@@ -777,21 +1222,36 @@ class MainWindow(QMainWindow):
             page_text = self.pdf_handler.get_page_text(page_num)
             texts.append(page_text)
         
-        # 獲取語言代碼
-        from_code = self.translation_manager.get_language_code(from_lang)
+        # 獲取語言代碼（自動偵測時在本機偵測整份文件的語言）
+        from_code = self.translation_manager.resolve_source_language(
+            self.translation_manager.get_language_code(from_lang), texts
+        )
         to_code = self.translation_manager.get_language_code(to_lang)
-        
-        # 使用批次翻譯
-        self.statusBar().showMessage("開始翻譯文件...")
+        if from_lang == "自動偵測" and from_code != "auto":
+            translation_widget.status_label.setText(
+                f"偵測到來源語言: {self.translation_manager.get_language_name(from_code)}"
+            )
+        
+        # 使用批次翻譯（從目前頁面開始，每頁完成即顯示）
+        progress = self.translation_manager.get_job_progress(self.current_file, from_code, to_code)
+        if progress:
+            _, done, total = progress
+            self.statusBar().showMessage(f"繼續上次未完成的翻譯（已完成 {done}/{total} 句）...")
+        else:
+            self.statusBar().showMessage("開始翻譯文件...")
         self.translation_manager.translate_batch(
             texts, from_code, to_code,
-            callback=translation_widget.show_progress
+            callback=translation_widget.show_progress,
+            priority_page=self.current_page,
+            file_path=self.current_file
         )
     
     def on_translation_ready(self, translated_text: str):
         """翻譯完成"""
         translation_widget = self.sidebar.get_translation_widget()
-        translation_widget.set_translation_result(translated_text)
+        # 整份文件的譯文已逐頁顯示，不需重新設定
+        if not translation_widget.has_page_translations():
+            translation_widget.set_translation_result(translated_text)
         translation_widget.enable_buttons(True)
         translation_widget.hide_progress()
         self.statusBar().showMessage("翻譯完成")
@@ -821,11 +1281,20 @@ class MainWindow(QMainWindow):
         """關閉事件"""
         self.save_settings()
         
-        # 停止翻譯工作
-        if self.translation_manager.translation_worker:
-            if self.translation_manager.translation_worker.isRunning():
-                self.translation_manager.translation_worker.quit()
-                self.translation_manager.translation_worker.wait()
+        # 停止搜尋工作
+        self.search_manager.shutdown()
+        
+        # 停止翻譯工作（已完成的句子已保存，下次翻譯同一文件時繼續）
+        self.prefetch_timer.stop()
+        self.overlay_timer.stop()
+        self.annotation_render_timer.stop()
+        self.metrics_timer.stop()
+        for worker in (self.export_worker, self.pack_worker):
+            if worker and worker.isRunning():
+                worker.cancel()
+                worker.wait()
+        self.translation_manager.cancel_batch()
+        self.translation_manager.close()
         
         # 關閉文件
         if self.pdf_handler.document:
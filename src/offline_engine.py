@@ -0,0 +1,250 @@
+"""
+離線翻譯引擎模組
+使用 download_models.py 下載的 Helsinki-NLP opus-mt（MarianMT）模型在本機翻譯
+
+transformers 與 torch 在第一次翻譯時才匯入，不影響程式啟動時間
+"""
+
+import threading
+import importlib.util
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .translation_backends import TranslationBackend, BackendUnavailable
+from .segmenter import split_long_text
+
+
+# 應用程式語言代碼 -> opus-mt 模型名稱中的語言代碼
+OPUS_LANGUAGE_CODES = {
+    "en": "en",
+    "zh-TW": "zh",
+    "zh-CN": "zh",
+    "ja": "jap",
+    "ko": "ko",
+    "fr": "fr",
+    "de": "de",
+    "es": "es",
+}
+
+# 已提供下載的模型（與 download_models.MODELS 相同）
+AVAILABLE_PAIRS = {
+    ("en", "zh"), ("zh", "en"), ("en", "jap"), ("jap", "en"), ("en", "ko"), ("ko", "en"),
+    ("en", "fr"), ("fr", "en"), ("en", "de"), ("de", "en"), ("en", "es"), ("es", "en"),
+}
+
+# 多目標模型（opus-mt-en-zh）以句首的目標語言標記選擇輸出的文字系統
+TARGET_TOKENS = {
+    "zh-TW": ">>cmn_Hant<<",
+    "zh-CN": ">>cmn_Hans<<",
+}
+
+
+def model_name_for(from_code: str, to_code: str) -> Optional[str]:
+    """
+    獲取語言對應的模型名稱
+
+    Returns:
+        模型名稱，沒有對應模型則返回 None
+    """
+    pair = (OPUS_LANGUAGE_CODES.get(from_code), OPUS_LANGUAGE_CODES.get(to_code))
+    if pair not in AVAILABLE_PAIRS:
+        return None
+    return f"Helsinki-NLP/opus-mt-{pair[0]}-{pair[1]}"
+
+
+def add_target_token(texts: List[str], to_code: str) -> List[str]:
+    """在每個片段前加上目標語言標記（不需要標記的語言原樣返回）"""
+    token = TARGET_TOKENS.get(to_code)
+    if token is None:
+        return texts
+    return [f"{token} {text}" for text in texts]
+
+
+def is_model_downloaded(model_name: str) -> bool:
+    """檢查模型是否已下載到本機（只查看下載快取，不載入模型）"""
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return False
+    return isinstance(try_to_load_from_cache(model_name, "config.json"), str)
+
+
+def is_engine_available() -> bool:
+    """檢查是否已安裝 transformers 與 torch（不匯入）"""
+    return (importlib.util.find_spec("transformers") is not None
+            and importlib.util.find_spec("torch") is not None)
+
+
+class MarianEngine:
+    """
+    MarianMT 翻譯引擎
+
+    模型在第一次使用時載入，只保留最近使用的幾個模型；
+    片段依長度排序後分批翻譯，同一批的長度相近可減少填充浪費
+    """
+
+    def __init__(self, max_loaded_models: int = 2, batch_size: int = 16,
+                 num_threads: Optional[int] = None, max_length: int = 512):
+        """
+        Args:
+            max_loaded_models: 同時保留在記憶體中的模型數（每個約 300MB）
+            batch_size: 每批翻譯的片段數
+            num_threads: torch 使用的 CPU 執行緒數，None 表示使用 torch 預設值
+            max_length: 輸入與輸出的最大詞元數
+        """
+        self.max_loaded_models = max_loaded_models
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.max_length = max_length
+        self._models: "OrderedDict[str, Tuple[object, object]]" = OrderedDict()  # {模型名稱: (tokenizer, model)}
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._torch = None
+
+    def _import(self):
+        """第一次使用時匯入 torch 並設定執行緒數"""
+        if self._torch is None:
+            import torch
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            self._torch = torch
+        return self._torch
+
+    def _load(self, model_name: str) -> Tuple[object, object, threading.Lock]:
+        """載入模型（最近使用的模型保留在記憶體中）"""
+        with self._lock:
+            if model_name in self._models:
+                self._models.move_to_end(model_name)
+                tokenizer, model = self._models[model_name]
+                return tokenizer, model, self._model_locks[model_name]
+
+            self._import()
+            from transformers import MarianMTModel, MarianTokenizer
+            try:
+                # 只使用本機已下載的模型，不嘗試連線
+                tokenizer = MarianTokenizer.from_pretrained(model_name, local_files_only=True)
+                model = MarianMTModel.from_pretrained(model_name, local_files_only=True)
+            except OSError as e:
+                raise BackendUnavailable(
+                    f"找不到離線翻譯模型 {model_name}，請先執行 download_models.py 下載"
+                ) from e
+            model.eval()
+
+            self._models[model_name] = (tokenizer, model)
+            self._model_locks[model_name] = threading.Lock()
+            while len(self._models) > self.max_loaded_models:
+                old_name, _ = self._models.popitem(last=False)
+                self._model_locks.pop(old_name, None)
+            return tokenizer, model, self._model_locks[model_name]
+
+    def loaded_models(self) -> List[str]:
+        """目前載入的模型（最近使用的在後）"""
+        with self._lock:
+            return list(self._models.keys())
+
+    def translate_batch(self, texts: List[str], from_code: str, to_code: str) -> List[str]:
+        """
+        翻譯多個片段
+
+        Args:
+            texts: 片段列表
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+
+        Returns:
+            與輸入順序相同的譯文列表
+
+        Raises:
+            BackendUnavailable: 沒有對應的模型
+        """
+        model_name = model_name_for(from_code, to_code)
+        if model_name is None:
+            raise BackendUnavailable(f"沒有 {from_code} → {to_code} 的離線翻譯模型")
+
+        tokenizer, model, model_lock = self._load(model_name)
+
+        # 超過 max_length 個詞元的片段先切開（模型會截斷輸入），譯文依序接回並保留原本的空白
+        pieces: List[str] = []
+        layouts = []  # 每個片段: [(pieces 的索引或 None, 結尾空白)]
+        counts = self._token_counts(tokenizer, texts, to_code)
+        for text, count in zip(texts, counts):
+            chunks = [text] if count <= self.max_length else self._split_to_fit(tokenizer, text, to_code)
+            layout = []
+            for chunk in chunks:
+                stripped = chunk.rstrip()
+                index = None
+                if stripped.strip():
+                    index = len(pieces)
+                    pieces.append(stripped)
+                layout.append((index, chunk[len(stripped):]))
+            layouts.append(layout)
+
+        translated = self._generate(tokenizer, model, model_lock, add_target_token(pieces, to_code))
+        return ["".join((translated[index] if index is not None else "") + tail
+                        for index, tail in layout)
+                for layout in layouts]
+
+    @staticmethod
+    def _token_counts(tokenizer, texts: List[str], to_code: str) -> List[int]:
+        """各片段（含目標語言標記）的詞元數"""
+        if not texts:
+            return []
+        return [len(ids) for ids in tokenizer(add_target_token(texts, to_code))["input_ids"]]
+
+    def _split_to_fit(self, tokenizer, text: str, to_code: str) -> List[str]:
+        """以 split_long_text 切開文字，直到每段都不超過 max_length 個詞元"""
+        limit = len(text)
+        while True:
+            chunks = split_long_text(text, limit)
+            longest = max(self._token_counts(tokenizer, chunks, to_code))
+            if longest <= self.max_length or limit == 1:
+                return chunks
+            limit = max(1, min(limit - 1, limit * self.max_length // longest))
+
+    def _generate(self, tokenizer, model, model_lock: threading.Lock, texts: List[str]) -> List[str]:
+        """以模型翻譯片段（每個片段都不超過 max_length 個詞元）"""
+        torch = self._import()
+        results: List[str] = [""] * len(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            batch = [texts[i] for i in indices]
+            inputs = tokenizer(batch, return_tensors="pt", padding=True,
+                               truncation=True, max_length=self.max_length)
+            # 同一模型同時只跑一批，CPU 執行緒由 torch 在批次內平行使用
+            with model_lock, torch.inference_mode():
+                outputs = model.generate(**inputs, max_length=self.max_length)
+            decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            for i, text in zip(indices, decoded):
+                results[i] = text
+        return results
+
+
+class MarianBackend(TranslationBackend):
+    """以 MarianMT 引擎翻譯的離線後端"""
+
+    name = "marian"
+    max_request_chars = 400  # 中日韓文字約一字一個詞元，保持在 512 個詞元內
+    supports_batch = True
+    requires_network = False
+
+    def __init__(self, engine: Optional[MarianEngine] = None):
+        self.engine = engine or MarianEngine()
+        self._downloaded: Set[str] = set()  # 已確認下載的模型（未下載的每次重新檢查）
+
+    def supports(self, from_code: str, to_code: str) -> bool:
+        """有對應的模型且已下載到本機"""
+        model_name = model_name_for(from_code, to_code)
+        if model_name is None:
+            return False
+        if model_name not in self._downloaded:
+            if not is_model_downloaded(model_name):
+                return False
+            self._downloaded.add(model_name)
+        return True
+
+    def translate(self, text: str, from_code: str, to_code: str) -> str:
+        return self.engine.translate_batch([text], from_code, to_code)[0]
+
+    def translate_batch(self, texts: List[str], from_code: str, to_code: str) -> List[str]:
+        return self.engine.translate_batch(texts, from_code, to_code)
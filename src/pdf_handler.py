@@ -8,6 +8,8 @@ from typing import Optional, List, Tuple
 from PyQt6.QtGui import QImage, QPixmap
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from .text_layer import PageTextLayer, TextLayerCache
+
 
 class PDFHandler(QObject):
     """PDF 文件處理器"""
@@ -23,6 +25,8 @@ class PDFHandler(QObject):
         self.file_path: Optional[str] = None
         self.page_count: int = 0
         self.current_page: int = 0
+        self._words_cache = {}  # 頁面單詞快取 {頁碼: words}
+        self.text_layers = TextLayerCache()  # 頁面文字層快取（與背景執行緒共用）
         
     def open_document(self, file_path: str) -> bool:
         """
@@ -40,6 +44,8 @@ class PDFHandler(QObject):
             
             self.document = fitz.open(file_path)
             self.file_path = file_path
+            self._words_cache = {}
+            self.text_layers = TextLayerCache()
             self.page_count = len(self.document)
             self.current_page = 0
             
@@ -58,6 +64,8 @@ class PDFHandler(QObject):
             self.file_path = None
             self.page_count = 0
             self.current_page = 0
+            self._words_cache = {}
+            self.text_layers = TextLayerCache()
     
     def get_page(self, page_num: int) -> Optional[fitz.Page]:
         """
@@ -138,6 +146,20 @@ class PDFHandler(QObject):
             return ""
         return page.get_text()
     
+    def get_text_layer(self, page_num: int) -> Optional[PageTextLayer]:
+        """
+        獲取頁面文字層（文字與字元位置，已快取）
+        
+        Args:
+            page_num: 頁碼
+            
+        Returns:
+            文字層物件，頁面不存在則返回 None
+        """
+        if not self.get_page(page_num):
+            return None
+        return self.text_layers.get_or_build(page_num, self.document)
+    
     def get_text_from_rect(self, page_num: int, rect) -> str:
         """
         從指定矩形區域獲取文字
@@ -181,12 +203,16 @@ class PDFHandler(QObject):
         Returns:
             文字區塊列表 [(x0, y0, x1, y1, word, block_no, line_no, word_no)]
         """
+        if page_num in self._words_cache:
+            return self._words_cache[page_num]
+        
         page = self.get_page(page_num)
         if not page:
             return []
         
-        # 使用 "words" 模式獲取每個單詞的位置
+        # 使用 "words" 模式獲取每個單詞的位置（文字內容不會改變，快取後重複使用）
         words = page.get_text("words")
+        self._words_cache[page_num] = words
         return words
     
     def get_text_from_words(self, page_num: int, selected_words):
@@ -6,7 +6,8 @@ PDF 檢視器模組
 from PyQt6.QtWidgets import (QWidget, QScrollArea, QLabel, QVBoxLayout,
                              QGraphicsView, QGraphicsScene, QGraphicsPixmapItem)
 from PyQt6.QtCore import Qt, pyqtSignal, QPoint, QPointF, QRectF
-from PyQt6.QtGui import QPixmap, QPainter, QMouseEvent, QPen, QColor, QPainterPath, QBrush, QKeyEvent
+from PyQt6.QtGui import (QPixmap, QPainter, QMouseEvent, QPen, QColor, QPainterPath, QBrush, QKeyEvent,
+                         QFont, QFontMetricsF)
 
 
 class PDFPageWidget(QLabel):
@@ -51,6 +52,14 @@ class PDFPageWidget(QLabel):
         
         # PDF handler 參考（用於智能選取）
         self.pdf_handler = None
+        
+        # 搜尋結果高亮（PDF 座標矩形）
+        self.search_rects = []
+        self.current_search_rects = []
+        
+        # 翻譯疊加（PDF 座標矩形與譯文）
+        self.translation_overlay = []
+        self._overlay_font_sizes = {}  # {(區塊索引, 縮放級別): 字體像素大小}
     
     def set_pixmap(self, pixmap: QPixmap):
         """設定顯示的圖片"""
@@ -63,6 +72,50 @@ class PDFPageWidget(QLabel):
         self.current_page_num = page_num
         self.selected_words = []
     
+    def set_search_highlights(self, rects, current_rects=None):
+        """設定搜尋結果高亮（PDF 座標，直接使用已儲存的矩形）"""
+        self.search_rects = rects
+        self.current_search_rects = current_rects or []
+        self.update()
+    
+    def clear_search_highlights(self):
+        """清除搜尋結果高亮"""
+        self.set_search_highlights([], [])
+    
+    def set_translation_overlay(self, blocks):
+        """
+        設定疊加顯示的譯文
+        
+        Args:
+            blocks: [(區塊矩形 (x0, y0, x1, y1), 譯文)]（PDF 座標）
+        """
+        self.translation_overlay = blocks
+        self._overlay_font_sizes = {}
+        self.update()
+    
+    def clear_translation_overlay(self):
+        """清除疊加顯示的譯文"""
+        self.set_translation_overlay([])
+    
+    def _overlay_font(self, index: int, rect: QRectF, text: str) -> QFont:
+        """選擇能讓譯文放進區塊矩形的最大字體（結果依縮放級別快取）"""
+        font = QFont(self.font())
+        key = (index, self.zoom_level)
+        size = self._overlay_font_sizes.get(key)
+        if size is None:
+            flags = int(Qt.TextFlag.TextWordWrap)
+            size = max(4.0, 11.0 * self.zoom_level)
+            while size > 4.0:
+                font.setPixelSize(int(size))
+                bounds = QFontMetricsF(font).boundingRect(rect, flags, text)
+                if bounds.height() <= rect.height() and bounds.width() <= rect.width():
+                    break
+                size *= 0.85
+            size = max(4, int(size))
+            self._overlay_font_sizes[key] = size
+        font.setPixelSize(size)
+        return font
+    
     def update_display(self):
         """更新顯示"""
         if self.current_pixmap:
@@ -250,6 +303,31 @@ class PDFPageWidget(QLabel):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
+        # 繪製翻譯疊加（覆蓋原文區塊）
+        if self.translation_overlay:
+            painter.setPen(Qt.PenStyle.NoPen)
+            for index, (rect, text) in enumerate(self.translation_overlay):
+                screen_rect = self._word_rect_to_screen(rect)
+                painter.setBrush(QColor(255, 255, 245, 235))  # 米白色，略透出原文
+                painter.drawRect(screen_rect)
+                painter.setFont(self._overlay_font(index, screen_rect, text))
+                painter.setPen(QColor(20, 20, 20))
+                painter.drawText(screen_rect, int(Qt.TextFlag.TextWordWrap), text)
+                painter.setPen(Qt.PenStyle.NoPen)
+        
+        # 繪製搜尋結果高亮
+        if self.search_rects:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(255, 200, 0, 90))  # 黃色半透明
+            for rect in self.search_rects:
+                painter.drawRect(self._word_rect_to_screen(rect))
+            
+            if self.current_search_rects:
+                painter.setPen(QPen(QColor(255, 120, 0), 2))
+                painter.setBrush(QColor(255, 120, 0, 110))  # 目前結果以橘色標示
+                for rect in self.current_search_rects:
+                    painter.drawRect(self._word_rect_to_screen(rect))
+        
         # 繪製智能選取的文字高亮
         if self.interaction_mode == "select" and self.text_selection_mode == "smart":
             # 繪製選取的文字
@@ -480,6 +558,7 @@ class PDFViewer(QWidget):
     # 信號定義
     page_changed = pyqtSignal(int)
     zoom_changed = pyqtSignal(float)
+    visible_area_changed = pyqtSignal()  # 捲動使可見範圍改變
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -500,6 +579,8 @@ class PDFViewer(QWidget):
         # PDF 頁面元件
         self.page_widget = PDFPageWidget()
         self.scroll_area.setWidget(self.page_widget)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(lambda _: self.visible_area_changed.emit())
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(lambda _: self.visible_area_changed.emit())
         
         layout.addWidget(self.scroll_area)
     
@@ -510,6 +591,31 @@ class PDFViewer(QWidget):
         self.current_page = page_num
         self.page_changed.emit(page_num)
     
+    def scroll_to_pdf_rect(self, rect):
+        """捲動使指定的 PDF 座標矩形可見"""
+        screen_rect = self.page_widget._word_rect_to_screen(rect)
+        center = screen_rect.center()
+        self.scroll_area.ensureVisible(
+            int(center.x()), int(center.y()),
+            int(screen_rect.width() / 2) + 50, int(screen_rect.height() / 2) + 50
+        )
+    
+    def visible_pdf_rect(self):
+        """
+        獲取目前可見的頁面範圍
+        
+        Returns:
+            PDF 座標矩形 (x0, y0, x1, y1)，沒有頁面則返回 None
+        """
+        if not self.page_widget.current_pixmap:
+            return None
+        viewport = self.scroll_area.viewport()
+        top_left = self.page_widget.mapFrom(viewport, QPoint(0, 0))
+        rect = self.page_widget.map_rect_to_pdf(
+            QRectF(top_left.x(), top_left.y(), viewport.width(), viewport.height())
+        )
+        return (rect.left(), rect.top(), rect.right(), rect.bottom())
+    
     def clear(self):
         """清除顯示"""
         self.page_widget.clear()
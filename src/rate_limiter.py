@@ -0,0 +1,152 @@
+"""
+速率限制模組
+提供令牌桶速率限制與指數退避重試
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    令牌桶速率限制器（執行緒安全）
+
+    以固定速率補充令牌，每次請求消耗一個令牌；
+    容量決定允許的瞬間突發請求數
+    """
+
+    def __init__(self, rate: float = 5.0, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 每秒補充的令牌數
+            capacity: 桶容量，None 表示與 rate 相同
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """依經過時間補充令牌"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> bool:
+        """
+        嘗試取得令牌（不等待）
+
+        Args:
+            tokens: 需要的令牌數
+            reserve: 取得後至少要保留的令牌數（低優先權請求使用）
+
+        Returns:
+            成功返回 True
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens - tokens >= reserve:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, cancel_event: Optional[threading.Event] = None,
+                timeout: Optional[float] = None) -> bool:
+        """
+        取得令牌（不足時等待）
+
+        Args:
+            tokens: 需要的令牌數
+            cancel_event: 設定後立即放棄等待
+            timeout: 最長等待秒數
+
+        Returns:
+            取得令牌返回 True，取消或逾時返回 False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate if self.rate > 0 else 0.1
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class RetryPolicy:
+    """指數退避重試策略"""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5,
+                 max_delay: float = 8.0, jitter: float = 0.2):
+        """
+        Args:
+            max_retries: 最多重試次數（不含第一次）
+            base_delay: 第一次重試前的等待秒數
+            max_delay: 單次等待上限
+            jitter: 隨機擾動比例，避免多個請求同時重試
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次重試（從 1 開始）前的等待秒數"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+def call_with_retry(func: Callable, policy: RetryPolicy,
+                    should_retry: Callable[[Exception], bool] = lambda e: True,
+                    on_retry: Optional[Callable[[int, Exception], None]] = None,
+                    cancel_event: Optional[threading.Event] = None):
+    """
+    執行函數，失敗時依策略重試
+
+    Args:
+        func: 要執行的函數（無參數）
+        policy: 重試策略
+        should_retry: 判斷例外是否值得重試
+        on_retry: 每次重試前的回調 (重試次數, 例外)
+        cancel_event: 設定後不再重試
+
+    Returns:
+        函數的返回值
+
+    Raises:
+        最後一次失敗的例外
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            attempt += 1
+            if attempt > policy.max_retries or not should_retry(e):
+                raise
+            if cancel_event is not None and cancel_event.is_set():
+                raise
+            if on_retry:
+                on_retry(attempt, e)
+
+            delay = policy.delay(attempt)
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    raise
+            else:
+                time.sleep(delay)
@@ -0,0 +1,387 @@
+"""
+搜尋模組
+提供背景執行緒的全文搜尋，逐頁回報結果並可隨時取消
+"""
+
+import fitz
+import re
+import bisect
+from typing import Optional, List, Dict, Tuple
+from PyQt6.QtCore import QObject, pyqtSignal, QThread
+
+from .search_index import SearchIndex, SearchOptions, TextMatcher
+from .text_layer import TextLayerCache
+
+
+class SearchHit:
+    """搜尋命中項目"""
+
+    def __init__(self, page_num: int, rects: List[Tuple[float, float, float, float]], snippet: str = ""):
+        self.page_num = page_num
+        self.rects = rects  # 每行一個矩形 (x0, y0, x1, y1)，PDF 座標
+        self.rect = rects[0] if rects else (0.0, 0.0, 0.0, 0.0)
+        self.snippet = snippet
+
+    def sort_key(self) -> Tuple:
+        """排序鍵值（頁碼、由上而下、由左而右）"""
+        return (self.page_num, self.rect[1], self.rect[0])
+
+
+class SearchResults:
+    """
+    搜尋結果集合
+
+    結果依頁碼排序保存，並依頁碼建立索引，
+    導覽與繪製高亮時只需查表，不必重新搜尋或擷取文字
+    """
+
+    def __init__(self, query: str = ""):
+        self.query = query
+        self.hits: List[SearchHit] = []
+        self._keys: List[Tuple] = []
+        self._by_page: Dict[int, List[SearchHit]] = {}
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def __getitem__(self, index: int) -> SearchHit:
+        return self.hits[index]
+
+    def add_page_hits(self, page_num: int, hits: List[SearchHit]) -> int:
+        """
+        加入單頁的結果（會就地依位置排序 hits）
+
+        Returns:
+            第一筆結果插入的索引
+        """
+        hits.sort(key=SearchHit.sort_key)
+        insert_at = bisect.bisect_left(self._keys, hits[0].sort_key()) if hits else len(self.hits)
+        self.hits[insert_at:insert_at] = hits
+        self._keys[insert_at:insert_at] = [hit.sort_key() for hit in hits]
+        self._by_page.setdefault(page_num, []).extend(hits)
+        return insert_at
+
+    def hits_on_page(self, page_num: int) -> List[SearchHit]:
+        """獲取指定頁面的結果"""
+        return self._by_page.get(page_num, [])
+
+    def page_count(self) -> int:
+        """有結果的頁數"""
+        return len(self._by_page)
+
+    def index_of(self, hit: SearchHit) -> int:
+        """獲取結果的索引"""
+        index = bisect.bisect_left(self._keys, hit.sort_key())
+        while index < len(self.hits) and self.hits[index] is not hit:
+            index += 1
+        return index if index < len(self.hits) else -1
+
+    def next_index(self, index: int) -> int:
+        """下一筆結果索引（循環）"""
+        if not self.hits:
+            return -1
+        return (index + 1) % len(self.hits)
+
+    def previous_index(self, index: int) -> int:
+        """上一筆結果索引（循環）"""
+        if not self.hits:
+            return -1
+        if index < 0:
+            return len(self.hits) - 1
+        return (index - 1) % len(self.hits)
+
+
+def page_search_order(page_count: int, start_page: int = 0,
+                      pages: Optional[List[int]] = None) -> List[int]:
+    """
+    產生搜尋頁面順序（從目前頁面開始，繞回文件開頭）
+
+    Args:
+        page_count: 總頁數
+        start_page: 起始頁碼
+        pages: 限定的候選頁碼，None 表示全部頁面
+
+    Returns:
+        頁碼列表
+    """
+    if page_count <= 0:
+        return []
+    if pages is None:
+        pages = range(page_count)
+    pages = sorted(p for p in pages if 0 <= p < page_count)
+    return [p for p in pages if p >= start_page] + [p for p in pages if p < start_page]
+
+
+class SearchWorker(QThread):
+    """搜尋工作執行緒"""
+
+    result_found = pyqtSignal(int, list)  # 找到結果 (頁碼, SearchHit 列表)
+    progress_updated = pyqtSignal(int, int)  # 已搜尋頁數, 總頁數
+    search_completed = pyqtSignal(int)  # 搜尋完成，參數為命中總數
+    error_occurred = pyqtSignal(str)  # 錯誤發生
+
+    def __init__(self, file_path: str, matcher: TextMatcher, text_layers: TextLayerCache,
+                 start_page: int = 0, pages: Optional[List[int]] = None):
+        super().__init__()
+        self.file_path = file_path
+        self.matcher = matcher
+        self.text_layers = text_layers
+        self.start_page = start_page
+        self.pages = pages  # 索引篩選出的候選頁面，None 表示逐頁搜尋
+        self._cancelled = False
+
+    def cancel(self):
+        """要求取消搜尋（於下一頁開始前生效）"""
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        """是否已取消"""
+        return self._cancelled
+
+    def run(self):
+        """執行搜尋"""
+        document = None
+        try:
+            # MuPDF 文件不可跨執行緒共用，工作執行緒自行開啟一份
+            document = fitz.open(self.file_path)
+            order = page_search_order(len(document), self.start_page, self.pages)
+            total = len(order)
+            hit_count = 0
+
+            for i, page_num in enumerate(order):
+                if self._cancelled:
+                    return
+
+                # 在快取的文字層上比對，以字元位置換算矩形，不需再經過 MuPDF 搜尋
+                layer = self.text_layers.get_or_build(page_num, document)
+                spans = layer.find(self.matcher)
+                if spans:
+                    # 摘要在搜尋時一次算好，之後導覽不需再擷取文字
+                    hits = [
+                        SearchHit(page_num, layer.rects_for_range(start, end), layer.snippet(start, end))
+                        for start, end in spans
+                    ]
+                    hit_count += len(hits)
+                    self.result_found.emit(page_num, hits)
+
+                self.progress_updated.emit(i + 1, total)
+
+            if not self._cancelled:
+                self.search_completed.emit(hit_count)
+
+        except Exception as e:
+            self.error_occurred.emit(f"搜尋錯誤: {str(e)}")
+        finally:
+            if document:
+                document.close()
+
+
+class IndexWorker(QThread):
+    """搜尋索引建立執行緒"""
+
+    progress_updated = pyqtSignal(int, int)  # 已索引頁數, 總頁數
+    index_ready = pyqtSignal(object)  # 索引建立完成 (SearchIndex)
+    error_occurred = pyqtSignal(str)  # 錯誤發生
+
+    def __init__(self, file_path: str, text_layers: TextLayerCache, ngram: int = 2):
+        super().__init__()
+        self.file_path = file_path
+        self.text_layers = text_layers
+        self.ngram = ngram
+        self._cancelled = False
+
+    def cancel(self):
+        """要求取消建立索引"""
+        self._cancelled = True
+
+    def run(self):
+        """建立索引"""
+        document = None
+        try:
+            document = fitz.open(self.file_path)
+            index = SearchIndex(self.ngram)
+            total = len(document)
+
+            for page_num in range(total):
+                if self._cancelled:
+                    return
+                # 索引與搜尋使用同一份文字層，候選頁面與比對結果一致
+                layer = self.text_layers.get_or_build(page_num, document)
+                index.add_page(page_num, layer.text)
+                self.progress_updated.emit(page_num + 1, total)
+
+            # 索引只在建立完成後才交給 GUI 執行緒使用
+            self.index_ready.emit(index)
+
+        except Exception as e:
+            self.error_occurred.emit(f"建立搜尋索引失敗: {str(e)}")
+        finally:
+            if document:
+                document.close()
+
+
+class SearchManager(QObject):
+    """搜尋管理器"""
+
+    # 信號定義
+    results_found = pyqtSignal(int, int, list)  # 單頁結果 (頁碼, 插入索引, SearchHit 列表)
+    progress_updated = pyqtSignal(int, int)  # 搜尋進度
+    search_finished = pyqtSignal(int)  # 搜尋完成，參數為命中總數
+    index_ready = pyqtSignal(int)  # 搜尋索引建立完成，參數為頁數
+    error_occurred = pyqtSignal(str)  # 錯誤發生
+
+    def __init__(self, ngram: int = 2):
+        super().__init__()
+        self.search_worker: Optional[SearchWorker] = None
+        self.index_worker: Optional[IndexWorker] = None
+        self.index: Optional[SearchIndex] = None
+        self.ngram = ngram
+        self.query = ""
+        self.results = SearchResults()
+        # 已取消但尚未結束的執行緒，保留參考直到 finished 避免被回收
+        self._retired_workers = []
+
+    def start_search(self, file_path: str, text: str, text_layers: TextLayerCache,
+                     start_page: int = 0, options: Optional[SearchOptions] = None) -> bool:
+        """
+        開始新的搜尋（會取消進行中的搜尋）
+
+        Args:
+            file_path: PDF 檔案路徑
+            text: 搜尋的文字或規則運算式
+            text_layers: 文件的文字層快取
+            start_page: 起始頁碼，通常為目前頁面
+            options: 搜尋選項
+
+        Returns:
+            成功開始搜尋返回 True
+        """
+        self.cancel_search()
+
+        options = options or SearchOptions()
+        try:
+            matcher = TextMatcher(text, options)
+        except re.error as e:
+            self.error_occurred.emit(f"規則運算式錯誤: {str(e)}")
+            return False
+
+        self.query = text
+        self.results = SearchResults(text)
+
+        # 索引就緒時只搜尋候選頁面（索引以最寬鬆的正規化建立，候選頁面必定涵蓋所有結果）
+        pages = None
+        if self.index and not options.regex:
+            pages = self.index.search(text)
+        worker = SearchWorker(file_path, matcher, text_layers, start_page, pages)
+
+        # 只轉發目前搜尋的結果，已取消的搜尋在佇列中的信號一律忽略
+        worker.result_found.connect(
+            lambda page_num, hits, w=worker: self._on_result_found(w, page_num, hits)
+        )
+        worker.progress_updated.connect(
+            lambda current, total, w=worker: self._on_progress(w, current, total)
+        )
+        worker.search_completed.connect(
+            lambda count, w=worker: self._on_completed(w, count)
+        )
+        worker.error_occurred.connect(
+            lambda message, w=worker: self._on_error(w, message)
+        )
+
+        self.search_worker = worker
+        worker.start()
+        return True
+
+    def cancel_search(self):
+        """取消進行中的搜尋（不阻塞 GUI 執行緒）"""
+        worker = self.search_worker
+        self.search_worker = None
+        self._retire_worker(worker)
+
+    def build_index(self, file_path: str, text_layers: TextLayerCache):
+        """
+        在背景建立文件的搜尋索引（會捨棄舊索引）
+
+        Args:
+            file_path: PDF 檔案路徑
+            text_layers: 文件的文字層快取，建立索引時一併填入
+        """
+        self.cancel_index()
+        self.index = None
+
+        worker = IndexWorker(file_path, text_layers, self.ngram)
+        worker.index_ready.connect(lambda index, w=worker: self._on_index_ready(w, index))
+        worker.error_occurred.connect(lambda message, w=worker: self._on_error(w, message))
+        self.index_worker = worker
+        worker.start()
+
+    def cancel_index(self):
+        """取消建立中的索引"""
+        worker = self.index_worker
+        self.index_worker = None
+        self._retire_worker(worker)
+
+    def _retire_worker(self, worker: Optional[QThread]):
+        """要求執行緒取消，並保留參考直到結束"""
+        if not worker:
+            return
+        # 先連接 finished 再檢查狀態：檢查之後才結束的執行緒仍會觸發釋放
+        self._retired_workers.append(worker)
+        worker.finished.connect(lambda w=worker: self._release_worker(w))
+        if worker.isRunning():
+            worker.cancel()
+        else:
+            self._release_worker(worker)
+
+    def clear_results(self):
+        """取消搜尋並清除結果與索引"""
+        self.cancel_search()
+        self.cancel_index()
+        self.index = None
+        self.query = ""
+        self.results = SearchResults()
+
+    def is_searching(self) -> bool:
+        """是否有搜尋正在進行"""
+        return bool(self.search_worker and self.search_worker.isRunning())
+
+    def shutdown(self):
+        """停止所有搜尋並等待執行緒結束（關閉程式時使用）"""
+        self.cancel_search()
+        self.cancel_index()
+        for worker in list(self._retired_workers):
+            worker.wait()
+        self._retired_workers = []
+
+    def _release_worker(self, worker: QThread):
+        """釋放已結束的執行緒"""
+        if worker in self._retired_workers:
+            self._retired_workers.remove(worker)
+
+    def _on_result_found(self, worker: SearchWorker, page_num: int, hits: list):
+        """單頁結果"""
+        if worker is self.search_worker:
+            index = self.results.add_page_hits(page_num, hits)
+            self.results_found.emit(page_num, index, hits)
+
+    def _on_progress(self, worker: SearchWorker, current: int, total: int):
+        """搜尋進度"""
+        if worker is self.search_worker:
+            self.progress_updated.emit(current, total)
+
+    def _on_completed(self, worker: SearchWorker, count: int):
+        """搜尋完成"""
+        if worker is self.search_worker:
+            self.search_finished.emit(count)
+
+    def _on_index_ready(self, worker: IndexWorker, index: SearchIndex):
+        """索引建立完成"""
+        if worker is self.index_worker:
+            self.index = index
+            self.index_worker = None
+            self.index_ready.emit(index.page_count())
+
+    def _on_error(self, worker: QThread, message: str):
+        """搜尋錯誤"""
+        if worker is self.search_worker or worker is self.index_worker:
+            self.error_occurred.emit(message)
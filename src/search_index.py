@@ -0,0 +1,376 @@
+"""
+搜尋索引模組
+建立頁面文字的倒排索引，支援中日韓文字的 n-gram 斷詞，
+以及正規化（大小寫、全形半形、重音符號）與規則運算式比對
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Iterable, Tuple
+
+
+# 中日韓文字的 Unicode 範圍
+CJK_RANGES = (
+    (0x3040, 0x309F),    # 平假名
+    (0x30A0, 0x30FF),    # 片假名
+    (0x3400, 0x4DBF),    # CJK 擴充 A
+    (0x4E00, 0x9FFF),    # CJK 統一漢字
+    (0xAC00, 0xD7AF),    # 韓文音節
+    (0xF900, 0xFAFF),    # CJK 相容漢字
+    (0xFF66, 0xFF9F),    # 半形片假名
+    (0x20000, 0x2FA1F),  # CJK 擴充 B 以後
+)
+
+
+def is_cjk(char: str) -> bool:
+    """判斷字元是否為中日韓文字"""
+    code = ord(char)
+    for start, end in CJK_RANGES:
+        if start <= code <= end:
+            return True
+    return False
+
+
+_fold_cache: Dict[Tuple[str, bool, bool, bool], str] = {}
+
+
+def _fold_char(char: str, fold_case: bool, fold_width: bool, fold_diacritics: bool) -> str:
+    """正規化單一字元（結果可能為空字串或多個字元）"""
+    if char.isascii():
+        return char.lower() if fold_case else char
+
+    key = (char, fold_case, fold_width, fold_diacritics)
+    folded = _fold_cache.get(key)
+    if folded is None:
+        folded = char
+        if fold_width:
+            # NFKC：全形英數轉半形、半形片假名轉全形
+            folded = unicodedata.normalize("NFKC", folded)
+        if fold_diacritics:
+            decomposed = unicodedata.normalize("NFD", folded)
+            folded = unicodedata.normalize(
+                "NFC", "".join(c for c in decomposed if not unicodedata.combining(c))
+            )
+        if fold_case:
+            folded = folded.casefold()
+        _fold_cache[key] = folded
+    return folded
+
+
+def fold_text(text: str, fold_case: bool = True, fold_width: bool = True,
+              fold_diacritics: bool = True) -> Tuple[str, List[int]]:
+    """
+    正規化文字並保留位置對應
+
+    合併連續空白，並移除兩個中日韓字元之間的空白
+    （PDF 擷取的中文常在行尾斷行，斷行不應影響片語搜尋）
+
+    Args:
+        text: 原始文字
+        fold_case: 忽略大小寫
+        fold_width: 忽略全形/半形差異
+        fold_diacritics: 忽略重音符號
+
+    Returns:
+        (正規化文字, 每個正規化字元對應的原始文字索引)
+    """
+    chars = []
+    offsets = []
+    pending_space = -1
+    for i, char in enumerate(text):
+        if char.isspace():
+            if chars and pending_space < 0:
+                pending_space = i
+            continue
+
+        folded = _fold_char(char, fold_case, fold_width, fold_diacritics)
+        if not folded:
+            continue
+
+        if pending_space >= 0:
+            if not (is_cjk(chars[-1]) and is_cjk(folded[0])):
+                chars.append(" ")
+                offsets.append(pending_space)
+            pending_space = -1
+
+        for c in folded:
+            chars.append(c)
+            offsets.append(i)
+
+    return "".join(chars), offsets
+
+
+def normalize_for_search(text: str) -> str:
+    """正規化搜尋用文字（忽略大小寫、全形半形與重音符號）"""
+    return fold_text(text)[0]
+
+
+class SearchOptions:
+    """搜尋選項"""
+
+    def __init__(self, regex: bool = False, case_sensitive: bool = False,
+                 width_sensitive: bool = False, diacritic_sensitive: bool = False):
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        self.width_sensitive = width_sensitive
+        self.diacritic_sensitive = diacritic_sensitive
+
+    def fold_flags(self) -> Tuple[bool, bool, bool]:
+        """正規化旗標 (fold_case, fold_width, fold_diacritics)"""
+        return (not self.case_sensitive, not self.width_sensitive, not self.diacritic_sensitive)
+
+
+class TextMatcher:
+    """
+    文字比對器
+
+    在正規化後的文字上進行字面或規則運算式比對，
+    並將結果換算回原始文字的位置
+    """
+
+    def __init__(self, query: str, options: Optional[SearchOptions] = None):
+        """
+        Args:
+            query: 查詢文字或規則運算式
+
+        Raises:
+            re.error: 規則運算式語法錯誤
+        """
+        self.query = query
+        self.options = options or SearchOptions()
+        self.flags = self.options.fold_flags()
+
+        if self.options.regex:
+            self.needle = None
+            flags = re.IGNORECASE if not self.options.case_sensitive else 0
+            self.pattern = re.compile(self._fold_pattern(query), flags)
+        else:
+            self.needle = fold_text(query, *self.flags)[0]
+            self.pattern = None
+
+    def _fold_pattern(self, pattern: str) -> str:
+        """
+        正規化規則運算式中的非 ASCII 字元
+
+        正規化後若變成 ASCII（例如全形括號），需跳脫以免改變語法
+        """
+        _, fold_width, fold_diacritics = self.flags
+        parts = []
+        for char in pattern:
+            if char.isascii():
+                parts.append(char)
+                continue
+            folded = _fold_char(char, False, fold_width, fold_diacritics)
+            parts.append(re.escape(folded) if folded != char else char)
+        return "".join(parts)
+
+    def fold(self, text: str) -> Tuple[str, List[int]]:
+        """以此比對器的選項正規化文字"""
+        return fold_text(text, *self.flags)
+
+    def find_folded(self, folded: str, offsets: List[int]) -> List[Tuple[int, int]]:
+        """
+        在已正規化的文字中比對
+
+        Returns:
+            原始文字中的 (起點, 終點) 列表，終點不含
+        """
+        spans = []
+        if self.pattern is not None:
+            for match in self.pattern.finditer(folded):
+                if match.end() > match.start():
+                    spans.append((match.start(), match.end()))
+        elif self.needle:
+            start = folded.find(self.needle)
+            while start >= 0:
+                end = start + len(self.needle)
+                spans.append((start, end))
+                start = folded.find(self.needle, end)
+
+        return [(offsets[start], offsets[end - 1] + 1) for start, end in spans]
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        """
+        在原始文字中比對
+
+        Returns:
+            (起點, 終點) 列表，終點不含
+        """
+        folded, offsets = self.fold(text)
+        return self.find_folded(folded, offsets)
+
+
+def split_runs(text: str):
+    """
+    將文字切分為連續片段
+
+    Yields:
+        (類型, 片段, 是否從文字開頭開始, 是否延伸到文字結尾)
+        類型為 "cjk" 或 "word"
+    """
+    run_type = None
+    run_start = 0
+    for i, char in enumerate(text):
+        if is_cjk(char):
+            char_type = "cjk"
+        elif char.isalnum():
+            char_type = "word"
+        else:
+            char_type = None
+
+        if char_type != run_type:
+            if run_type:
+                yield run_type, text[run_start:i], run_start == 0, False
+            run_type = char_type
+            run_start = i
+
+    if run_type:
+        yield run_type, text[run_start:], run_start == 0, True
+
+
+def tokenize(text: str, ngram: int = 2) -> List[str]:
+    """
+    斷詞（文字需先經過 normalize_for_search）
+
+    拉丁文字以單詞為單位，中日韓文字以字元 n-gram 為單位；
+    長度不足 n 的中日韓片段以單字為詞
+
+    Args:
+        text: 正規化後的文字
+        ngram: 中日韓文字的 n-gram 長度（2 或 3）
+
+    Returns:
+        詞彙列表
+    """
+    tokens = []
+    for run_type, run, _, _ in split_runs(text):
+        if run_type == "word":
+            tokens.append(run)
+        elif len(run) < ngram:
+            tokens.extend(run)
+        else:
+            tokens.extend(run[i:i + ngram] for i in range(len(run) - ngram + 1))
+    return tokens
+
+
+def query_tokens(query: str, ngram: int = 2) -> List[str]:
+    """
+    產生查詢用的詞彙（查詢需先經過 normalize_for_search）
+
+    查詢邊緣的拉丁單詞可能只是文件單詞的一部分，因此不列入；
+    長度不足 n 的中日韓片段無法對應索引中的 n-gram，也不列入。
+    剩下的詞彙只用來縮小候選頁面，最終結果一律以頁面文字驗證
+    """
+    tokens = []
+    for run_type, run, at_start, at_end in split_runs(query):
+        if run_type == "word":
+            if not at_start and not at_end:
+                tokens.append(run)
+        elif len(run) >= ngram:
+            tokens.extend(run[i:i + ngram] for i in range(len(run) - ngram + 1))
+    return tokens
+
+
+class SearchIndex:
+    """
+    頁面文字倒排索引
+
+    以詞彙對應頁碼集合，查詢時先取各詞彙頁碼集合的交集作為候選頁面，
+    再以快取的頁面文字驗證片語是否確實出現
+    """
+
+    def __init__(self, ngram: int = 2):
+        self.ngram = ngram
+        self.page_texts: Dict[int, str] = {}  # 正規化後的頁面文字快取
+        self.postings: Dict[str, Set[int]] = {}
+
+    def add_page(self, page_num: int, text: str):
+        """
+        加入頁面文字
+
+        Args:
+            page_num: 頁碼
+            text: 頁面原始文字
+        """
+        if page_num in self.page_texts:
+            self.remove_page(page_num)
+
+        normalized = normalize_for_search(text)
+        self.page_texts[page_num] = normalized
+        for token in set(tokenize(normalized, self.ngram)):
+            self.postings.setdefault(token, set()).add(page_num)
+
+    def remove_page(self, page_num: int):
+        """移除頁面"""
+        normalized = self.page_texts.pop(page_num, None)
+        if normalized is None:
+            return
+        for token in set(tokenize(normalized, self.ngram)):
+            pages = self.postings.get(token)
+            if pages:
+                pages.discard(page_num)
+                if not pages:
+                    del self.postings[token]
+
+    def page_count(self) -> int:
+        """已索引的頁數"""
+        return len(self.page_texts)
+
+    def candidate_pages(self, query: str) -> Iterable[int]:
+        """
+        獲取可能包含查詢的頁面（未經驗證）
+
+        Args:
+            query: 正規化後的查詢
+        """
+        tokens = set(query_tokens(query, self.ngram))
+        if not tokens:
+            return self.page_texts.keys()
+
+        posting_sets = []
+        for token in tokens:
+            pages = self.postings.get(token)
+            if not pages:
+                return []
+            posting_sets.append(pages)
+
+        # 由最小的集合開始取交集
+        posting_sets.sort(key=len)
+        candidates = set(posting_sets[0])
+        for pages in posting_sets[1:]:
+            candidates &= pages
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: str, pages: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        搜尋片語
+
+        Args:
+            query: 查詢文字
+            pages: 限定搜尋的頁碼，None 表示全部
+
+        Returns:
+            包含查詢的頁碼列表（遞增排序）
+        """
+        normalized = normalize_for_search(query).strip()
+        if not normalized:
+            return []
+
+        candidates = self.candidate_pages(normalized)
+        if pages is not None:
+            candidates = set(candidates) & set(pages)
+
+        return sorted(
+            page_num for page_num in candidates
+            if normalized in self.page_texts[page_num]
+        )
+
+    def count_matches(self, query: str, page_num: int) -> int:
+        """計算頁面中查詢出現的次數"""
+        normalized = normalize_for_search(query).strip()
+        text = self.page_texts.get(page_num, "")
+        if not normalized or not text:
+            return 0
+        return text.count(normalized)
@@ -0,0 +1,323 @@
+"""
+文字分段模組
+將 PDF 頁面文字合併為段落並切分為句子，
+讓整份文件中重複的句子（頁首、頁尾、免責聲明等）只需翻譯一次
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .search_index import is_cjk
+
+
+# 句尾標點
+SENTENCE_END = ".!?;:。！？；：…"
+# 句尾可能跟隨的結尾符號
+CLOSING = "\"'”’)）」』]】"
+
+# 拉丁文字句子邊界：句尾標點（可接結尾符號）後接空白與大寫字母、數字或引號
+_LATIN_BOUNDARY = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[^\sa-z])")
+# 中日韓句子邊界：全形句尾標點（可接結尾符號）之後
+_CJK_BOUNDARY = re.compile(r"(?<=[。！？；…])[”’）」』】]*\s*")
+
+# 句點後不應斷句的常見縮寫
+ABBREVIATIONS = {
+    "e.g.", "i.e.", "etc.", "vs.", "cf.", "al.", "fig.", "figs.", "no.", "nos.",
+    "vol.", "pp.", "p.", "ed.", "eds.", "dr.", "mr.", "mrs.", "ms.", "prof.",
+    "sec.", "art.", "approx.", "inc.", "ltd.", "co.", "corp.", "jan.", "feb.",
+    "mar.", "apr.", "jun.", "jul.", "aug.", "sep.", "sept.", "oct.", "nov.", "dec.",
+}
+
+PARAGRAPH_SEPARATOR = "\n\n"
+
+# 切分過長文字時依序嘗試的邊界：段落、行、句子、空白
+_SPLIT_LEVELS = (
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?])\s+|(?<=[。！？；])"),
+    re.compile(r"\s+"),
+)
+
+
+def _join_lines(previous: str, line: str) -> str:
+    """合併同一段落的兩行（處理連字號斷字與中日韓文字）"""
+    if previous.endswith("-") and len(previous) > 1 and previous[-2].isalpha() and line[:1].islower():
+        return previous[:-1] + line
+    if is_cjk(previous[-1]) and is_cjk(line[0]):
+        return previous + line
+    return previous + " " + line
+
+
+def split_paragraphs(text: str, short_line_ratio: float = 0.7) -> List[str]:
+    """
+    將 PDF 擷取的文字合併為段落
+
+    PDF 文字在每個排版行尾都有換行；空行一定是段落邊界。
+    明顯短於一般行寬的行，若以句尾標點結束，或下一行以大寫字母、
+    數字開頭（標題、頁碼），也視為段落結尾
+
+    Args:
+        text: 頁面文字
+        short_line_ratio: 行長小於最長行的此比例時視為短行
+
+    Returns:
+        段落列表
+    """
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    longest = max((len(line) for line in lines), default=0)
+    short_limit = longest * short_line_ratio
+
+    paragraphs = []
+    current = ""
+    for i, line in enumerate(lines):
+        if not line:
+            if current:
+                paragraphs.append(current)
+                current = ""
+            continue
+
+        current = _join_lines(current, line) if current else line
+        if len(line) < short_limit:
+            next_line = lines[i + 1] if i + 1 < len(lines) else ""
+            ends_sentence = line.rstrip(CLOSING)[-1:] in SENTENCE_END
+            ends_heading = (line[-1].isalnum() and not is_cjk(line[-1])
+                            and (next_line[:1].isupper() or next_line[:1].isdigit()))
+            if ends_sentence or ends_heading:
+                paragraphs.append(current)
+                current = ""
+
+    if current:
+        paragraphs.append(current)
+    return paragraphs
+
+
+def _is_abbreviation(text: str) -> bool:
+    """判斷文字結尾是否為縮寫或單一字母的姓名縮寫"""
+    word = text.rsplit(None, 1)[-1].lower() if text.strip() else ""
+    word = word.lstrip("\"'“‘([")
+    return word in ABBREVIATIONS or (len(word) == 2 and word[0].isalpha() and word[1] == ".")
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    """
+    將段落切分為句子
+
+    Args:
+        paragraph: 段落文字（已合併為單行）
+
+    Returns:
+        句子列表
+    """
+    sentences = []
+    pieces = []
+    position = 0
+    for match in _CJK_BOUNDARY.finditer(paragraph):
+        if match.end() > position:
+            pieces.append(paragraph[position:match.end()].strip())
+            position = match.end()
+    pieces.append(paragraph[position:].strip())
+
+    for piece in pieces:
+        if not piece:
+            continue
+        start = 0
+        for match in _LATIN_BOUNDARY.finditer(piece):
+            if _is_abbreviation(piece[start:match.start()]):
+                continue
+            sentences.append(piece[start:match.end()].strip())
+            start = match.end()
+        rest = piece[start:].strip()
+        if rest:
+            sentences.append(rest)
+    return sentences
+
+
+def segment_text(text: str) -> List[Tuple[str, str]]:
+    """
+    將頁面文字切分為翻譯片段
+
+    Returns:
+        [(片段, 片段後的分隔字串)]，以 reassemble 組合回頁面
+    """
+    segments = []
+    for paragraph in split_paragraphs(text):
+        sentences = split_sentences(paragraph)
+        for i, sentence in enumerate(sentences):
+            if i == len(sentences) - 1:
+                separator = PARAGRAPH_SEPARATOR
+            elif is_cjk(sentence[-1]) or sentence[-1] in "。！？；…”’）」』】":
+                separator = ""
+            else:
+                separator = " "
+            segments.append((sentence, separator))
+
+    if segments:
+        segments[-1] = (segments[-1][0], "")
+    return segments
+
+
+def segment_key(segment: str) -> str:
+    """片段的去重鍵值（忽略空白差異）"""
+    return " ".join(segment.split())
+
+
+def needs_translation(segment: str) -> bool:
+    """不含任何文字的片段（頁碼、編號、符號）直接保留原文"""
+    return any(char.isalpha() for char in segment)
+
+
+def reassemble(segments: List[Tuple[str, str]], translations: Dict[str, str]) -> str:
+    """
+    以譯文組合回頁面
+
+    Args:
+        segments: segment_text 的結果
+        translations: {去重鍵值: 譯文}，沒有譯文的片段保留原文
+    """
+    parts = []
+    for segment, separator in segments:
+        parts.append(translations.get(segment_key(segment), segment))
+        parts.append(separator)
+    return "".join(parts)
+
+
+class DocumentSegments:
+    """
+    整份文件的翻譯片段
+
+    記錄每頁的片段，並整理出整份文件中不重複的片段
+    """
+
+    def __init__(self, page_texts: Iterable[str]):
+        self.pages: List[List[Tuple[str, str]]] = [segment_text(text) for text in page_texts]
+        self.page_keys: List[List[str]] = []  # 每頁需要翻譯的片段鍵值
+        self._unique: Dict[str, None] = {}  # 不重複的鍵值（保留第一次出現的順序）
+        self.total_segments = 0
+
+        for segments in self.pages:
+            keys = []
+            for segment, _ in segments:
+                if not needs_translation(segment):
+                    continue
+                key = segment_key(segment)
+                self._unique.setdefault(key)
+                keys.append(key)
+                self.total_segments += 1
+            self.page_keys.append(keys)
+
+    def unique_segments(self, pages: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        獲取不重複的片段（依第一次出現的順序）
+
+        Args:
+            pages: 限定頁碼順序，None 表示依頁碼順序
+        """
+        if pages is None:
+            return list(self._unique.keys())
+
+        seen = set()
+        result = []
+        for page_num in pages:
+            for key in self.page_keys[page_num]:
+                if key not in seen:
+                    seen.add(key)
+                    result.append(key)
+        return result
+
+    def duplicate_count(self) -> int:
+        """重複（不需再翻譯）的片段數"""
+        return self.total_segments - len(self._unique)
+
+    def page_ready(self, page_num: int, translations: Dict[str, str]) -> bool:
+        """頁面的所有片段是否都已翻譯"""
+        return all(key in translations for key in self.page_keys[page_num])
+
+    def assemble(self, page_num: int, translations: Dict[str, str]) -> str:
+        """組合單一頁面的譯文"""
+        return reassemble(self.pages[page_num], translations)
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+
+def _split_keep(text: str, pattern) -> List[str]:
+    """在符合的邊界切開文字，邊界保留在前一段的結尾（各段相接等於原文）"""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_long_text(text: str, max_chars: int, level: int = 0) -> List[str]:
+    """
+    將超過長度上限的文字切成多段
+
+    依序優先在段落、行、句子、空白處切開，
+    只有單一詞彙超過上限時才會在詞中切斷
+
+    Args:
+        text: 原文
+        max_chars: 每段字元數上限
+        level: 目前使用的邊界層級（遞迴用）
+
+    Returns:
+        文字段落列表，相接後等於原文
+    """
+    if len(text) <= max_chars:
+        return [text]
+    if level >= len(_SPLIT_LEVELS):
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+    chunks = []
+    current = ""
+    for piece in _split_keep(text, _SPLIT_LEVELS[level]):
+        if len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(split_long_text(piece, max_chars, level + 1))
+        elif len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def pack_segments(segments: List[str], max_chars: int, separator: str = "\n") -> List[List[int]]:
+    """
+    將片段依序打包為盡量少的請求
+
+    每個請求以 separator 連接片段，總長度不超過上限；
+    單一片段超過上限時自成一個請求（由 split_long_text 再切分）
+
+    Args:
+        segments: 片段列表（不可包含 separator）
+        max_chars: 每個請求的字元數上限
+        separator: 片段之間的分隔字串
+
+    Returns:
+        每個請求包含的片段索引列表
+    """
+    packs = []
+    current: List[int] = []
+    length = 0
+    for i, segment in enumerate(segments):
+        added = len(segment) + (len(separator) if current else 0)
+        if current and length + added > max_chars:
+            packs.append(current)
+            current = []
+            added = len(segment)
+            length = 0
+        current.append(i)
+        length += added
+    if current:
+        packs.append(current)
+    return packs
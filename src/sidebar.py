@@ -3,13 +3,15 @@
 提供縮圖、書籤和註解列表
 """
 
+import bisect
+from typing import List
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTabWidget, QListWidget,
                              QListWidgetItem, QLabel, QPushButton, QHBoxLayout,
                              QDialog, QLineEdit, QTextEdit, QDialogButtonBox,
                              QComboBox, QProgressBar, QGroupBox, QScrollArea, QButtonGroup,
                              QRadioButton)
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
-from PyQt6.QtGui import QIcon
+from PyQt6.QtGui import QIcon, QTextCursor
 
 
 class ThumbnailWidget(QWidget):
@@ -165,6 +167,108 @@ class AnnotationWidget(QWidget):
             self.annotation_selected.emit(page_num, annot_type)
 
 
+class SearchResultsWidget(QWidget):
+    """搜尋結果檢視"""
+    
+    hit_selected = pyqtSignal(int)  # 結果被選擇，參數為結果索引
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.current_index = -1
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """設定 UI"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        
+        # 導覽按鈕
+        nav_layout = QHBoxLayout()
+        
+        self.prev_btn = QPushButton("上一個")
+        self.prev_btn.clicked.connect(self.select_previous)
+        
+        self.next_btn = QPushButton("下一個")
+        self.next_btn.clicked.connect(self.select_next)
+        
+        nav_layout.addWidget(self.prev_btn)
+        nav_layout.addWidget(self.next_btn)
+        nav_layout.addStretch()
+        
+        # 結果數量
+        self.count_label = QLabel("")
+        self.count_label.setWordWrap(True)
+        
+        # 結果列表
+        self.result_list = QListWidget()
+        self.result_list.setWordWrap(True)
+        self.result_list.currentRowChanged.connect(self.on_current_row_changed)
+        
+        layout.addLayout(nav_layout)
+        layout.addWidget(self.count_label)
+        layout.addWidget(self.result_list)
+    
+    def insert_hits(self, index: int, hits: list):
+        """在指定索引插入結果項目"""
+        # 插入時維持目前選取的項目不變
+        self.result_list.blockSignals(True)
+        for offset, hit in enumerate(hits):
+            snippet = hit.snippet or ""
+            item = QListWidgetItem(f"頁 {hit.page_num + 1}: {snippet}")
+            self.result_list.insertItem(index + offset, item)
+        if 0 <= self.current_index and index <= self.current_index:
+            self.current_index += len(hits)
+            self.result_list.setCurrentRow(self.current_index)
+        self.result_list.blockSignals(False)
+        self.update_count_label()
+    
+    def clear_results(self):
+        """清除所有結果"""
+        self.result_list.blockSignals(True)
+        self.result_list.clear()
+        self.result_list.blockSignals(False)
+        self.current_index = -1
+        self.count_label.clear()
+    
+    def set_status(self, text: str):
+        """設定狀態文字"""
+        self.count_label.setText(text)
+    
+    def update_count_label(self):
+        """更新結果數量"""
+        total = self.result_list.count()
+        if self.current_index >= 0:
+            self.count_label.setText(f"第 {self.current_index + 1} / {total} 個結果")
+        else:
+            self.count_label.setText(f"共 {total} 個結果")
+    
+    def set_current_index(self, index: int):
+        """設定目前結果（不發射信號）"""
+        self.current_index = index
+        self.result_list.blockSignals(True)
+        self.result_list.setCurrentRow(index)
+        self.result_list.blockSignals(False)
+        self.update_count_label()
+    
+    def select_next(self):
+        """選擇下一個結果"""
+        total = self.result_list.count()
+        if total:
+            self.hit_selected.emit((self.current_index + 1) % total)
+    
+    def select_previous(self):
+        """選擇上一個結果"""
+        total = self.result_list.count()
+        if total:
+            index = self.current_index - 1 if self.current_index > 0 else total - 1
+            self.hit_selected.emit(index)
+    
+    def on_current_row_changed(self, row: int):
+        """列表選取變更"""
+        if row >= 0:
+            self.hit_selected.emit(row)
+
+
 class TranslationWidget(QWidget):
     """翻譯檢視"""
     
@@ -177,6 +281,8 @@ class TranslationWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.selected_text = ""
+        self.page_order: List[int] = []  # 已顯示譯文的頁碼（遞增）
+        self.page_lengths: List[int] = []  # 各頁譯文在文件中的長度（UTF-16 單位）
         self.setup_ui()
     
     def setup_ui(self):
@@ -311,6 +417,12 @@ class TranslationWidget(QWidget):
         self.status_label.setStyleSheet("color: #666;")
         main_layout.addWidget(self.status_label)
         
+        # 翻譯統計（快取命中率、請求數與延遲）
+        self.metrics_label = QLabel("")
+        self.metrics_label.setWordWrap(True)
+        self.metrics_label.setStyleSheet("color: #888; font-size: 11px;")
+        main_layout.addWidget(self.metrics_label)
+        
         # 添加彈性空間
         main_layout.addStretch()
     
@@ -331,6 +443,35 @@ class TranslationWidget(QWidget):
         """清除翻譯結果"""
         self.translation_text.clear()
         self.status_label.clear()
+        self.page_order = []
+        self.page_lengths = []
+    
+    def add_page_translation(self, page_num: int, text: str):
+        """
+        顯示單頁譯文（依頁碼順序插入，不重設整份內容）
+        
+        Args:
+            page_num: 頁碼（從 0 開始）
+            text: 譯文
+        """
+        if page_num in self.page_order:
+            return
+        
+        index = bisect.bisect(self.page_order, page_num)
+        chunk = f"─── 第 {page_num + 1} 頁 ───\n{text}\n\n"
+        position = sum(self.page_lengths[:index])
+        
+        cursor = QTextCursor(self.translation_text.document())
+        cursor.setPosition(position)
+        cursor.insertText(chunk)
+        
+        # QTextDocument 的位置以 UTF-16 為單位
+        self.page_order.insert(index, page_num)
+        self.page_lengths.insert(index, len(chunk.encode("utf-16-le")) // 2)
+    
+    def has_page_translations(self) -> bool:
+        """是否已逐頁顯示譯文"""
+        return bool(self.page_order)
     
     def show_progress(self, current: int, total: int):
         """顯示進度"""
@@ -339,11 +480,22 @@ class TranslationWidget(QWidget):
         self.progress_bar.setValue(current)
         self.status_label.setText(f"翻譯中... ({current}/{total})")
     
+    def show_busy(self):
+        """顯示無法預估進度的忙碌狀態"""
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.status_label.setText("翻譯中...")
+    
     def hide_progress(self):
         """隱藏進度"""
         self.progress_bar.setVisible(False)
         self.status_label.setText("翻譯完成")
     
+    def set_metrics(self, summary: str):
+        """顯示翻譯統計摘要"""
+        if self.metrics_label.text() != summary:
+            self.metrics_label.setText(summary)
+    
     def show_error(self, message: str):
         """顯示錯誤訊息"""
         self.status_label.setText(f"錯誤: {message}")
@@ -432,6 +584,10 @@ class Sidebar(QWidget):
         )
         self.tab_widget.addTab(self.annotation_widget, "註解")
         
+        # 搜尋分頁
+        self.search_widget = SearchResultsWidget()
+        self.tab_widget.addTab(self.search_widget, "搜尋")
+        
         # 翻譯分頁
         self.translation_widget = TranslationWidget()
         self.tab_widget.addTab(self.translation_widget, "翻譯")
@@ -450,6 +606,10 @@ class Sidebar(QWidget):
         """獲取註解元件"""
         return self.annotation_widget
     
+    def get_search_widget(self) -> SearchResultsWidget:
+        """獲取搜尋結果元件"""
+        return self.search_widget
+    
     def get_translation_widget(self) -> TranslationWidget:
         """獲取翻譯元件"""
         return self.translation_widget
@@ -0,0 +1,202 @@
+"""
+文字層模組
+快取頁面文字與每個字元的位置，讓文字位置可以直接換算回頁面矩形
+"""
+
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class PageTextLayer:
+    """
+    頁面文字層
+
+    保存頁面純文字，以及每個字元的矩形、所屬行號與區塊範圍。
+    換行字元不屬於任何行（行號為 -1），不會產生矩形
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.char_rects = array("f")  # 每個字元 4 個值 (x0, y0, x1, y1)
+        self.line_ids = array("i")  # 每個字元所屬的行號
+        self.blocks: List[Tuple[int, int, Tuple[float, float, float, float]]] = []  # (起點, 終點, 區塊矩形)
+        self._folded: Dict[Tuple[bool, bool, bool], Tuple[str, array]] = {}
+        self._folded_lock = threading.Lock()  # 索引與搜尋執行緒可能同時填入
+
+    @staticmethod
+    def from_page(page) -> 'PageTextLayer':
+        """從 PyMuPDF 頁面建立文字層"""
+        return PageTextLayer.from_rawdict(page.get_text("rawdict"))
+
+    @staticmethod
+    def from_rawdict(raw: dict) -> 'PageTextLayer':
+        """
+        從 page.get_text("rawdict") 的結果建立文字層
+
+        Args:
+            raw: rawdict 結構
+
+        Returns:
+            文字層物件
+        """
+        layer = PageTextLayer()
+        parts = []
+        line_id = 0
+
+        for block in raw.get("blocks", []):
+            if block.get("type", 0) != 0:
+                continue  # 略過圖片區塊
+
+            block_start = len(layer.line_ids)
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    for char in span.get("chars", []):
+                        parts.append(char["c"])
+                        layer.char_rects.extend(char["bbox"])
+                        layer.line_ids.append(line_id)
+                parts.append("\n")
+                layer.char_rects.extend((0.0, 0.0, 0.0, 0.0))
+                layer.line_ids.append(-1)
+                line_id += 1
+
+            block_end = len(layer.line_ids)
+            if block_end > block_start:
+                layer.blocks.append((block_start, block_end, tuple(block["bbox"])))
+
+        layer.text = "".join(parts)
+        return layer
+
+    def char_rect(self, index: int) -> Optional[Tuple[float, float, float, float]]:
+        """獲取單一字元的矩形，換行字元返回 None"""
+        if self.line_ids[index] < 0:
+            return None
+        base = index * 4
+        return tuple(self.char_rects[base:base + 4])
+
+    def rects_for_range(self, start: int, end: int) -> List[Tuple[float, float, float, float]]:
+        """
+        將文字範圍換算為頁面矩形（同一行的字元合併為一個矩形）
+
+        Args:
+            start: 起點索引
+            end: 終點索引（不含）
+
+        Returns:
+            矩形列表 [(x0, y0, x1, y1)]
+        """
+        rects = []
+        current_line = None
+        x0 = y0 = x1 = y1 = 0.0
+        rects_data = self.char_rects
+
+        for i in range(max(start, 0), min(end, len(self.line_ids))):
+            line_id = self.line_ids[i]
+            if line_id < 0:
+                continue
+            base = i * 4
+            cx0, cy0, cx1, cy1 = rects_data[base], rects_data[base + 1], rects_data[base + 2], rects_data[base + 3]
+            if line_id != current_line:
+                if current_line is not None:
+                    rects.append((x0, y0, x1, y1))
+                current_line = line_id
+                x0, y0, x1, y1 = cx0, cy0, cx1, cy1
+            else:
+                x0, y0 = min(x0, cx0), min(y0, cy0)
+                x1, y1 = max(x1, cx1), max(y1, cy1)
+
+        if current_line is not None:
+            rects.append((x0, y0, x1, y1))
+        return rects
+
+    def text_blocks(self) -> List[Tuple[str, Tuple[float, float, float, float]]]:
+        """
+        獲取每個文字區塊的文字與矩形
+
+        Returns:
+            [(區塊文字（各行以換行分隔）, 區塊矩形)]，順序與 blocks 相同
+        """
+        return [(self.text[start:end].rstrip("\n"), rect) for start, end, rect in self.blocks]
+
+    def snippet(self, start: int, end: int, radius: int = 30) -> str:
+        """獲取文字範圍前後的上下文摘要"""
+        snippet_start = max(0, start - radius)
+        snippet_end = min(len(self.text), end + radius)
+        snippet = " ".join(self.text[snippet_start:snippet_end].split())
+        if snippet_start > 0:
+            snippet = "…" + snippet
+        if snippet_end < len(self.text):
+            snippet += "…"
+        return snippet
+
+    def folded(self, matcher) -> Tuple[str, array]:
+        """
+        以比對器的選項正規化文字（結果依選項快取）
+
+        Args:
+            matcher: TextMatcher 物件
+        """
+        key = matcher.flags
+        with self._folded_lock:
+            cached = self._folded.get(key)
+        if cached is None:
+            # 在鎖外正規化；同時建立時保留先寫入的結果
+            folded, offsets = matcher.fold(self.text)
+            with self._folded_lock:
+                cached = self._folded.setdefault(key, (folded, array("i", offsets)))
+        return cached
+
+    def find(self, matcher) -> List[Tuple[int, int]]:
+        """
+        以比對器搜尋文字層
+
+        Returns:
+            (起點, 終點) 列表
+        """
+        folded, offsets = self.folded(matcher)
+        return matcher.find_folded(folded, offsets)
+
+
+class TextLayerCache:
+    """
+    文字層快取（執行緒安全）
+
+    由 GUI 執行緒與背景工作執行緒共用；各執行緒以自己開啟的文件建立文字層後寫入
+    """
+
+    def __init__(self):
+        self._layers: Dict[int, PageTextLayer] = {}
+        self._lock = threading.Lock()
+
+    def get(self, page_num: int) -> Optional[PageTextLayer]:
+        """獲取快取的文字層"""
+        with self._lock:
+            return self._layers.get(page_num)
+
+    def put(self, page_num: int, layer: PageTextLayer):
+        """寫入文字層"""
+        with self._lock:
+            self._layers[page_num] = layer
+
+    def get_or_build(self, page_num: int, document) -> PageTextLayer:
+        """
+        獲取文字層，若無快取則由文件頁面建立
+
+        Args:
+            page_num: 頁碼
+            document: 呼叫端執行緒自己開啟的 PyMuPDF 文件
+        """
+        layer = self.get(page_num)
+        if layer is None:
+            layer = PageTextLayer.from_page(document[page_num])
+            self.put(page_num, layer)
+        return layer
+
+    def clear(self):
+        """清除快取"""
+        with self._lock:
+            self._layers = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._layers)
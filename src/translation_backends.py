@@ -0,0 +1,374 @@
+"""
+翻譯後端模組
+定義翻譯後端介面，提供 Google、離線（僅快取）與 HTTP 後端，
+以及可設定延遲與失敗率的本機模擬翻譯伺服器（用於效能測試）
+
+用法（無介面）:
+    python -m src.translation_backends serve --latency 0.2 --failure-rate 0.1
+    python -m src.translation_backends bench --workers 1 4 8
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List
+
+from .rate_limiter import TokenBucket, RetryPolicy, call_with_retry
+
+
+class BackendError(Exception):
+    """翻譯後端錯誤"""
+
+
+class TransientBackendError(BackendError):
+    """暫時性錯誤（逾時、伺服器忙碌），值得重試"""
+
+
+class BackendUnavailable(BackendError):
+    """後端無法使用（例如離線模式）"""
+
+
+class TranslationBackend:
+    """
+    翻譯後端介面
+
+    子類別實作 translate；支援多段文字單次請求的後端另外實作 translate_batch
+    """
+
+    name = "base"
+    max_request_chars = 4500  # 單一請求的字元數上限
+    supports_batch = False  # translate_batch 是否以單一請求完成
+    requires_network = True
+
+    def supports(self, from_code: str, to_code: str) -> bool:
+        """是否能翻譯此語言對"""
+        return True
+
+    def translate(self, text: str, from_code: str, to_code: str) -> str:
+        """
+        翻譯單段文字
+
+        Raises:
+            BackendError: 翻譯失敗
+        """
+        raise NotImplementedError
+
+    def translate_batch(self, texts: List[str], from_code: str, to_code: str) -> List[str]:
+        """
+        翻譯多段文字
+
+        Returns:
+            與輸入順序相同的譯文列表
+
+        Raises:
+            BackendError: 翻譯失敗或結果數量不符
+        """
+        return [self.translate(text, from_code, to_code) for text in texts]
+
+    def capabilities(self) -> dict:
+        """後端能力與限制"""
+        return {
+            "name": self.name,
+            "max_request_chars": self.max_request_chars,
+            "supports_batch": self.supports_batch,
+            "requires_network": self.requires_network,
+        }
+
+
+class GoogleBackend(TranslationBackend):
+    """
+    Google 翻譯後端（deep-translator）
+
+    多段文字以換行連接後單次送出，再依換行拆回
+    """
+
+    name = "google"
+    max_request_chars = 4500
+    supports_batch = True
+
+    def translate(self, text: str, from_code: str, to_code: str) -> str:
+        import requests
+        from deep_translator import GoogleTranslator
+        from deep_translator import exceptions
+        try:
+            return GoogleTranslator(source=from_code, target=to_code).translate(text)
+        except (exceptions.TooManyRequests, exceptions.RequestError, exceptions.ServerException,
+                requests.ConnectionError, requests.Timeout) as e:
+            raise TransientBackendError(str(e) or type(e).__name__) from e
+        except (exceptions.BaseError, requests.RequestException) as e:
+            # 不支援的語言、無效或過長的內容、找不到譯文等，重試也不會成功
+            raise BackendError(str(e) or type(e).__name__) from e
+
+    def translate_batch(self, texts: List[str], from_code: str, to_code: str) -> List[str]:
+        if len(texts) == 1:
+            return [self.translate(texts[0], from_code, to_code)]
+        result = self.translate("\n".join(texts), from_code, to_code)
+        lines = [line.strip() for line in result.split("\n") if line.strip()]
+        if len(lines) != len(texts):
+            raise BackendError(f"合併翻譯的行數不符（{len(lines)}/{len(texts)}）")
+        return lines
+
+
+class OfflineBackend(TranslationBackend):
+    """離線後端：不送出任何請求，只能使用快取"""
+
+    name = "offline"
+    requires_network = False
+
+    def supports(self, from_code: str, to_code: str) -> bool:
+        return False
+
+    def translate(self, text: str, from_code: str, to_code: str) -> str:
+        raise BackendUnavailable("離線模式：無法翻譯新文字（未在快取中）")
+
+
+class HttpBackend(TranslationBackend):
+    """
+    HTTP 翻譯後端（LibreTranslate 相容介面）
+
+    POST {base_url}/translate，內容為 {"q": [...], "source": ..., "target": ...}，
+    回應為 {"translatedText": [...]}
+    """
+
+    name = "http"
+    supports_batch = True
+
+    def __init__(self, base_url: str, timeout: float = 10.0, max_request_chars: int = 5000,
+                 api_key: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_request_chars = max_request_chars
+        self.api_key = api_key
+
+    def _post(self, texts: List[str], from_code: str, to_code: str) -> List[str]:
+        payload = {"q": texts, "source": from_code, "target": to_code, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        request = urllib.request.Request(
+            f"{self.base_url}/translate",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if e.code == 429 or e.code >= 500:
+                raise TransientBackendError(f"HTTP {e.code}") from e
+            raise BackendError(f"HTTP {e.code}") from e
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise TransientBackendError(str(e)) from e
+
+        translated = data.get("translatedText")
+        if isinstance(translated, str):
+            translated = [translated]
+        if not isinstance(translated, list) or len(translated) != len(texts):
+            raise BackendError("回應格式不符")
+        return translated
+
+    def translate(self, text: str, from_code: str, to_code: str) -> str:
+        return self._post([text], from_code, to_code)[0]
+
+    def translate_batch(self, texts: List[str], from_code: str, to_code: str) -> List[str]:
+        return self._post(texts, from_code, to_code)
+
+
+class MockTranslationServer:
+    """
+    本機模擬翻譯伺服器
+
+    提供與 HttpBackend 相同的介面，以設定的延遲回應，
+    並依失敗率隨機回傳 503；譯文為「[目標語言] 原文」
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05,
+                 failure_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            host: 監聽位址
+            port: 監聽埠號，0 表示自動選擇
+            latency: 每個請求的延遲秒數
+            failure_rate: 回傳 503 的機率（0 ~ 1）
+            seed: 隨機種子（重現失敗順序用）
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.request_count = 0
+        self.failure_count = 0
+        self.segment_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                texts = body.get("q", [])
+                if isinstance(texts, str):
+                    texts = [texts]
+
+                with server._lock:
+                    server.request_count += 1
+                    failed = server._random.random() < server.failure_rate
+                    if failed:
+                        server.failure_count += 1
+                    else:
+                        server.segment_count += len(texts)
+
+                time.sleep(server.latency)
+                if failed:
+                    self.send_error(503, "Service Unavailable")
+                    return
+
+                target = body.get("target", "")
+                response = json.dumps(
+                    {"translatedText": [f"[{target}] {text}" for text in texts]}
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, format, *args):
+                pass  # 不輸出每個請求的紀錄
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """伺服器網址"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockTranslationServer':
+        """在背景執行緒啟動伺服器"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止伺服器"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    判斷錯誤是否值得重試
+
+    只重試後端回報的暫時性錯誤與網路錯誤（逾時、連線中斷）；
+    永久錯誤與未知的例外（例如程式錯誤）不重試
+    """
+    return isinstance(error, (TransientBackendError, TimeoutError, ConnectionError))
+
+
+def run_benchmark(backend: TranslationBackend, segments: List[str], workers: int,
+                  batch_size: int = 1, rate: float = 1000.0,
+                  policy: Optional[RetryPolicy] = None) -> dict:
+    """
+    以執行緒池、速率限制與重試翻譯片段，量測耗時
+
+    Args:
+        backend: 翻譯後端
+        segments: 片段列表
+        workers: 同時請求數
+        batch_size: 每個請求包含的片段數
+        rate: 每秒請求數上限
+        policy: 重試策略
+
+    Returns:
+        統計資料 {elapsed, requests, retries, failed}
+    """
+    bucket = TokenBucket(rate=rate)
+    policy = policy or RetryPolicy(base_delay=0.05, max_delay=1.0)
+    stats = {"retries": 0, "failed": 0}
+    lock = threading.Lock()
+    batches = [segments[i:i + batch_size] for i in range(0, len(segments), batch_size)]
+
+    def on_retry(attempt, error):
+        with lock:
+            stats["retries"] += 1
+
+    def send(batch):
+        def request():
+            bucket.acquire()
+            return backend.translate_batch(batch, "en", "zh-TW")
+        try:
+            return call_with_retry(request, policy, is_transient, on_retry)
+        except Exception:
+            with lock:
+                stats["failed"] += 1
+            return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(send, batches))
+    stats["elapsed"] = time.perf_counter() - start
+    stats["requests"] = len(batches)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列入口"""
+    parser = argparse.ArgumentParser(description="模擬翻譯伺服器與效能測試")
+    parser.add_argument("--latency", type=float, default=0.1, help="每個請求的延遲秒數")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="請求失敗率（0 ~ 1）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="啟動模擬伺服器")
+    serve_parser.add_argument("--port", type=int, default=5000, help="監聽埠號")
+
+    bench_parser = subparsers.add_parser("bench", help="以模擬伺服器比較不同設定")
+    bench_parser.add_argument("--segments", type=int, default=200, help="片段數量")
+    bench_parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="同時請求數")
+    bench_parser.add_argument("--batch-size", type=int, default=1, help="每個請求的片段數")
+    bench_parser.add_argument("--rate", type=float, default=1000.0, help="每秒請求數上限")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        server = MockTranslationServer(port=args.port, latency=args.latency,
+                                       failure_rate=args.failure_rate)
+        print(f"模擬翻譯伺服器: {server.url}")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+        return 0
+
+    segments = [f"Sentence number {i}." for i in range(args.segments)]
+    with MockTranslationServer(latency=args.latency, failure_rate=args.failure_rate, seed=0) as server:
+        backend = HttpBackend(server.url)
+        for workers in args.workers:
+            stats = run_benchmark(backend, segments, workers, args.batch_size, args.rate)
+            print(
+                f"workers={workers:<3} 耗時 {stats['elapsed']:.2f} 秒，請求 {stats['requests']}，"
+                f"重試 {stats['retries']}，失敗 {stats['failed']}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+翻譯快取模組
+以內容雜湊為鍵值，將翻譯結果保存在 SQLite 資料庫中
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Optional, Dict, Iterable, Tuple
+
+
+DEFAULT_CACHE_FILE = Path.home() / ".pdfreader_translation_cache.db"
+
+
+def normalize_source_text(text: str) -> str:
+    """
+    正規化原文（產生快取鍵值用）
+
+    統一 Unicode 組合形式，並去除每行行尾與整段前後的空白，
+    讓只差在空白的相同文字對應到同一筆快取
+    """
+    text = unicodedata.normalize("NFC", text)
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    return "\n".join(lines)
+
+
+def make_cache_key(text: str, from_code: str, to_code: str) -> str:
+    """
+    生成快取鍵值
+
+    使用 SHA-256 而非 hash()：hash() 每次啟動都會隨機化，
+    重新啟動後快取將永遠無法命中
+
+    Args:
+        text: 原文
+        from_code: 來源語言代碼
+        to_code: 目標語言代碼
+
+    Returns:
+        快取鍵值
+    """
+    digest = hashlib.sha256(normalize_source_text(text).encode("utf-8")).hexdigest()
+    return f"{from_code}:{to_code}:{digest}"
+
+
+class TranslationCache:
+    """
+    翻譯快取
+
+    以 SQLite 保存，查詢只讀取單筆資料，不需把整個快取載入記憶體。
+    新的翻譯先放在記憶體中，累積一定筆數或時間後以單一交易寫入；
+    資料庫使用 WAL 日誌，寫入中途被中止也不會損壞既有快取。
+
+    資料庫在第一次使用時才開啟；超過筆數上限時依最近使用（LRU）
+    或使用次數（LFU）淘汰，較長的內容以 zlib 壓縮保存。
+    連線可跨執行緒使用，所有存取以鎖保護
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS translations (
+            key TEXT PRIMARY KEY,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            source TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            created_at REAL NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    # 舊版資料庫缺少的欄位 (名稱, 定義)
+    EXTRA_COLUMNS = (
+        ("last_used", "REAL NOT NULL DEFAULT 0"),
+        ("hits", "INTEGER NOT NULL DEFAULT 0"),
+        ("compressed", "INTEGER NOT NULL DEFAULT 0"),
+    )
+
+    POLICY_LRU = "lru"
+    POLICY_LFU = "lfu"
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 64,
+                 flush_interval: float = 2.0, max_entries: int = 500000,
+                 policy: str = "lru", compress_threshold: int = 256):
+        """
+        Args:
+            db_path: 資料庫路徑
+            batch_size: 累積多少筆未寫入的翻譯後寫入
+            flush_interval: 距上次寫入超過幾秒後寫入
+            max_entries: 快取筆數上限，0 表示不限制
+            policy: 淘汰策略，"lru" 或 "lfu"
+            compress_threshold: 原文加譯文超過多少字元時壓縮
+        """
+        self.db_path = str(db_path or DEFAULT_CACHE_FILE)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.policy = policy if policy in (self.POLICY_LRU, self.POLICY_LFU) else self.POLICY_LRU
+        self.compress_threshold = compress_threshold
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Tuple] = {}  # 尚未寫入的資料列
+        self._touches: Dict[str, Tuple[float, int]] = {}  # 尚未寫入的使用紀錄 {鍵值: (時間, 次數)}
+        self._last_flush = time.monotonic()
+        self._estimated_count = 0
+        self.connection: Optional[sqlite3.Connection] = None
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """第一次使用時開啟資料庫"""
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(self.SCHEMA)
+
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(translations)")}
+            for name, definition in self.EXTRA_COLUMNS:
+                if name not in columns:
+                    self.connection.execute(f"ALTER TABLE translations ADD COLUMN {name} {definition}")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_lru ON translations (last_used)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_lfu ON translations (hits, last_used)"
+            )
+            self.connection.commit()
+            self._estimated_count = self.connection.execute(
+                "SELECT COUNT(*) FROM translations"
+            ).fetchone()[0]
+            self._closed = False
+        return self.connection
+
+    def _encode(self, source: str, translation: str) -> Tuple:
+        """編碼儲存內容（較長時壓縮）"""
+        if len(source) + len(translation) >= self.compress_threshold:
+            return (zlib.compress(source.encode("utf-8")),
+                    zlib.compress(translation.encode("utf-8")), 1)
+        return (source, translation, 0)
+
+    @staticmethod
+    def decode_value(value, compressed: int) -> str:
+        """解碼儲存內容"""
+        if compressed:
+            return zlib.decompress(value).decode("utf-8")
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查詢快取
+
+        Args:
+            key: 快取鍵值（make_cache_key）
+
+        Returns:
+            翻譯結果，沒有快取則返回 None
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending:
+                return pending[4]
+            row = self._connect().execute(
+                "SELECT translation, compressed FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+
+            # 使用紀錄與新翻譯一起批次寫入，查詢時不寫資料庫
+            _, hits = self._touches.get(key, (0.0, 0))
+            self._touches[key] = (time.time(), hits + 1)
+            if len(self._touches) >= self.batch_size * 4:
+                self.flush()
+        return self.decode_value(row[0], row[1])
+
+    def put(self, key: str, source: str, translation: str, from_code: str, to_code: str):
+        """
+        寫入快取
+
+        Args:
+            key: 快取鍵值
+            source: 原文
+            translation: 譯文
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+        """
+        with self._lock:
+            self._pending[key] = (key, from_code, to_code, source, translation, time.time())
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+
+    def flush(self):
+        """將尚未寫入的翻譯與使用紀錄以單一交易寫入資料庫"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if (not self._pending and not self._touches) or self._closed:
+                return
+
+            rows = []
+            for key, from_code, to_code, source, translation, created_at in self._pending.values():
+                stored_source, stored_translation, compressed = self._encode(source, translation)
+                rows.append((key, from_code, to_code, stored_source, stored_translation,
+                             created_at, created_at, 0, compressed))
+            touches = [(used, hits, key) for key, (used, hits) in self._touches.items()]
+
+            connection = self._connect()
+            try:
+                # 已存在的鍵值會被取代而非新增，不計入筆數
+                keys = [row[0] for row in rows]
+                existing = connection.execute(
+                    f"SELECT COUNT(*) FROM translations WHERE key IN ({', '.join('?' * len(keys))})", keys
+                ).fetchone()[0] if keys else 0
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO translations (key, source_lang, target_lang, source, "
+                        "translation, created_at, last_used, hits, compressed) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                    )
+                    connection.executemany(
+                        "UPDATE translations SET last_used = ?, hits = hits + ? WHERE key = ?", touches
+                    )
+                self._pending = {}
+                self._touches = {}
+                self._estimated_count += len(rows) - existing
+            except sqlite3.Error as e:
+                print(f"儲存快取失敗: {e}")
+                return
+
+            if self.max_entries and self._estimated_count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """淘汰超過上限的快取（一次淘汰到上限的 90%，避免每次寫入都淘汰）"""
+        connection = self._connect()
+        count = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        self._estimated_count = count
+        if count <= self.max_entries:
+            return
+
+        remove = count - int(self.max_entries * 0.9)
+        if self.policy == self.POLICY_LFU:
+            order = "hits ASC, last_used ASC"
+        else:
+            order = "last_used ASC"
+        with connection:
+            connection.execute(
+                f"DELETE FROM translations WHERE key IN "
+                f"(SELECT key FROM translations ORDER BY {order} LIMIT ?)", (remove,)
+            )
+        self._estimated_count = count - remove
+
+    def iter_entries(self, from_code: Optional[str] = None, to_code: Optional[str] = None):
+        """
+        逐筆讀取快取內容（不一次載入全部）
+
+        Yields:
+            (鍵值, 來源語言, 目標語言, 原文, 譯文)
+        """
+        self.flush()
+        query = "SELECT key, source_lang, target_lang, source, translation, compressed FROM translations"
+        conditions = []
+        params = []
+        if from_code:
+            conditions.append("source_lang = ?")
+            params.append(from_code)
+        if to_code:
+            conditions.append("target_lang = ?")
+            params.append(to_code)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        with self._lock:
+            cursor = self._connect().execute(query, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for key, source_lang, target_lang, source, translation, compressed in rows:
+                yield (key, source_lang, target_lang,
+                       self.decode_value(source, compressed),
+                       self.decode_value(translation, compressed))
+
+    def merge(self, entries: Iterable[Tuple[str, str, str, str]], batch_size: int = 500) -> int:
+        """
+        合併外部的翻譯（例如翻譯快取包）
+
+        逐批寫入，不需把全部內容載入記憶體；鍵值由原文重新計算，
+        本機已有的翻譯保留不覆寫
+
+        Args:
+            entries: 可迭代的 (來源語言, 目標語言, 原文, 譯文)
+            batch_size: 每個交易寫入的筆數
+
+        Returns:
+            新增的筆數
+        """
+        self.flush()
+        added = 0
+        batch = []
+
+        def write():
+            nonlocal added
+            with self._lock:
+                connection = self._connect()
+                before = connection.total_changes
+                with connection:
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO translations (key, source_lang, target_lang, source, "
+                        "translation, created_at, last_used, hits, compressed) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch
+                    )
+                added += connection.total_changes - before
+
+        now = time.time()
+        for from_code, to_code, source, translation in entries:
+            stored_source, stored_translation, compressed = self._encode(source, translation)
+            batch.append((make_cache_key(source, from_code, to_code), from_code, to_code,
+                          stored_source, stored_translation, now, now, 0, compressed))
+            if len(batch) >= batch_size:
+                write()
+                batch = []
+        if batch:
+            write()
+
+        with self._lock:
+            self._estimated_count += added
+            if self.max_entries and self._estimated_count > self.max_entries:
+                self._evict()
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        """是否有此快取（不記錄使用，不影響淘汰順序）"""
+        with self._lock:
+            if key in self._pending:
+                return True
+            return self._connect().execute(
+                "SELECT 1 FROM translations WHERE key = ?", (key,)
+            ).fetchone() is not None
+
+    def count(self) -> int:
+        """快取筆數"""
+        with self._lock:
+            self.flush()
+            return self._connect().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def clear(self):
+        """清除所有快取"""
+        with self._lock:
+            self._pending = {}
+            self._touches = {}
+            connection = self._connect()
+            connection.execute("DELETE FROM translations")
+            connection.commit()
+            self._estimated_count = 0
+
+    def close(self):
+        """寫入未儲存的翻譯並關閉資料庫"""
+        with self._lock:
+            self.flush()
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+            self._closed = True
@@ -0,0 +1,266 @@
+"""
+翻譯匯出模組
+將文件匯出為翻譯後的 PDF：每頁的文字區塊以譯文覆寫在原本的位置
+
+擷取、翻譯、寫入三個階段以有界佇列串接，同時只有少數頁面在處理中，
+不論文件多長，文字與譯文佔用的記憶體都維持固定
+"""
+
+import html
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import fitz
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .segmenter import pack_segments
+from .text_layer import PageTextLayer, TextLayerCache
+from .translation_overlay import block_segments, assemble_block
+
+
+# 目標語言使用的 PDF 內建字型（其餘語言使用 Helvetica，只支援拉丁字母）
+EXPORT_FONTS = {
+    "zh-TW": "china-t",
+    "zh-CN": "china-s",
+    "ja": "japan",
+    "ko": "korea",
+}
+
+_END = object()  # 佇列結束標記
+
+
+class TranslationExportWorker(QThread):
+    """
+    翻譯後 PDF 匯出執行緒
+
+    擷取執行緒逐頁讀取文字區塊，翻譯階段以翻譯管理器翻譯（使用快取，
+    未快取的句子打包後同時送出），本執行緒依頁碼順序覆寫並儲存
+    """
+
+    progress_updated = pyqtSignal(int, int, float)  # 已完成頁數, 總頁數, 每秒頁數
+    export_completed = pyqtSignal(str, int, int)  # 匯出完成 (輸出路徑, 翻譯失敗的句子數, 譯文放不下的區塊數)
+    error_occurred = pyqtSignal(str)  # 錯誤發生
+
+    MIN_FONT_SIZE = 4.0  # 譯文縮小的下限（點）
+
+    def __init__(self, file_path: str, output_path: str, from_code: str, to_code: str,
+                 translation_manager, text_layers: Optional[TextLayerCache] = None,
+                 queue_size: int = 4):
+        """
+        Args:
+            file_path: 來源 PDF 路徑
+            output_path: 輸出 PDF 路徑
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+            translation_manager: 翻譯管理器
+            text_layers: 已建立的文字層快取（沒有快取的頁面臨時建立，不寫入快取）
+            queue_size: 各階段之間最多等待的頁數
+        """
+        super().__init__()
+        self.file_path = file_path
+        self.output_path = output_path
+        self.from_code = from_code
+        self.to_code = to_code
+        self.translation_manager = translation_manager
+        self.text_layers = text_layers
+        self.queue_size = queue_size
+        self.cancel_event = threading.Event()
+        self.failed = 0  # 翻譯失敗的句子數（保留原文）
+        self.overflowed = 0  # 最小字級仍放不下、超出原區塊的區塊數
+
+    def cancel(self):
+        """要求取消匯出（進行中的請求完成後停止，不寫出檔案）"""
+        self.cancel_event.set()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """放入佇列（佇列滿時等待），取消時返回 False"""
+        while not self.cancel_event.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """取出佇列項目，取消時返回結束標記"""
+        while not self.cancel_event.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _extract(self, output: queue.Queue):
+        """擷取階段：逐頁讀取文字區塊 (頁碼, [(區塊文字, 區塊矩形)])"""
+        document = None
+        try:
+            # MuPDF 文件不可跨執行緒共用，各階段自行開啟一份
+            document = fitz.open(self.file_path)
+            for page_num in range(len(document)):
+                layer = self.text_layers.get(page_num) if self.text_layers else None
+                if layer is None:
+                    layer = PageTextLayer.from_page(document[page_num])
+                blocks = [(text, rect) for text, rect in layer.text_blocks() if text.strip()]
+                if not self._put(output, (page_num, blocks)):
+                    return
+        except Exception as e:
+            self._put(output, e)
+        finally:
+            if document:
+                document.close()
+            self._put(output, _END)
+
+    def _translate_page(self, executor: ThreadPoolExecutor,
+                        blocks: List[Tuple[str, tuple]]) -> List[Tuple[tuple, str]]:
+        """翻譯單頁的區塊，失敗的句子保留原文"""
+        manager = self.translation_manager
+        segmented, segments = block_segments(text for text, _ in blocks)
+        translations: Dict[str, str] = {}
+        uncached = []
+        for segment in segments:
+            cached = manager.get_cached(segment, self.from_code, self.to_code)
+            if cached is not None:
+                translations[segment] = cached
+            else:
+                uncached.append(segment)
+
+        def translate_pack(pack):
+            manager.bind_cancel_event(self.cancel_event)
+            return manager.translate_packed(pack, self.from_code, self.to_code, raise_errors=True)
+
+        packs = [[uncached[i] for i in pack]
+                 for pack in pack_segments(uncached, manager.max_request_chars)]
+        futures = [(pack, executor.submit(translate_pack, pack)) for pack in packs]
+        for pack, future in futures:
+            try:
+                translations.update(zip(pack, future.result()))
+            except Exception as e:
+                if self.cancel_event.is_set():
+                    break
+                print(f"匯出翻譯請求失敗: {e}")
+                self.failed += len(pack)
+
+        return [(rect, assemble_block(segments, translations))
+                for (_, rect), segments in zip(blocks, segmented)]
+
+    def _translate(self, source: queue.Queue, output: queue.Queue):
+        """翻譯階段：(頁碼, [(區塊矩形, 譯文)])"""
+        workers = max(1, self.translation_manager.max_concurrency)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as executor:
+                while True:
+                    item = self._get(source)
+                    if item is _END or isinstance(item, Exception):
+                        self._put(output, item)
+                        if item is _END:
+                            return
+                        continue
+                    page_num, blocks = item
+                    if not self._put(output, (page_num, self._translate_page(executor, blocks))):
+                        return
+        except Exception as e:
+            self._put(output, e)
+            self._put(output, _END)
+        finally:
+            self.translation_manager.flush_cache()
+
+    def _write_page(self, page, blocks: List[Tuple[tuple, str]]):
+        """以譯文覆寫頁面的文字區塊"""
+        if not blocks:
+            return
+        for rect, _ in blocks:
+            page.add_redact_annot(fitz.Rect(rect), fill=False)
+        # 只移除文字：不填色（保留底色與網底），保留圖片與向量圖形（表格線、底線）
+        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE,
+                              graphics=fitz.PDF_REDACT_LINE_ART_NONE)
+
+        fontname = EXPORT_FONTS.get(self.to_code, "helv")
+        rects = [fitz.Rect(rect) for rect, _ in blocks]
+        for rect, (_, text) in zip(rects, blocks):
+            # 由預設字級開始縮小，直到譯文放得進區塊（最小字級仍放不下時交給 _write_overflow）
+            fontsize = 11.0
+            while fontsize >= self.MIN_FONT_SIZE:
+                if page.insert_textbox(rect, text, fontname=fontname, fontsize=fontsize) >= 0:
+                    break
+                fontsize *= 0.85
+            else:
+                self._write_overflow(page, rect, text, fontname, self._free_bottom(page, rect, rects))
+
+    @staticmethod
+    def _free_bottom(page, rect, rects: List) -> float:
+        """區塊下方可延伸到的位置：下一個水平重疊的區塊頂端，沒有則為頁面底部"""
+        bottom = page.rect.y1
+        for other in rects:
+            if other is rect or other.y0 < rect.y1:
+                continue
+            if other.x0 < rect.x1 and other.x1 > rect.x0:
+                bottom = min(bottom, other.y0)
+        return bottom
+
+    def _write_overflow(self, page, rect, text: str, fontname: str, bottom: float):
+        """
+        以最小字級寫入放不下的譯文
+
+        原文已被移除，不能略過：先讓區塊向下延伸到 bottom（不蓋到下方區塊），
+        仍放不下時在原區塊內等比例縮小；兩者都計為放不下的區塊
+        """
+        self.overflowed += 1
+        if bottom > rect.y1:
+            extended = fitz.Rect(rect.x0, rect.y0, rect.x1, bottom)
+            if page.insert_textbox(extended, text, fontname=fontname, fontsize=self.MIN_FONT_SIZE) >= 0:
+                return
+        page.insert_htmlbox(rect, html.escape(text).replace("\n", "<br>"), scale_low=0)
+
+    def run(self):
+        """執行匯出"""
+        document = None
+        try:
+            extracted = queue.Queue(maxsize=self.queue_size)
+            translated = queue.Queue(maxsize=self.queue_size)
+            stages = [
+                threading.Thread(target=self._extract, args=(extracted,), daemon=True),
+                threading.Thread(target=self._translate, args=(extracted, translated), daemon=True),
+            ]
+            for stage in stages:
+                stage.start()
+
+            # 輸出文件以來源文件為底，逐頁覆寫
+            document = fitz.open(self.file_path)
+            total = len(document)
+            done = 0
+            start = time.perf_counter()
+            try:
+                while True:
+                    item = self._get(translated)
+                    if item is _END:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    page_num, blocks = item
+                    self._write_page(document[page_num], blocks)
+                    done += 1
+                    # 釋放已完成頁面的解析快取（修改後的內容保留在文件中直到儲存）
+                    fitz.TOOLS.store_shrink(100)
+                    elapsed = time.perf_counter() - start
+                    self.progress_updated.emit(done, total, done / elapsed if elapsed > 0 else 0.0)
+            finally:
+                # 寫入階段結束（包含出錯）時通知其他階段停止
+                if done < total:
+                    self.cancel_event.set()
+                for stage in stages:
+                    stage.join()
+
+            if self.cancel_event.is_set():
+                return
+            document.save(self.output_path, garbage=3, deflate=True)
+            self.export_completed.emit(self.output_path, self.failed, self.overflowed)
+
+        except Exception as e:
+            self.error_occurred.emit(f"匯出翻譯失敗: {str(e)}")
+        finally:
+            if document:
+                document.close()
@@ -0,0 +1,173 @@
+"""
+翻譯工作模組
+將整份文件的翻譯進度逐句保存在 SQLite 中，程式關閉或網路中斷後可從中斷處繼續
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_JOB_FILE = Path.home() / ".pdfreader_translation_jobs.db"
+
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"  # 被取消，可繼續
+STATUS_INCOMPLETE = "incomplete"  # 已執行完畢但有句子失敗
+
+
+def make_job_id(file_path: str, from_code: str, to_code: str) -> str:
+    """
+    生成工作編號
+
+    以路徑、檔案大小與修改時間識別文件（不需讀取整個檔案），
+    文件內容改變後會成為新的工作
+    """
+    stat = os.stat(file_path)
+    identity = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{from_code}|{to_code}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+
+class TranslationJobStore:
+    """
+    翻譯工作紀錄
+
+    每個工作記錄已完成句子的譯文；每完成一個請求即以單一交易寫入，
+    中斷時最多損失進行中的請求
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            file_path TEXT NOT NULL,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS job_segments (
+            job_id TEXT NOT NULL,
+            segment TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            PRIMARY KEY (job_id, segment)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = str(db_path or DEFAULT_JOB_FILE)
+        self.connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """第一次使用時開啟資料庫"""
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(self.SCHEMA)
+        return self.connection
+
+    def start(self, job_id: str, file_path: str, from_code: str, to_code: str,
+              total: int) -> Dict[str, str]:
+        """
+        開始或繼續工作
+
+        Args:
+            job_id: 工作編號（make_job_id）
+            file_path: 文件路徑
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+            total: 需要翻譯的句子數
+
+        Returns:
+            已完成的 {句子: 譯文}
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(job_id) DO UPDATE SET status = excluded.status, "
+                    "total = excluded.total, updated_at = excluded.updated_at",
+                    (job_id, file_path, from_code, to_code, STATUS_RUNNING, total, now, now)
+                )
+            rows = connection.execute(
+                "SELECT segment, translation FROM job_segments WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def record(self, job_id: str, items: Iterable[Tuple[str, str]]):
+        """記錄完成的句子（單一交易）"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO job_segments VALUES (?, ?, ?)",
+                    [(job_id, segment, translation) for segment, translation in items]
+                )
+                connection.execute(
+                    "UPDATE jobs SET updated_at = ? WHERE job_id = ?", (time.time(), job_id)
+                )
+
+    def set_status(self, job_id: str, status: str):
+        """更新工作狀態"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                    (status, time.time(), job_id)
+                )
+
+    def finish(self, job_id: str):
+        """工作完成，刪除紀錄（譯文已在翻譯快取中）"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM job_segments WHERE job_id = ?", (job_id,))
+                connection.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def progress(self, job_id: str) -> Optional[Tuple[str, int, int]]:
+        """
+        查詢工作進度
+
+        Returns:
+            (狀態, 已完成句子數, 句子總數)，沒有此工作則返回 None
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT status, total FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            done = connection.execute(
+                "SELECT COUNT(*) FROM job_segments WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+        return row[0], done, row[1]
+
+    def unfinished_jobs(self) -> List[Tuple[str, str, str, str, str]]:
+        """
+        未完成的工作
+
+        Returns:
+            [(工作編號, 文件路徑, 來源語言, 目標語言, 狀態)]
+        """
+        with self._lock:
+            return self._connect().execute(
+                "SELECT job_id, file_path, source_lang, target_lang, status FROM jobs "
+                "ORDER BY updated_at DESC"
+            ).fetchall()
+
+    def close(self):
+        """關閉資料庫"""
+        with self._lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
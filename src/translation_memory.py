@@ -0,0 +1,394 @@
+"""
+翻譯記憶模組
+以樣板（數字、日期替換為佔位符）比對只差在數字或日期的句子，
+並以 MinHash 區段索引找出相似度高的既有翻譯
+"""
+
+import re
+import random
+import sqlite3
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_MEMORY_FILE = Path.home() / ".pdfreader_translation_memory.db"
+
+# 可替換的詞彙：日期、時間、版本號與數字
+VALUE_PATTERN = re.compile(
+    r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}"    # 2024-01-31
+    r"|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}"  # 31/01/2024
+    r"|\d{1,2}:\d{2}(?::\d{2})?"         # 12:30
+    r"|\d+(?:[.,]\d+)*"                  # 1,234.5、3.2.1
+)
+PLACEHOLDER = "␟"  # 樣板中的佔位符
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def make_template(text: str) -> Tuple[str, List[str]]:
+    """
+    將文字轉為樣板
+
+    合併空白，並把日期、時間、數字替換為佔位符
+
+    Returns:
+        (樣板, 依序被替換的值)
+    """
+    text = " ".join(text.split())
+    values = VALUE_PATTERN.findall(text)
+    return VALUE_PATTERN.sub(PLACEHOLDER, text), values
+
+
+def fill_translation(translation: str, old_values: List[str], new_values: List[str]) -> Optional[str]:
+    """
+    以新的值替換既有譯文中的舊值
+
+    每個改變的舊值必須在譯文中恰好出現一次（作為完整的數值），
+    否則無法確定替換位置，返回 None
+
+    Args:
+        translation: 既有譯文
+        old_values: 既有原文的值
+        new_values: 新原文的值
+
+    Returns:
+        新譯文，無法安全替換時返回 None
+    """
+    if len(old_values) != len(new_values):
+        return None
+
+    changes = {}
+    for old, new in zip(old_values, new_values):
+        if old == new:
+            continue
+        if changes.get(old, new) != new:
+            return None  # 同一個舊值對應到不同的新值
+        changes[old] = new
+    if not changes:
+        return translation
+
+    spans = [(m.start(), m.end(), m.group()) for m in VALUE_PATTERN.finditer(translation)]
+    counts: Dict[str, int] = {}
+    for _, _, value in spans:
+        counts[value] = counts.get(value, 0) + 1
+    if any(counts.get(old, 0) != 1 for old in changes):
+        return None
+
+    parts = []
+    position = 0
+    for start, end, value in spans:
+        if value in changes:
+            parts.append(translation[position:start])
+            parts.append(changes[value])
+            position = end
+    parts.append(translation[position:])
+    return "".join(parts)
+
+
+def trigrams(text: str) -> set:
+    """字元三元組集合（用於相似度計算）"""
+    text = f"  {text.casefold()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def jaccard(a: set, b: set) -> float:
+    """Jaccard 相似度"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash 簽章（以固定種子產生排列，跨次啟動結果相同）"""
+
+    def __init__(self, num_perm: int = 32, bands: int = 8):
+        """
+        Args:
+            num_perm: 雜湊函數數量
+            bands: 區段數（num_perm 需可被整除）；區段越多越容易找到相似度較低的候選
+        """
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        generator = random.Random(20240131)
+        self.params = [
+            (generator.randrange(1, _MERSENNE_PRIME), generator.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, grams: set) -> List[int]:
+        """計算 MinHash 簽章"""
+        hashes = [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+                  for g in grams] or [0]
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self.params]
+
+    def band_keys(self, signature: List[int]) -> List[int]:
+        """將簽章切為區段，每個區段雜湊為一個桶號"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(repr(chunk).encode("ascii"), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+
+class TranslationMemory:
+    """
+    翻譯記憶
+
+    以樣板雜湊保存既有翻譯：樣板相同（只差在空白、數字或日期）且能安全替換時直接套用；
+    相似但不同的句子以 MinHash 區段找出候選，再以三元組 Jaccard 相似度排序，
+    相似度達 auto_threshold 時直接套用，其餘只作為參考。
+    資料庫在第一次使用時才開啟，寫入批次進行；超過筆數上限時淘汰最舊的翻譯
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS memory (
+            key TEXT PRIMARY KEY,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            source TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            created_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS memory_bands (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (band, bucket, key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS memory_created ON memory (created_at);
+        CREATE INDEX IF NOT EXISTS memory_bands_key ON memory_bands (key);
+    """
+
+    def __init__(self, db_path: Optional[str] = None, threshold: float = 0.8,
+                 batch_size: int = 64, auto_threshold: Optional[float] = None,
+                 max_entries: int = 500000):
+        """
+        Args:
+            db_path: 資料庫路徑
+            threshold: 相似句子的最低相似度
+            batch_size: 累積多少筆後寫入
+            auto_threshold: 相似句子直接套用的最低相似度，None（預設）表示只作為參考
+                （長句中插入否定詞的相似度仍可高於 0.97，無法以門檻排除）
+            max_entries: 筆數上限，0 表示不限制
+        """
+        self.db_path = str(db_path or DEFAULT_MEMORY_FILE)
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.auto_threshold = auto_threshold
+        self.max_entries = max_entries
+        self.hasher = MinHasher()
+        self.connection: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Tuple] = {}
+        self._estimated_count = 0
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """第一次使用時開啟資料庫"""
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(self.SCHEMA)
+            self._estimated_count = self.connection.execute(
+                "SELECT COUNT(*) FROM memory"
+            ).fetchone()[0]
+        return self.connection
+
+    @staticmethod
+    def _key(template: str, from_code: str, to_code: str) -> str:
+        digest = hashlib.sha256(template.encode("utf-8")).hexdigest()
+        return f"{from_code}:{to_code}:{digest}"
+
+    def add(self, source: str, translation: str, from_code: str, to_code: str):
+        """
+        加入翻譯
+
+        Args:
+            source: 原文
+            translation: 譯文
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+        """
+        if not source.strip() or not translation.strip():
+            return
+        template, _ = make_template(source)
+        key = self._key(template, from_code, to_code)
+        with self._lock:
+            self._pending[key] = (key, from_code, to_code, " ".join(source.split()),
+                                  translation, time.time())
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """將累積的翻譯以單一交易寫入"""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = list(self._pending.values())
+            bands = []
+            for key, _, _, source, _, _ in rows:
+                template, _ = make_template(source)
+                signature = self.hasher.signature(trigrams(template))
+                bands.extend((band, bucket, key)
+                             for band, bucket in enumerate(self.hasher.band_keys(signature)))
+
+            connection = self._connect()
+            try:
+                keys = [row[0] for row in rows]
+                existing = connection.execute(
+                    f"SELECT COUNT(*) FROM memory WHERE key IN ({', '.join('?' * len(keys))})", keys
+                ).fetchone()[0]
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO memory VALUES (?, ?, ?, ?, ?, ?)", rows
+                    )
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO memory_bands VALUES (?, ?, ?)", bands
+                    )
+                self._pending = {}
+                self._estimated_count += len(rows) - existing
+            except sqlite3.Error as e:
+                print(f"儲存翻譯記憶失敗: {e}")
+                return
+
+            if self.max_entries and self._estimated_count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """淘汰最舊的翻譯（一次淘汰到上限的 90%，與翻譯快取相同）"""
+        connection = self._connect()
+        count = connection.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+        self._estimated_count = count
+        if count <= self.max_entries:
+            return
+
+        remove = count - int(self.max_entries * 0.9)
+        keys = [(key,) for (key,) in connection.execute(
+            "SELECT key FROM memory ORDER BY created_at ASC LIMIT ?", (remove,)
+        )]
+        with connection:
+            connection.executemany("DELETE FROM memory WHERE key = ?", keys)
+            connection.executemany("DELETE FROM memory_bands WHERE key = ?", keys)
+        self._estimated_count = count - len(keys)
+
+    def _get(self, key: str) -> Optional[Tuple[str, str]]:
+        """以鍵值查詢 (原文, 譯文)"""
+        pending = self._pending.get(key)
+        if pending:
+            return pending[3], pending[4]
+        row = self._connect().execute(
+            "SELECT source, translation FROM memory WHERE key = ?", (key,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def lookup(self, text: str, from_code: str, to_code: str) -> Optional[str]:
+        """
+        查詢只差在空白、數字或日期的既有翻譯並套用新的值
+
+        Returns:
+            新譯文，沒有可安全套用的翻譯則返回 None
+        """
+        template, values = make_template(text)
+        with self._lock:
+            entry = self._get(self._key(template, from_code, to_code))
+        if entry is None:
+            return None
+        source, translation = entry
+        _, old_values = make_template(source)
+        return fill_translation(translation, old_values, values)
+
+    def recall(self, text: str, from_code: str, to_code: str) -> Optional[str]:
+        """
+        查詢可直接套用的既有翻譯
+
+        先以樣板完全比對（lookup），沒有時才使用 recall_similar
+
+        Returns:
+            譯文，沒有可套用的翻譯則返回 None
+        """
+        remembered = self.lookup(text, from_code, to_code)
+        if remembered is not None:
+            return remembered
+        return self.recall_similar(text, from_code, to_code)
+
+    def recall_similar(self, text: str, from_code: str, to_code: str) -> Optional[str]:
+        """
+        使用相似度達 auto_threshold 的句子（auto_threshold 為 None 時不套用）
+
+        相似句子的數值必須能安全替換（fill_translation），否則不套用；
+        結果不是同一句的翻譯，呼叫端不應以新句子的鍵值寫入快取
+
+        Returns:
+            譯文，沒有可套用的翻譯則返回 None
+        """
+        if self.auto_threshold is None:
+            return None
+        matches = self.suggest(text, from_code, to_code, limit=1, threshold=self.auto_threshold)
+        if not matches:
+            return None
+        _, source, translation = matches[0]
+        return fill_translation(translation, make_template(source)[1], make_template(text)[1])
+
+    def suggest(self, text: str, from_code: str, to_code: str, limit: int = 3,
+                threshold: Optional[float] = None) -> List[Tuple[float, str, str]]:
+        """
+        查詢相似的既有翻譯
+
+        Args:
+            threshold: 最低相似度，None 表示使用 self.threshold
+
+        Returns:
+            [(相似度, 原文, 譯文)]，依相似度遞減排序
+        """
+        if threshold is None:
+            threshold = self.threshold
+        template, _ = make_template(text)
+        grams = trigrams(template)
+        band_keys = self.hasher.band_keys(self.hasher.signature(grams))
+        prefix = f"{from_code}:{to_code}:"
+
+        with self._lock:
+            connection = self._connect()
+            # 尚未寫入的翻譯沒有區段索引，直接逐筆比較（不為了查詢而寫入）
+            candidates = {key for key in self._pending if key.startswith(prefix)}
+            for band, bucket in enumerate(band_keys):
+                for (key,) in connection.execute(
+                    "SELECT key FROM memory_bands WHERE band = ? AND bucket = ?", (band, bucket)
+                ):
+                    if key.startswith(prefix):
+                        candidates.add(key)
+
+            results = []
+            for key in candidates:
+                entry = self._get(key)
+                if entry is None:
+                    continue
+                score = jaccard(grams, trigrams(make_template(entry[0])[0]))
+                if score >= threshold:
+                    results.append((score, entry[0], entry[1]))
+
+        results.sort(key=lambda item: -item[0])
+        return results[:limit]
+
+    def clear(self):
+        """清除翻譯記憶"""
+        with self._lock:
+            self._pending = {}
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM memory")
+                connection.execute("DELETE FROM memory_bands")
+            self._estimated_count = 0
+
+    def close(self):
+        """寫入並關閉資料庫"""
+        with self._lock:
+            self.flush()
+            if self.connection:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,202 @@
+"""
+翻譯統計模組
+記錄請求數、快取命中率、送出的字元數、重試與失敗次數，
+以及各翻譯後端的請求延遲分布（用於調整速率限制與評估快取效益）
+"""
+
+import math
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+
+class LatencyHistogram:
+    """
+    延遲直方圖
+
+    以等比例的區間計數，記憶體固定且不保存每筆資料；
+    百分位數以區間上界估計（相對誤差不超過區間比例）
+    """
+
+    def __init__(self, min_seconds: float = 0.001, max_seconds: float = 120.0, factor: float = 1.2):
+        """
+        Args:
+            min_seconds: 第一個區間的上界
+            max_seconds: 最後一個有限區間的上界（超過者歸入溢位區間）
+            factor: 相鄰區間上界的比例
+        """
+        self.bounds: List[float] = []
+        bound = min_seconds
+        while bound < max_seconds:
+            self.bounds.append(bound)
+            bound *= factor
+        self.bounds.append(max_seconds)
+        self.counts = [0] * (len(self.bounds) + 1)  # 最後一個為溢位區間
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """記錄一筆延遲"""
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        估計百分位數
+
+        Args:
+            p: 百分位（0 ~ 100）
+
+        Returns:
+            延遲秒數，沒有資料則返回 None
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index >= len(self.bounds):
+                    return self.max
+                return min(self.bounds[index], self.max)
+        return self.max
+
+    def mean(self) -> Optional[float]:
+        """平均延遲"""
+        return self.total / self.count if self.count else None
+
+
+class BackendStats:
+    """單一翻譯後端的統計"""
+
+    def __init__(self):
+        self.requests = 0  # 送出的請求（含重試）
+        self.errors = 0  # 失敗的請求（含之後重試成功者）
+        self.characters = 0  # 成功送出的字元數
+        self.latency = LatencyHistogram()  # 成功請求的延遲
+
+
+class TranslationMetrics:
+    """
+    翻譯統計（執行緒安全）
+
+    快取查詢、後端請求、重試與最終失敗分開計數，
+    快取命中率 = (快取命中 + 翻譯記憶命中) / 查詢次數
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清除所有統計"""
+        with self._lock:
+            self.cache_hits = 0
+            self.memory_hits = 0
+            self.cache_misses = 0
+            self.retries = 0
+            self.failures = 0  # 重試後仍失敗的翻譯
+            self.backends: Dict[str, BackendStats] = {}
+
+    def record_lookup(self, hit: bool, from_memory: bool = False):
+        """記錄一次快取查詢"""
+        with self._lock:
+            if not hit:
+                self.cache_misses += 1
+            elif from_memory:
+                self.memory_hits += 1
+            else:
+                self.cache_hits += 1
+
+    def record_request(self, backend: str, characters: int, seconds: float, ok: bool = True):
+        """記錄一次後端請求"""
+        with self._lock:
+            stats = self.backends.setdefault(backend, BackendStats())
+            stats.requests += 1
+            if ok:
+                stats.characters += characters
+                stats.latency.record(seconds)
+            else:
+                stats.errors += 1
+
+    def record_retry(self):
+        """記錄一次重試"""
+        with self._lock:
+            self.retries += 1
+
+    def record_failure(self):
+        """記錄一次最終失敗"""
+        with self._lock:
+            self.failures += 1
+
+    def hit_ratio(self) -> Optional[float]:
+        """快取命中率，沒有查詢則返回 None"""
+        with self._lock:
+            lookups = self.cache_hits + self.memory_hits + self.cache_misses
+            return (self.cache_hits + self.memory_hits) / lookups if lookups else None
+
+    def snapshot(self) -> dict:
+        """
+        獲取目前的統計
+
+        Returns:
+            {cache_hits, memory_hits, cache_misses, hit_ratio, requests, characters,
+             retries, failures, backends: {名稱: {requests, errors, characters,
+             mean, p50, p90, p99, max}}}（延遲單位為秒）
+        """
+        hit_ratio = self.hit_ratio()
+        with self._lock:
+            backends = {}
+            for name, stats in self.backends.items():
+                latency = stats.latency
+                backends[name] = {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "characters": stats.characters,
+                    "mean": latency.mean(),
+                    "p50": latency.percentile(50),
+                    "p90": latency.percentile(90),
+                    "p99": latency.percentile(99),
+                    "max": latency.max if latency.count else None,
+                }
+            return {
+                "cache_hits": self.cache_hits,
+                "memory_hits": self.memory_hits,
+                "cache_misses": self.cache_misses,
+                "hit_ratio": hit_ratio,
+                "requests": sum(stats.requests for stats in self.backends.values()),
+                "characters": sum(stats.characters for stats in self.backends.values()),
+                "retries": self.retries,
+                "failures": self.failures,
+                "backends": backends,
+            }
+
+    def summary(self) -> str:
+        """統計摘要（顯示於翻譯面板）"""
+        data = self.snapshot()
+        lookups = data["cache_hits"] + data["memory_hits"] + data["cache_misses"]
+        if not lookups and not data["requests"]:
+            return ""
+        lines = []
+        if data["hit_ratio"] is not None:
+            lines.append(
+                f"快取命中 {data['hit_ratio']:.0%}（{data['cache_hits'] + data['memory_hits']}/{lookups}，"
+                f"翻譯記憶 {data['memory_hits']}）"
+            )
+        lines.append(
+            f"請求 {data['requests']}，字元 {data['characters']:,}，"
+            f"重試 {data['retries']}，失敗 {data['failures']}"
+        )
+        for name, stats in data["backends"].items():
+            if stats["p50"] is None:
+                lines.append(f"{name}: 錯誤 {stats['errors']}")
+                continue
+            lines.append(
+                f"{name}: p50 {stats['p50'] * 1000:.0f} ms，p90 {stats['p90'] * 1000:.0f} ms，"
+                f"p99 {stats['p99'] * 1000:.0f} ms"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,113 @@
+"""
+翻譯疊加模組
+以文字層的區塊為單位翻譯頁面，譯文依區塊矩形疊加顯示在頁面上；
+只翻譯可見的區塊，譯文依 (頁碼, 語言對) 快取
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .segmenter import segment_text, segment_key, needs_translation, reassemble
+
+
+Rect = Tuple[float, float, float, float]
+
+
+def intersects(a: Rect, b: Rect) -> bool:
+    """兩個矩形 (x0, y0, x1, y1) 是否重疊"""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def visible_blocks(blocks: List[Tuple[str, Rect]], visible_rect: Optional[Rect],
+                   margin: float = 0.0) -> List[int]:
+    """
+    找出與可見範圍重疊的區塊
+
+    Args:
+        blocks: [(區塊文字, 區塊矩形)]（PDF 座標）
+        visible_rect: 可見範圍（PDF 座標），None 表示整頁
+        margin: 可見範圍向外擴展的距離（預先翻譯即將捲動到的區塊）
+
+    Returns:
+        需要翻譯的區塊索引（不含沒有文字的區塊）
+    """
+    if visible_rect is not None:
+        x0, y0, x1, y1 = visible_rect
+        visible_rect = (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+    return [
+        index for index, (text, rect) in enumerate(blocks)
+        if text.strip() and (visible_rect is None or intersects(rect, visible_rect))
+    ]
+
+
+def block_segments(texts: Iterable[str]) -> Tuple[List[List[Tuple[str, str]]], List[str]]:
+    """
+    將區塊文字切分為句子
+
+    Returns:
+        (每個區塊的 segment_text 結果, 所有區塊中不重複且需要翻譯的句子)
+    """
+    segmented = []
+    unique: Dict[str, None] = {}
+    for text in texts:
+        segments = segment_text(text)
+        segmented.append(segments)
+        for segment, _ in segments:
+            if needs_translation(segment):
+                unique.setdefault(segment_key(segment))
+    return segmented, list(unique)
+
+
+def assemble_block(segments: List[Tuple[str, str]], translations: Dict[str, str]) -> str:
+    """組合區塊譯文（段落之間以單一換行分隔，適合在區塊矩形內換行顯示）"""
+    return reassemble(segments, translations).replace("\n\n", "\n")
+
+
+class TranslationOverlayCache:
+    """
+    區塊譯文快取（執行緒安全）
+
+    以 (頁碼, 來源語言, 目標語言) 為鍵值保存 {區塊索引: 譯文}，
+    只保留最近使用的頁面
+    """
+
+    def __init__(self, max_pages: int = 64):
+        self.max_pages = max_pages
+        self._pages: "OrderedDict[Tuple[int, str, str], Dict[int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, page_num: int, from_code: str, to_code: str) -> Dict[int, str]:
+        """獲取頁面已翻譯的區塊 {區塊索引: 譯文}"""
+        key = (page_num, from_code, to_code)
+        with self._lock:
+            blocks = self._pages.get(key)
+            if blocks is None:
+                return {}
+            self._pages.move_to_end(key)
+            return dict(blocks)
+
+    def missing(self, page_num: int, from_code: str, to_code: str,
+                indices: Iterable[int]) -> List[int]:
+        """尚未翻譯的區塊索引"""
+        with self._lock:
+            blocks = self._pages.get((page_num, from_code, to_code), {})
+            return [index for index in indices if index not in blocks]
+
+    def put(self, page_num: int, from_code: str, to_code: str, translations: Dict[int, str]):
+        """寫入區塊譯文"""
+        key = (page_num, from_code, to_code)
+        with self._lock:
+            self._pages.setdefault(key, {}).update(translations)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def clear(self):
+        """清除快取（開啟其他文件時）"""
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pages)
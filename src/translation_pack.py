@@ -0,0 +1,127 @@
+"""
+翻譯快取包模組
+將翻譯快取匯出為可攜帶的檔案（gzip 壓縮的 JSON Lines），
+在沒有網路的電腦上匯入後即可離線使用
+
+檔案第一行為標頭，其後每行一筆翻譯；讀寫都逐行進行，不需把整個快取包載入記憶體
+"""
+
+import os
+import gzip
+import json
+import time
+import zlib
+import hashlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+PACK_FORMAT = "pdfreader-translation-pack"
+PACK_VERSION = 1
+PACK_EXTENSION = ".tpack.gz"
+
+
+def document_fingerprint(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    文件指紋（檔案內容的 SHA-256）
+
+    與路徑和修改時間無關，複製到其他電腦的同一份文件指紋相同
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_pack(path: str, entries: Iterable[Tuple[str, str, str, str]],
+               metadata: Optional[dict] = None) -> int:
+    """
+    寫入翻譯快取包
+
+    先寫入暫存檔，完成後才取代目標檔案，中途失敗不會留下不完整的快取包
+
+    Args:
+        path: 輸出路徑
+        entries: 可迭代的 (來源語言, 目標語言, 原文, 譯文)
+        metadata: 記錄在標頭的資訊（文件名稱、指紋、語言對等）
+
+    Returns:
+        寫入的筆數
+    """
+    header = {"format": PACK_FORMAT, "version": PACK_VERSION, "created_at": time.time()}
+    header.update(metadata or {})
+    temp_path = path + ".part"
+    count = 0
+    try:
+        with gzip.open(temp_path, "wt", encoding="utf-8") as stream:
+            stream.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for from_code, to_code, source, translation in entries:
+                stream.write(json.dumps({
+                    "source_lang": from_code,
+                    "target_lang": to_code,
+                    "source": source,
+                    "translation": translation,
+                }, ensure_ascii=False) + "\n")
+                count += 1
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
+
+
+ENTRY_FIELDS = ("source_lang", "target_lang", "source", "translation")
+
+
+def _parse_entry(line: str, line_number: int) -> Tuple[str, str, str, str]:
+    """解析一行翻譯，欄位缺少或不是字串時拋出 ValueError"""
+    try:
+        entry = json.loads(line)
+        values = tuple(entry[field] for field in ENTRY_FIELDS)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"翻譯快取包第 {line_number} 行格式錯誤") from e
+    if not all(isinstance(value, str) for value in values):
+        raise ValueError(f"翻譯快取包第 {line_number} 行格式錯誤")
+    return values
+
+
+def _iter_entries(stream) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    逐行讀取翻譯（讀完後關閉檔案）
+
+    Raises:
+        ValueError: 格式錯誤或檔案損毀（例如下載不完整）
+    """
+    with stream:
+        try:
+            for line_number, line in enumerate(stream, 2):
+                if line.strip():
+                    yield _parse_entry(line, line_number)
+        except (EOFError, zlib.error, gzip.BadGzipFile, UnicodeDecodeError) as e:
+            raise ValueError("翻譯快取包已損毀") from e
+
+
+def read_pack(path: str) -> Tuple[dict, Iterator[Tuple[str, str, str, str]]]:
+    """
+    讀取翻譯快取包
+
+    Returns:
+        (標頭, 逐筆產生 (來源語言, 目標語言, 原文, 譯文) 的迭代器)
+
+    Raises:
+        ValueError: 不是翻譯快取包或版本不支援
+    """
+    stream = gzip.open(path, "rt", encoding="utf-8")
+    try:
+        header = json.loads(stream.readline() or "null")
+    except (OSError, ValueError, EOFError, zlib.error) as e:
+        stream.close()
+        raise ValueError("不是有效的翻譯快取包") from e
+    if not isinstance(header, dict) or header.get("format") != PACK_FORMAT:
+        stream.close()
+        raise ValueError("不是有效的翻譯快取包")
+    if header.get("version", 0) > PACK_VERSION:
+        stream.close()
+        raise ValueError(f"不支援的翻譯快取包版本: {header.get('version')}")
+    return header, _iter_entries(stream)
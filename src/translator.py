@@ -3,74 +3,305 @@
 提供線上和離線翻譯功能
 """
 
-from deep_translator import GoogleTranslator
-from typing import Optional, List, Tuple, Callable
-from PyQt6.QtCore import QObject, pyqtSignal, QThread
 import os
-import pickle
-from pathlib import Path
-
-# 嘗試匯入離線翻譯模組（使用 googletrans 的離線快取）
-try:
-    from googletrans import Translator as GoogletransTranslator
-    GOOGLETRANS_AVAILABLE = True
-except ImportError:
-    GOOGLETRANS_AVAILABLE = False
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Iterable, List, Tuple, Callable
+from PyQt6.QtCore import QObject, pyqtSignal, QThread
+from .translation_cache import TranslationCache, make_cache_key
+from .translation_memory import TranslationMemory
+from .translation_job import TranslationJobStore, make_job_id, STATUS_PAUSED, STATUS_INCOMPLETE
+from .rate_limiter import TokenBucket, RetryPolicy, call_with_retry
+from .segmenter import DocumentSegments, pack_segments, split_long_text
+from .translation_backends import (TranslationBackend, GoogleBackend, OfflineBackend,
+                                   BackendUnavailable, is_transient)
+from .offline_engine import MarianBackend, is_engine_available
+from .translation_overlay import TranslationOverlayCache, block_segments, assemble_block
+from .translation_metrics import TranslationMetrics
+from .language_detect import detect_document_language
+from .translation_pack import write_pack, read_pack, document_fingerprint
 
 # 離線翻譯快取
 OFFLINE_AVAILABLE = True  # 使用快取式離線翻譯
 
 
+class TranslationCancelled(Exception):
+    """翻譯工作被取消"""
+
+
 class TranslationWorker(QThread):
     """翻譯工作執行緒"""
     
     progress_updated = pyqtSignal(int, int)  # 當前進度, 總數
+    page_translated = pyqtSignal(int, str)  # 單頁翻譯完成 (頁碼, 譯文)
     translation_completed = pyqtSignal(str)  # 翻譯完成
     error_occurred = pyqtSignal(str)  # 錯誤發生
     
-    def __init__(self, texts: List[str], from_code: str, to_code: str):
+    def __init__(self, texts: List[str], from_code: str, to_code: str,
+                 priority_page: Optional[int] = None, job_store=None,
+                 job_id: Optional[str] = None, file_path: str = ""):
+        """
+        Args:
+            texts: 各頁文字
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+            priority_page: 優先翻譯的頁碼（通常為目前閱讀的頁面），之後依序往後並繞回開頭
+            job_store: 翻譯工作紀錄（TranslationJobStore），None 表示不保存進度
+            job_id: 工作編號
+            file_path: 文件路徑（記錄在工作中）
+        """
         super().__init__()
         self.texts = texts
         self.from_code = from_code
         self.to_code = to_code
+        self.priority_page = priority_page
+        self.job_store = job_store if job_id else None
+        self.job_id = job_id
+        self.file_path = file_path
         self.translation_manager = None
+        self.cancel_event = threading.Event()
     
     def set_translation_manager(self, manager):
         """設定翻譯管理器"""
         self.translation_manager = manager
     
+    def cancel(self):
+        """
+        取消翻譯
+        
+        尚未送出的請求不再送出，進行中的請求完成後 run() 即結束；
+        已完成的句子保留在工作紀錄中，下次可繼續
+        """
+        self.cancel_event.set()
+    
+    def page_order(self) -> List[int]:
+        """翻譯的頁面順序"""
+        start = self.priority_page or 0
+        if not 0 <= start < len(self.texts):
+            start = 0
+        return list(range(start, len(self.texts))) + list(range(0, start))
+    
+    def _translate_pack(self, pack: List[str]) -> List[str]:
+        """在執行緒池中翻譯一個請求（失敗時拋出例外）"""
+        manager = self.translation_manager
+        manager.bind_cancel_event(self.cancel_event)
+        if self.cancel_event.is_set():
+            raise TranslationCancelled("翻譯已取消")
+        return manager.translate_packed(pack, self.from_code, self.to_code, raise_errors=True)
+    
     def run(self):
-        """執行翻譯"""
+        """
+        執行翻譯
+
+        先將所有頁面切分為句子並去除重複，已有快取或工作紀錄的句子直接使用，
+        其餘句子依頁面順序打包，以執行緒池同時送出
+        （數量由翻譯管理器的 max_concurrency 決定）。
+        每頁的句子全部完成時立即發出 page_translated；
+        每個請求完成時寫入工作紀錄，取消或中斷後可繼續
+        """
         try:
             if not self.translation_manager:
                 self.error_occurred.emit("翻譯管理器未設定")
                 return
             
-            results = []
-            total = len(self.texts)
+            manager = self.translation_manager
+            document = DocumentSegments(self.texts)
+            order = self.page_order()
+            segments = document.unique_segments(order)
             
-            for i, text in enumerate(self.texts):
-                if text.strip():
-                    translated = self.translation_manager.translate(
-                        text, self.from_code, self.to_code
-                    )
-                    results.append(translated)
+            # 每頁尚缺的句子，以及每個句子所屬的頁面
+            missing = {page_num: set(document.page_keys[page_num]) for page_num in order}
+            waiting = {}
+            for page_num in order:
+                for key in missing[page_num]:
+                    waiting.setdefault(key, []).append(page_num)
+            
+            translations = {}
+            if self.job_store:
+                recorded = self.job_store.start(
+                    self.job_id, self.file_path, self.from_code, self.to_code, len(segments)
+                )
+                translations.update((key, recorded[key]) for key in segments if key in recorded)
+            
+            uncached = []
+            for segment in segments:
+                if segment in translations:
+                    continue
+                cached = manager.get_cached(segment, self.from_code, self.to_code)
+                if cached is not None:
+                    translations[segment] = cached
                 else:
-                    results.append("")
-                
-                self.progress_updated.emit(i + 1, total)
+                    uncached.append(segment)
+            
+            def complete(keys):
+                """記錄完成的句子，發出所有句子都已完成的頁面"""
+                for key in keys:
+                    for page_num in waiting.pop(key, ()):
+                        missing[page_num].discard(key)
+                        if not missing[page_num]:
+                            self.page_translated.emit(page_num, document.assemble(page_num, translations))
+            
+            # 不需請求的頁面（全部已快取或沒有文字）直接發出
+            for page_num in order:
+                missing[page_num].difference_update(translations)
+                if not missing[page_num]:
+                    self.page_translated.emit(page_num, document.assemble(page_num, translations))
+            for key in list(translations):
+                waiting.pop(key, None)
             
-            self.translation_completed.emit("\n\n".join(results))
+            total = len(segments)
+            done = total - len(uncached)
+            if done:
+                self.progress_updated.emit(done, total)
+            
+            # 多個短句合併為一個請求，減少請求數
+            packs = [
+                [uncached[i] for i in pack]
+                for pack in pack_segments(uncached, manager.max_request_chars)
+            ]
+            
+            failed = 0
+            workers = max(1, manager.max_concurrency)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._translate_pack, pack): pack for pack in packs}
+                for future in as_completed(futures):
+                    if self.cancel_event.is_set():
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+                    pack = futures[future]
+                    try:
+                        results = future.result()
+                    except TranslationCancelled:
+                        continue
+                    except Exception as e:
+                        # 失敗的句子保留原文，下次繼續時重新翻譯
+                        print(f"翻譯請求失敗: {e}")
+                        failed += len(pack)
+                    else:
+                        translations.update(zip(pack, results))
+                        if self.job_store:
+                            self.job_store.record(self.job_id, zip(pack, results))
+                    complete(pack)
+                    done += len(pack)
+                    self.progress_updated.emit(done, total)
+            
+            # 批次翻譯結束時寫入累積的快取
+            manager.flush_cache()
+            
+            if self.cancel_event.is_set():
+                if self.job_store:
+                    self.job_store.set_status(self.job_id, STATUS_PAUSED)
+                return
+            
+            if self.job_store:
+                if failed:
+                    self.job_store.set_status(self.job_id, STATUS_INCOMPLETE)
+                else:
+                    self.job_store.finish(self.job_id)
+            if failed:
+                self.error_occurred.emit(f"{failed} 個句子翻譯失敗（保留原文），重新翻譯文件時會繼續")
+            
+            pages = [document.assemble(i, translations) for i in range(len(document))]
+            self.translation_completed.emit("\n\n".join(pages))
             
         except Exception as e:
             self.error_occurred.emit(f"翻譯錯誤: {str(e)}")
 
 
+class OfflinePackWorker(TranslationWorker):
+    """
+    準備離線翻譯執行緒
+    
+    翻譯文件中所有不重複的句子（已快取的不再送出），
+    完成後將這些句子的翻譯匯出為翻譯快取包
+    """
+    
+    pack_completed = pyqtSignal(str, int)  # 完成 (快取包路徑, 句子數)
+    
+    def __init__(self, texts: List[str], from_code: str, to_code: str, output_path: str,
+                 file_path: str = ""):
+        """
+        Args:
+            texts: 各頁文字
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+            output_path: 快取包輸出路徑
+            file_path: 文件路徑（指紋與名稱記錄在快取包標頭）
+        """
+        super().__init__(texts, from_code, to_code, file_path=file_path)
+        self.output_path = output_path
+    
+    def _cached_entries(self, segments: List[str]):
+        """逐筆產生已翻譯的句子 (來源語言, 目標語言, 原文, 譯文)"""
+        cache = self.translation_manager.translation_cache
+        for segment in segments:
+            translation = cache.get(make_cache_key(segment, self.from_code, self.to_code))
+            if translation is not None:
+                yield self.from_code, self.to_code, segment, translation
+    
+    def run(self):
+        """翻譯所有句子並匯出快取包"""
+        try:
+            manager = self.translation_manager
+            segments = DocumentSegments(self.texts).unique_segments()
+            self.texts = None  # 之後只需要句子
+            
+            # get_cached 會把翻譯記憶的結果寫入快取，匯出時一併包含
+            uncached = [segment for segment in segments
+                        if manager.get_cached(segment, self.from_code, self.to_code) is None]
+            total = len(segments)
+            done = total - len(uncached)
+            self.progress_updated.emit(done, total)
+            
+            packs = [
+                [uncached[i] for i in pack]
+                for pack in pack_segments(uncached, manager.max_request_chars)
+            ]
+            failed = 0
+            with ThreadPoolExecutor(max_workers=max(1, manager.max_concurrency)) as executor:
+                futures = {executor.submit(self._translate_pack, pack): pack for pack in packs}
+                for future in as_completed(futures):
+                    if self.cancel_event.is_set():
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+                    pack = futures[future]
+                    try:
+                        future.result()
+                    except TranslationCancelled:
+                        continue
+                    except Exception as e:
+                        print(f"翻譯請求失敗: {e}")
+                        failed += len(pack)
+                    done += len(pack)
+                    self.progress_updated.emit(done, total)
+            
+            manager.flush_cache()
+            if self.cancel_event.is_set():
+                return
+            
+            metadata = {"source_lang": self.from_code, "target_lang": self.to_code}
+            if self.file_path:
+                metadata["document"] = os.path.basename(self.file_path)
+                metadata["fingerprint"] = document_fingerprint(self.file_path)
+            count = write_pack(self.output_path, self._cached_entries(segments), metadata)
+            if failed:
+                self.error_occurred.emit(f"{failed} 個句子翻譯失敗，未包含在快取包中")
+            self.pack_completed.emit(self.output_path, count)
+            
+        except Exception as e:
+            self.error_occurred.emit(f"準備離線翻譯失敗: {str(e)}")
+
+
 class TranslationManager(QObject):
     """翻譯管理器"""
     
     # 信號定義
     translation_ready = pyqtSignal(str)  # 翻譯完成
+    page_translated = pyqtSignal(int, str)  # 批次翻譯的單頁完成 (頁碼, 譯文)
+    selection_translated = pyqtSignal(int, str)  # 非同步翻譯完成 (請求編號, 譯文)
+    blocks_translated = pyqtSignal(int, str, str)  # 頁面區塊翻譯完成 (頁碼, 來源語言, 目標語言)
+    _async_finished = pyqtSignal(int, str)  # 背景執行緒完成（內部使用）
     error_occurred = pyqtSignal(str)  # 錯誤發生
     
     # 常用語言代碼
@@ -90,13 +321,62 @@ class TranslationManager(QObject):
         "葡萄牙文": "pt",
     }
     
-    def __init__(self, use_offline=False):
+    PREFETCH_RESERVE = 2.0  # 預先翻譯不使用的令牌數（保留給使用者的請求，不超過桶容量減一）
+    
+    def __init__(self, use_offline=False, cache_path: Optional[str] = None,
+                 cache_max_entries: int = 500000, cache_policy: str = "lru",
+                 max_concurrency: int = 4, requests_per_second: float = 5.0,
+                 backend: Optional[TranslationBackend] = None,
+                 memory_path: Optional[str] = None, job_path: Optional[str] = None):
         super().__init__()
         self.translation_worker = None
-        self.use_offline = use_offline
-        self.translation_cache = {}  # 翻譯快取
-        self.cache_file = Path.home() / ".pdfreader_translation_cache.pkl"
-        self._load_cache()
+        self.use_offline = False
+        # 同時送出的請求數與每秒請求數上限（所有執行緒共用同一個令牌桶）
+        self.max_concurrency = max_concurrency
+        # 翻譯後端（線上預設為 Google 翻譯；離線時使用本機模型，沒有模型則只用快取）
+        self.online_backend = backend or GoogleBackend()
+        self.local_backend: Optional[MarianBackend] = None
+        self.backend: TranslationBackend = self.online_backend
+        self.rate_limiter = TokenBucket(rate=requests_per_second)
+        self.retry_policy = RetryPolicy()
+        # 請求、快取命中與延遲統計
+        self.metrics = TranslationMetrics()
+        # 進行中的請求 {快取鍵值: Future}，相同文字的請求共用同一個結果
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # 選取文字的非同步翻譯（第一次使用時才建立執行緒池）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._selection_request = 0
+        self._selection_future = None
+        self._async_finished.connect(self._on_async_finished)
+        # 各執行緒的請求設定（低優先權、取消事件）
+        self._local = threading.local()
+        # 預先翻譯（單一背景執行緒，新的預先翻譯取代舊的）
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self._prefetch_cancel: Optional[threading.Event] = None
+        # 頁面疊加顯示的區塊譯文（新的頁面取代進行中的請求）
+        self.overlay_cache = TranslationOverlayCache()
+        self._overlay_cancel: Optional[threading.Event] = None
+        self.set_offline_mode(use_offline)
+        # 翻譯快取（SQLite，第一次使用時才開啟，不影響啟動時間）
+        self.translation_cache = TranslationCache(
+            cache_path, max_entries=cache_max_entries, policy=cache_policy
+        )
+        # 翻譯記憶（只差在空白、數字或日期，或相似度很高的句子直接套用既有翻譯）
+        self.translation_memory = TranslationMemory(memory_path, max_entries=cache_max_entries)
+        # 整份文件翻譯的進度紀錄（可從中斷處繼續）
+        self.job_store = TranslationJobStore(job_path)
+    
+    @property
+    def max_request_chars(self) -> int:
+        """單一請求的字元數上限（由後端決定）"""
+        return self.backend.max_request_chars
+    
+    def set_backend(self, backend: TranslationBackend):
+        """更換線上翻譯後端"""
+        self.online_backend = backend
+        if not self.use_offline:
+            self.backend = backend
     
     def get_available_languages(self) -> List[str]:
         """獲取可用語言列表"""
@@ -106,32 +386,71 @@ class TranslationManager(QObject):
         """獲取語言代碼"""
         return self.LANGUAGES.get(language_name, "en")
     
-    def _load_cache(self):
-        """載入翻譯快取"""
-        try:
-            if self.cache_file.exists():
-                with open(self.cache_file, 'rb') as f:
-                    self.translation_cache = pickle.load(f)
-        except Exception as e:
-            print(f"載入快取失敗: {e}")
-            self.translation_cache = {}
+    def get_language_name(self, language_code: str) -> str:
+        """獲取語言名稱"""
+        for name, code in self.LANGUAGES.items():
+            if code == language_code:
+                return name
+        return language_code
     
-    def _save_cache(self):
-        """儲存翻譯快取"""
-        try:
-            with open(self.cache_file, 'wb') as f:
-                pickle.dump(self.translation_cache, f)
-        except Exception as e:
-            print(f"儲存快取失敗: {e}")
+    def resolve_source_language(self, from_code: str, texts: Iterable[str]) -> str:
+        """
+        決定來源語言
+        
+        「自動偵測」時在本機偵測文字的語言，快取鍵值與離線模型都使用偵測結果；
+        無法判斷時保留 "auto"，交由線上翻譯服務偵測
+        
+        Args:
+            from_code: 選擇的來源語言代碼
+            texts: 文件的各頁或區塊文字（只取樣前面一部分）
+        """
+        if from_code != "auto":
+            return from_code
+        return detect_document_language(texts) or from_code
     
     def _get_cache_key(self, text: str, from_code: str, to_code: str) -> str:
-        """生成快取鍵值"""
-        return f"{from_code}:{to_code}:{hash(text)}"
+        """生成快取鍵值（內容雜湊，跨次啟動保持一致）"""
+        return make_cache_key(text, from_code, to_code)
+    
+    def get_cached(self, text: str, from_code: str, to_code: str) -> Optional[str]:
+        """查詢快取或翻譯記憶，都沒有則返回 None"""
+        cache_key = self._get_cache_key(text, from_code, to_code)
+        cached = self.translation_cache.get(cache_key)
+        if cached is not None:
+            self.metrics.record_lookup(True)
+            return cached
+        cached = self._recall(text, from_code, to_code, cache_key)
+        self.metrics.record_lookup(cached is not None, from_memory=True)
+        return cached
+    
+    def _recall(self, text: str, from_code: str, to_code: str, cache_key: str) -> Optional[str]:
+        """查詢翻譯記憶；只有樣板完全相同的翻譯寫入快取，相似句子的翻譯不寫入"""
+        remembered = self.translation_memory.lookup(text, from_code, to_code)
+        if remembered is not None:
+            self.translation_cache.put(cache_key, text, remembered, from_code, to_code)
+            return remembered
+        return self.translation_memory.recall_similar(text, from_code, to_code)
+    
+    def _store(self, cache_key: str, text: str, result: str, from_code: str, to_code: str):
+        """保存後端的翻譯結果（快取與翻譯記憶）"""
+        self.translation_cache.put(cache_key, text, result, from_code, to_code)
+        self.translation_memory.add(text, result, from_code, to_code)
+    
+    def get_suggestions(self, text: str, from_code: str, to_code: str, limit: int = 3):
+        """
+        查詢翻譯記憶中相似句子的翻譯（僅供參考）
+        
+        Returns:
+            [(相似度, 原文, 譯文)]
+        """
+        return self.translation_memory.suggest(text, from_code, to_code, limit)
     
     def translate(self, text: str, from_code: str = "en", to_code: str = "zh-TW") -> str:
         """
         翻譯文字（支援離線快取）
         
+        相同文字已在其他執行緒翻譯中時，等待該請求的結果而不重複送出
+        
         Args:
             text: 要翻譯的文字
             from_code: 來源語言代碼
@@ -142,81 +461,659 @@ class TranslationManager(QObject):
         """
         if not text or not text.strip():
             return ""
+        from_code = self.resolve_source_language(from_code, [text])
         
-        # 檢查快取
+        # 檢查快取與翻譯記憶（只差在數字或日期的句子）
+        cached = self.get_cached(text, from_code, to_code)
+        if cached is not None:
+            return cached
+        return self._translate_uncached(text, from_code, to_code)
+    
+    def _translate_uncached(self, text: str, from_code: str, to_code: str) -> str:
+        """翻譯快取中沒有的文字"""
         cache_key = self._get_cache_key(text, from_code, to_code)
-        if cache_key in self.translation_cache:
-            print("使用快取的翻譯")
-            return self.translation_cache[cache_key]
         
-        # 離線模式：只使用快取
-        if self.use_offline:
+        # 離線模式且沒有可用的本機模型：只使用快取
+        if self.use_offline and not self.backend.supports(from_code, to_code):
             error_msg = "離線模式：無法翻譯新文字（未在快取中）\n\n請先在有網路時翻譯此文字以建立快取"
             self.error_occurred.emit(error_msg)
             return f"[{error_msg}]"
         
-        # 線上翻譯
+        future, owner = self._claim(cache_key)
+        if not owner:
+            return self._wait(future, text, from_code, to_code, cache_key)
         try:
-            translator = GoogleTranslator(source=from_code, target=to_code)
-            
-            # 處理長文字（Google Translate 有字數限制）
-            max_length = 4500
-            if len(text) > max_length:
-                chunks = [text[i:i+max_length] for i in range(0, len(text), max_length)]
-                translated_chunks = [translator.translate(chunk) for chunk in chunks]
-                result = " ".join(translated_chunks)
-            else:
-                result = translator.translate(text)
-            
-            # 儲存到快取
-            self.translation_cache[cache_key] = result
-            self._save_cache()
+            result = self._fetch(text, from_code, to_code, cache_key)
+        except BaseException as e:
+            # 等待的呼叫端收到例外而非錯誤訊息，錯誤訊息只顯示給自己
+            self._release(cache_key, future, error=e)
+            if isinstance(e, TranslationCancelled) or not isinstance(e, Exception):
+                raise
+            return self._failure_text(e)
+        self._release(cache_key, future, result)
+        return result
+    
+    def _claim(self, cache_key: str) -> Tuple[Future, bool]:
+        """
+        登記進行中的請求
+        
+        Returns:
+            (結果的 Future, 是否由呼叫端負責送出請求)
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[cache_key] = future
+        
+        # 登記前可能已有其他執行緒完成並寫入快取
+        cached = self.translation_cache.get(cache_key)
+        if cached is not None:
+            self._release(cache_key, future, cached)
+            return future, False
+        return future, True
+    
+    def _release(self, cache_key: str, future: Future, result: Optional[str] = None,
+                 error: Optional[BaseException] = None):
+        """結束進行中的請求並通知等待的呼叫端"""
+        with self._inflight_lock:
+            self._inflight.pop(cache_key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def _wait(self, future: Future, text: str, from_code: str, to_code: str, cache_key: str,
+              raise_errors: bool = False) -> str:
+        """
+        等待其他呼叫端的請求結果
+        
+        對方被取消（例如預先翻譯）時由自己送出請求；
+        對方失敗時不再重送（已重試過），raise_errors 時拋出同一個例外，否則返回錯誤訊息
+        """
+        try:
+            return future.result()
+        except TranslationCancelled:
+            if raise_errors:
+                return self._fetch(text, from_code, to_code, cache_key)
+            return self._translate_online(text, from_code, to_code, cache_key)
+        except Exception as e:
+            if raise_errors:
+                raise
+            return self._failure_text(e)
+    
+    def _fetch(self, text: str, from_code: str, to_code: str, cache_key: str) -> str:
+        """
+        送出翻譯並寫入快取
+        
+        Raises:
+            Exception: 翻譯失敗
+        """
+        # 處理長文字：在段落或句子邊界切開，不切斷單詞
+        if len(text) > self.max_request_chars:
+            parts = []
+            for chunk in split_long_text(text, self.max_request_chars):
+                stripped = chunk.rstrip()
+                if stripped.strip():
+                    parts.append(self._request(stripped, from_code, to_code))
+                parts.append(chunk[len(stripped):])
+            result = "".join(parts)
+        else:
+            result = self._request(text, from_code, to_code)
+        
+        # 儲存到快取
+        self._store(cache_key, text, result, from_code, to_code)
+        return result
+    
+    def _translate_online(self, text: str, from_code: str, to_code: str, cache_key: str) -> str:
+        """送出翻譯並寫入快取（失敗時返回錯誤訊息）"""
+        try:
+            return self._fetch(text, from_code, to_code, cache_key)
+        except TranslationCancelled:
+            raise
+        except Exception as e:
+            return self._failure_text(e)
+    
+    def _failure_text(self, error: Exception) -> str:
+        """
+        發出錯誤並返回顯示用的錯誤訊息
+        
+        錯誤訊息只作為呼叫端的顯示文字，不寫入快取，也不傳給共用同一請求的呼叫端
+        """
+        if isinstance(error, BackendUnavailable):
+            error_msg = str(error)
+        else:
+            error_msg = f"翻譯失敗 (請檢查網路連線): {str(error)}"
+        self.error_occurred.emit(error_msg)
+        return f"[{error_msg}]"
+    
+    def translate_packed(self, segments: List[str], from_code: str, to_code: str,
+                         raise_errors: bool = False) -> List[str]:
+        """
+        以單一請求翻譯多個片段
+        
+        片段以換行連接後送出，再依換行拆回各片段；
+        若譯文行數與片段數不符，改為逐一翻譯。
+        已在其他請求中翻譯的片段不重複送出，等待該請求的結果
+        
+        Args:
+            segments: 片段列表（不含換行，總長度不超過 max_request_chars）
+            raise_errors: 失敗時拋出例外，而非以錯誤訊息作為譯文
             
+        Returns:
+            與片段順序相同的譯文列表
+        """
+        if self.use_offline and not self.backend.supports(from_code, to_code):
+            if raise_errors:
+                raise BackendUnavailable("離線模式：無法翻譯新文字（未在快取中）")
+            return [self.translate(segment, from_code, to_code) for segment in segments]
+        
+        keys = [self._get_cache_key(segment, from_code, to_code) for segment in segments]
+        claims = [self._claim(key) for key in keys]
+        owned = [i for i, (_, owner) in enumerate(claims) if owner]
+        
+        try:
+            translated = self._translate_pack(
+                [segments[i] for i in owned], [keys[i] for i in owned], from_code, to_code,
+                raise_errors
+            )
+        except BaseException as e:
+            for i in owned:
+                self._release(keys[i], claims[i][0], error=e)
+            raise
+        
+        results: List[Optional[str]] = [None] * len(segments)
+        for i, result in zip(owned, translated):
+            if isinstance(result, Exception):
+                self._release(keys[i], claims[i][0], error=result)
+                results[i] = self._failure_text(result)
+            else:
+                self._release(keys[i], claims[i][0], result)
+                results[i] = result
+        for i, (future, owner) in enumerate(claims):
+            if not owner:
+                results[i] = self._wait(future, segments[i], from_code, to_code, keys[i], raise_errors)
+        return results
+    
+    def _translate_pack(self, segments: List[str], keys: List[str],
+                        from_code: str, to_code: str, raise_errors: bool = False) -> List:
+        """
+        以後端的批次介面送出單一請求，失敗或結果數量不符時逐一翻譯
+        
+        Returns:
+            與片段順序相同的譯文；raise_errors 為 False 時，失敗的片段為其例外
+        """
+        if len(segments) > 1 and self.backend.supports_batch:
+            try:
+                lines = self._request_batch(segments, from_code, to_code)
+                for key, segment, line in zip(keys, segments, lines):
+                    self._store(key, segment, line, from_code, to_code)
+                return lines
+            except TranslationCancelled:
+                raise
+            except Exception as e:
+                print(f"合併翻譯失敗，改為逐句翻譯: {e}")
+        
+        results = []
+        for segment, key in zip(segments, keys):
+            try:
+                results.append(self._fetch(segment, from_code, to_code, key))
+            except TranslationCancelled:
+                raise
+            except Exception as e:
+                if raise_errors:
+                    raise
+                results.append(e)
+        return results
+    
+    def translate_segments(self, segments: List[str], from_code: str = "en",
+                           to_code: str = "zh-TW", raise_errors: bool = False) -> List[str]:
+        """
+        翻譯多個片段（使用快取，未快取的片段打包成盡量少的請求）
+
+        Args:
+            segments: 片段列表（不含換行）
+            raise_errors: 失敗時拋出例外，而非以錯誤訊息作為譯文
+
+        Returns:
+            與片段順序相同的譯文列表
+        """
+        results: List[Optional[str]] = [None] * len(segments)
+        uncached = []
+        for i, segment in enumerate(segments):
+            if not segment.strip():
+                results[i] = ""
+                continue
+            cached = self.get_cached(segment, from_code, to_code)
+            if cached is not None:
+                results[i] = cached
+            else:
+                uncached.append(i)
+        
+        for pack in pack_segments([segments[i] for i in uncached], self.max_request_chars):
+            indices = [uncached[i] for i in pack]
+            translated = self.translate_packed([segments[i] for i in indices], from_code, to_code,
+                                               raise_errors)
+            for i, result in zip(indices, translated):
+                results[i] = result
+        
+        return results
+    
+    def _request(self, text: str, from_code: str, to_code: str) -> str:
+        """
+        送出單一翻譯請求
+        
+        先向令牌桶取得配額，暫時性錯誤以指數退避重試
+        """
+        return self._send(lambda: self.backend.translate(text, from_code, to_code), len(text))
+    
+    def _request_batch(self, texts: List[str], from_code: str, to_code: str) -> List[str]:
+        """以單一請求翻譯多段文字（速率限制與重試同 _request）"""
+        characters = sum(len(text) for text in texts) + len(texts) - 1
+        return self._send(lambda: self.backend.translate_batch(texts, from_code, to_code), characters)
+    
+    def _send(self, call: Callable, characters: int = 0):
+        """
+        取得速率配額後呼叫後端，失敗時重試
+        
+        預先翻譯執行緒為低優先權：只在令牌桶保留 prefetch_reserve() 個令牌之外
+        還有剩餘時才送出，讓使用者的請求不必等待。
+        每次請求的延遲（不含等待配額的時間）與結果記錄在 metrics
+        
+        Args:
+            call: 呼叫後端的函數
+            characters: 請求的字元數（統計用）
+        """
+        cancel_event = getattr(self._local, "cancel_event", None)
+        low_priority = getattr(self._local, "low_priority", False)
+        
+        def send():
+            if self.backend.requires_network:
+                if low_priority:
+                    while not self.rate_limiter.try_acquire(reserve=self.prefetch_reserve()):
+                        if cancel_event.wait(0.2):
+                            raise TranslationCancelled("預先翻譯已取消")
+                elif not self.rate_limiter.acquire(cancel_event=cancel_event):
+                    raise TranslationCancelled("翻譯已取消")
+            backend_name = self.backend.name
+            start = time.perf_counter()
+            try:
+                result = call()
+            except Exception:
+                self.metrics.record_request(backend_name, characters, time.perf_counter() - start, ok=False)
+                raise
+            self.metrics.record_request(backend_name, characters, time.perf_counter() - start)
             return result
-            
-        except Exception as e:
-            error_msg = f"翻譯失敗 (請檢查網路連線): {str(e)}"
-            self.error_occurred.emit(error_msg)
-            return f"[{error_msg}]"
+        
+        def on_retry(attempt, error):
+            self.metrics.record_retry()
+            print(f"翻譯請求失敗，第 {attempt} 次重試: {error}")
+        
+        def should_retry(error):
+            return not isinstance(error, TranslationCancelled) and is_transient(error)
+        
+        try:
+            return call_with_retry(send, self.retry_policy, should_retry, on_retry, cancel_event)
+        except TranslationCancelled:
+            raise
+        except Exception:
+            self.metrics.record_failure()
+            raise
+    
+    def prefetch_reserve(self) -> float:
+        """
+        預先翻譯保留的令牌數
+        
+        速率設定較低時桶容量小於 PREFETCH_RESERVE + 1，
+        保留數以桶容量減一為上限，否則預先翻譯永遠取不到令牌
+        """
+        return max(0.0, min(self.PREFETCH_RESERVE, self.rate_limiter.capacity - 1))
     
     def set_offline_mode(self, enabled: bool):
-        """設定是否使用離線模式（僅使用快取）"""
+        """
+        設定是否使用離線模式
+        
+        已安裝 transformers 與 torch 時以本機 MarianMT 模型翻譯，
+        否則只使用快取
+        """
         self.use_offline = enabled
+        if not enabled:
+            self.backend = self.online_backend
+        elif is_engine_available():
+            if self.local_backend is None:
+                self.local_backend = MarianBackend()
+            self.backend = self.local_backend
+        else:
+            self.backend = OfflineBackend()
     
     def is_offline_available(self) -> bool:
         """檢查離線翻譯是否可用（快取式離線）"""
         return OFFLINE_AVAILABLE
     
+    def has_local_engine(self) -> bool:
+        """檢查是否能以本機模型離線翻譯"""
+        return is_engine_available()
+    
+    def export_pack(self, output_path: str, from_code: Optional[str] = None,
+                    to_code: Optional[str] = None) -> int:
+        """
+        將快取匯出為翻譯快取包
+        
+        Args:
+            output_path: 輸出路徑
+            from_code: 只匯出此來源語言，None 表示全部
+            to_code: 只匯出此目標語言，None 表示全部
+            
+        Returns:
+            匯出的筆數
+        """
+        entries = (entry[1:] for entry in self.translation_cache.iter_entries(from_code, to_code))
+        metadata = {"source_lang": from_code, "target_lang": to_code}
+        return write_pack(output_path, entries, metadata)
+    
+    def import_pack(self, pack_path: str) -> Tuple[dict, int]:
+        """
+        匯入翻譯快取包（逐筆合併，本機已有的翻譯保留）
+        
+        Returns:
+            (快取包標頭, 新增的筆數)
+            
+        Raises:
+            ValueError: 不是有效的翻譯快取包
+        """
+        header, entries = read_pack(pack_path)
+        added = self.translation_cache.merge(entries)
+        return header, added
+    
+    def get_metrics(self) -> dict:
+        """獲取翻譯統計（見 TranslationMetrics.snapshot）"""
+        return self.metrics.snapshot()
+    
     def get_cache_size(self) -> int:
         """獲取快取大小"""
-        return len(self.translation_cache)
+        return self.translation_cache.count()
     
     def clear_cache(self):
-        """清除翻譯快取"""
-        self.translation_cache = {}
-        self._save_cache()
+        """清除翻譯快取與翻譯記憶"""
+        self.translation_cache.clear()
+        self.translation_memory.clear()
+        self.overlay_cache.clear()
+    
+    def flush_cache(self):
+        """將累積的翻譯寫入快取檔案"""
+        self.translation_cache.flush()
+        self.translation_memory.flush()
+    
+    def translate_async(self, text: str, from_code: str = "en", to_code: str = "zh-TW") -> Optional[str]:
+        """
+        在背景執行緒翻譯文字（GUI 執行緒不等待網路）
+        
+        已有快取時直接返回譯文；否則返回 None，完成後發出 selection_translated。
+        新的請求會取代前一個：尚未開始的請求被取消，已送出的請求結果被忽略
+        
+        Args:
+            text: 要翻譯的文字
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+            
+        Returns:
+            快取的譯文，沒有快取則返回 None
+        """
+        self._selection_request += 1
+        request_id = self._selection_request
+        if self._selection_future is not None:
+            self._selection_future.cancel()
+            self._selection_future = None
+        
+        if not text.strip():
+            return ""
+        from_code = self.resolve_source_language(from_code, [text])
+        cached = self.get_cached(text, from_code, to_code)
+        if cached is not None:
+            return cached
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="translate")
+        
+        def run():
+            if request_id != self._selection_request:
+                return  # 已被新的請求取代
+            result = self._translate_uncached(text, from_code, to_code)
+            self.flush_cache()
+            self._async_finished.emit(request_id, result)
+        
+        self._selection_future = self._executor.submit(run)
+        return None
+    
+    def _on_async_finished(self, request_id: int, result: str):
+        """在 GUI 執行緒確認請求仍是最新的才發出結果"""
+        if request_id == self._selection_request:
+            self._selection_future = None
+            self.selection_translated.emit(request_id, result)
+    
+    def cancel_async(self):
+        """取消進行中的非同步翻譯（結果不再發出）"""
+        self._selection_request += 1
+        if self._selection_future is not None:
+            self._selection_future.cancel()
+            self._selection_future = None
+    
+    def bind_cancel_event(self, cancel_event: Optional[threading.Event]):
+        """設定目前執行緒的取消事件（等待速率配額或重試時檢查）"""
+        self._local.cancel_event = cancel_event
+    
+    def prefetch(self, texts: List[str], from_code: str = "en", to_code: str = "zh-TW"):
+        """
+        在背景以低優先權預先翻譯文字並寫入快取
+        
+        取消前一次尚未完成的預先翻譯；失敗不顯示錯誤。
+        已送出的請求會完成，取消在下一個請求前生效
+        
+        Args:
+            texts: 要預先翻譯的文字（依優先順序）
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+        """
+        self.cancel_prefetch()
+        offline = not self.backend.requires_network
+        if offline and from_code != "auto" and not self.backend.supports(from_code, to_code):
+            return  # 離線且沒有本機模型
+        
+        cancel_event = threading.Event()
+        self._prefetch_cancel = cancel_event
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        
+        def run():
+            self._local.low_priority = True
+            self._local.cancel_event = cancel_event
+            for text in texts:
+                if cancel_event.is_set():
+                    break
+                if not text.strip():
+                    continue
+                # 與 translate_async 相同，以每段文字偵測到的語言為鍵值
+                source_code = self.resolve_source_language(from_code, [text])
+                if offline and not self.backend.supports(source_code, to_code):
+                    continue
+                cache_key = self._get_cache_key(text, source_code, to_code)
+                future, owner = self._claim(cache_key)
+                if not owner:
+                    continue
+                try:
+                    result = self._fetch(text, source_code, to_code, cache_key)
+                except Exception as e:
+                    self._release(cache_key, future, error=e)
+                    if not isinstance(e, TranslationCancelled):
+                        print(f"預先翻譯失敗: {e}")
+                    continue
+                self._release(cache_key, future, result)
+            self.flush_cache()
+        
+        self._prefetch_executor.submit(run)
+    
+    def cancel_prefetch(self):
+        """取消預先翻譯"""
+        if self._prefetch_cancel is not None:
+            self._prefetch_cancel.set()
+            self._prefetch_cancel = None
+    
+    def get_block_translations(self, page_num: int, from_code: str, to_code: str) -> Dict[int, str]:
+        """獲取頁面已翻譯的區塊 {區塊索引: 譯文}"""
+        return self.overlay_cache.get(page_num, from_code, to_code)
+    
+    def translate_blocks_async(self, page_num: int, blocks: Dict[int, str],
+                               from_code: str = "en", to_code: str = "zh-TW") -> bool:
+        """
+        翻譯頁面的文字區塊（用於疊加顯示）
+        
+        區塊切分為句子後翻譯，與整份文件翻譯共用句子快取。
+        所有句子都已快取時直接寫入區塊快取並返回 True；
+        否則在背景翻譯，完成後發出 blocks_translated。
+        新的請求會取消前一個尚未完成的請求
+        
+        Args:
+            page_num: 頁碼
+            blocks: 要翻譯的區塊 {區塊索引: 區塊文字}
+            from_code: 來源語言代碼
+            to_code: 目標語言代碼
+            
+        Returns:
+            是否已全部翻譯完成
+        """
+        self.cancel_overlay()
+        indices = self.overlay_cache.missing(page_num, from_code, to_code, blocks)
+        if not indices:
+            return True
+        
+        segmented, segments = block_segments(blocks[index] for index in indices)
+        # 區塊快取以選擇的語言為鍵值，句子以偵測到的語言翻譯
+        source_code = self.resolve_source_language(from_code, (blocks[index] for index in indices))
+        translations = {}
+        uncached = []
+        for segment in segments:
+            cached = self.get_cached(segment, source_code, to_code)
+            if cached is not None:
+                translations[segment] = cached
+            else:
+                uncached.append(segment)
+        
+        def store():
+            self.overlay_cache.put(page_num, from_code, to_code, {
+                index: assemble_block(segments, translations)
+                for index, segments in zip(indices, segmented)
+            })
+        
+        if not uncached:
+            store()
+            return True
+        
+        cancel_event = threading.Event()
+        self._overlay_cancel = cancel_event
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="translate")
+        
+        def run():
+            if cancel_event.is_set():
+                return
+            self._local.cancel_event = cancel_event
+            try:
+                results = self.translate_segments(uncached, source_code, to_code, raise_errors=True)
+            except TranslationCancelled:
+                return
+            except Exception as e:
+                self.error_occurred.emit(f"區塊翻譯失敗: {str(e)}")
+                return
+            finally:
+                self._local.cancel_event = None
+                self.flush_cache()
+            translations.update(zip(uncached, results))
+            store()
+            self.blocks_translated.emit(page_num, from_code, to_code)
+        
+        self._executor.submit(run)
+        return False
+    
+    def cancel_overlay(self):
+        """取消進行中的區塊翻譯"""
+        if self._overlay_cancel is not None:
+            self._overlay_cancel.set()
+            self._overlay_cancel = None
+    
+    def get_job_progress(self, file_path: str, from_code: str, to_code: str):
+        """
+        查詢文件未完成的翻譯工作
+        
+        Returns:
+            (狀態, 已完成句子數, 句子總數)，沒有未完成的工作則返回 None
+        """
+        try:
+            return self.job_store.progress(make_job_id(file_path, from_code, to_code))
+        except OSError:
+            return None
+    
+    def cancel_batch(self):
+        """取消批次翻譯並等待工作執行緒結束（最多等待進行中的請求）"""
+        worker = self.translation_worker
+        if worker and worker.isRunning():
+            worker.cancel()
+            worker.wait()
+    
+    def close(self):
+        """寫入快取並關閉（程式結束時使用）"""
+        self.cancel_prefetch()
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
+            self._prefetch_executor = None
+        self.cancel_async()
+        self.cancel_overlay()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self.translation_cache.close()
+        self.translation_memory.close()
+        self.job_store.close()
     
     def translate_batch(self, texts: List[str], from_code: str = "en", 
-                       to_code: str = "zh-TW", callback: Optional[Callable] = None):
+                       to_code: str = "zh-TW", callback: Optional[Callable] = None,
+                       priority_page: Optional[int] = None, file_path: Optional[str] = None):
         """
         批次翻譯（使用後台執行緒）
         
         Args:
-            texts: 要翻譯的文字列表
+            texts: 要翻譯的文字列表（每頁一項）
             from_code: 來源語言代碼
             to_code: 目標語言代碼
             callback: 進度回調函數
+            priority_page: 優先翻譯的頁碼
+            file_path: 文件路徑；提供時保存逐句進度，中斷後再次翻譯同一文件會繼續
         """
-        # 停止之前的翻譯工作
-        if self.translation_worker and self.translation_worker.isRunning():
-            self.translation_worker.quit()
-            self.translation_worker.wait()
+        # 停止之前的翻譯工作（進行中的請求完成後即停止）
+        self.cancel_batch()
+        from_code = self.resolve_source_language(from_code, texts)
+        
+        job_id = None
+        if file_path:
+            try:
+                job_id = make_job_id(file_path, from_code, to_code)
+            except OSError:
+                job_id = None
         
         # 創建新的翻譯工作
-        self.translation_worker = TranslationWorker(texts, from_code, to_code)
+        self.translation_worker = TranslationWorker(
+            texts, from_code, to_code, priority_page,
+            job_store=self.job_store, job_id=job_id, file_path=file_path or ""
+        )
         self.translation_worker.set_translation_manager(self)
         
         # 連接信號
+        # 只轉發目前工作的單頁結果，前一個工作殘留在佇列中的信號不再顯示
+        worker = self.translation_worker
+        worker.page_translated.connect(
+            lambda page_num, text: self.page_translated.emit(page_num, text)
+            if worker is self.translation_worker else None
+        )
         self.translation_worker.translation_completed.connect(self.translation_ready.emit)
         self.translation_worker.error_occurred.connect(self.error_occurred.emit)
         
@@ -62,6 +62,54 @@ class Config:
     def set_dark_mode(self, enabled: bool):
         """設定深色模式"""
         self.settings.setValue("dark_mode", enabled)
+    
+    def get_translation_cache_limit(self) -> int:
+        """獲取翻譯快取筆數上限（0 表示不限制）"""
+        return self.settings.value("translation_cache_limit", 500000, type=int)
+    
+    def set_translation_cache_limit(self, limit: int):
+        """設定翻譯快取筆數上限"""
+        self.settings.setValue("translation_cache_limit", limit)
+    
+    def get_translation_cache_policy(self) -> str:
+        """獲取翻譯快取淘汰策略（lru 或 lfu）"""
+        return self.settings.value("translation_cache_policy", "lru")
+    
+    def set_translation_cache_policy(self, policy: str):
+        """設定翻譯快取淘汰策略"""
+        self.settings.setValue("translation_cache_policy", policy)
+    
+    def get_translation_offline(self) -> bool:
+        """獲取是否使用離線翻譯"""
+        return self.settings.value("translation_offline", False, type=bool)
+    
+    def set_translation_offline(self, enabled: bool):
+        """設定是否使用離線翻譯"""
+        self.settings.setValue("translation_offline", enabled)
+    
+    def get_translation_prefetch_pages(self) -> int:
+        """獲取閱讀時預先翻譯的頁數（0 表示停用）"""
+        return self.settings.value("translation_prefetch_pages", 3, type=int)
+    
+    def set_translation_prefetch_pages(self, count: int):
+        """設定閱讀時預先翻譯的頁數"""
+        self.settings.setValue("translation_prefetch_pages", count)
+    
+    def get_translation_concurrency(self) -> int:
+        """獲取同時送出的翻譯請求數"""
+        return self.settings.value("translation_concurrency", 4, type=int)
+    
+    def set_translation_concurrency(self, count: int):
+        """設定同時送出的翻譯請求數"""
+        self.settings.setValue("translation_concurrency", count)
+    
+    def get_translation_rate_limit(self) -> float:
+        """獲取每秒翻譯請求數上限"""
+        return self.settings.value("translation_rate_limit", 5.0, type=float)
+    
+    def set_translation_rate_limit(self, rate: float):
+        """設定每秒翻譯請求數上限"""
+        self.settings.setValue("translation_rate_limit", rate)
 
 
 def format_file_size(size: int) -> str:
@@ -0,0 +1,90 @@
+"""
+註解管理器測試
+"""
+
+import unittest
+import fitz
+from src.annotation import AnnotationManager
+from src.pdf_handler import PDFHandler
+
+
+class TestAnnotationTransaction(unittest.TestCase):
+    """批次註解測試類別"""
+
+    def setUp(self):
+        """測試前置設定：兩頁的空白文件"""
+        self.handler = PDFHandler()
+        self.handler.document = fitz.open()
+        for _ in range(2):
+            self.handler.document.new_page()
+        self.handler.page_count = 2
+        self.manager = AnnotationManager(self.handler)
+        self.changes = []
+        self.added = []
+        self.manager.annotations_changed.connect(self.changes.append)
+        self.manager.annotation_added.connect(lambda page_num, annot: self.added.append(page_num))
+
+    def count(self, page_num):
+        """頁面上的註解數"""
+        return len(self.manager.get_annotations(page_num))
+
+    def test_transaction_applies_once(self):
+        """測試批次新增在結束時套用並只通知一次"""
+        with self.manager.transaction():
+            self.manager.add_highlight(0, fitz.Rect(10, 10, 50, 20))
+            self.manager.add_underline(1, fitz.Rect(10, 30, 50, 40))
+            self.manager.add_rectangle(1, fitz.Rect(10, 50, 50, 90))
+            self.assertFalse(self.manager.add_highlight(5, fitz.Rect(0, 0, 1, 1)))
+            self.assertEqual(self.count(0), 0)
+
+        self.assertEqual(self.count(0), 1)
+        self.assertEqual(self.count(1), 2)
+        self.assertEqual(self.changes, [[0, 1]])
+        self.assertEqual(self.added, [])
+
+    def test_bulk_import_notifies_once(self):
+        """測試一次匯入 200 個高亮只通知一次"""
+        marks = [(i % 2, fitz.Rect(10, 10 + (i // 2) * 7, 200, 15 + (i // 2) * 7)) for i in range(200)]
+        self.assertEqual(self.manager.add_highlights(marks + [(9, fitz.Rect(0, 0, 1, 1))]), 200)
+
+        self.assertEqual(self.count(0), 100)
+        self.assertEqual(self.count(1), 100)
+        self.assertEqual(self.changes, [[0, 1]])
+        self.assertEqual(self.added, [])
+
+    def test_single_add_notifies(self):
+        """測試批次外的新增立即套用"""
+        self.assertTrue(self.manager.add_circle(0, fitz.Rect(10, 10, 50, 50)))
+        self.assertEqual(self.count(0), 1)
+        self.assertEqual(self.changes, [[0]])
+        self.assertEqual(self.added, [0])
+
+    def test_clear_all_annotations(self):
+        """測試清除頁面註解只通知一次"""
+        with self.manager.transaction():
+            for i in range(5):
+                self.manager.add_highlight(0, fitz.Rect(10, 10 + i * 20, 50, 20 + i * 20))
+        self.changes.clear()
+
+        self.manager.clear_all_annotations(0)
+        self.assertEqual(self.count(0), 0)
+        self.assertEqual(self.changes, [[0]])
+
+    def test_exception_discards_changes(self):
+        """測試區塊中發生例外時不套用任何變更"""
+        with self.assertRaises(RuntimeError):
+            with self.manager.transaction():
+                self.manager.add_highlight(0, fitz.Rect(10, 10, 50, 20))
+                raise RuntimeError("中止")
+
+        self.assertEqual(self.count(0), 0)
+        self.assertEqual(self.changes, [])
+
+    def tearDown(self):
+        """測試後清理"""
+        if self.handler.document:
+            self.handler.close_document()
+
+
+if __name__ == '__main__':
+    unittest.main()
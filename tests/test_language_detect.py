@@ -0,0 +1,43 @@
+"""
+語言偵測測試
+"""
+
+import unittest
+from src.language_detect import detect_language, detect_document_language
+
+
+class TestLanguageDetect(unittest.TestCase):
+    """語言偵測測試類別"""
+
+    def test_scripts(self):
+        """測試以文字系統判斷的語言"""
+        self.assertEqual(detect_language("これは日本語の文章です。東京に行きます。"), "ja")
+        self.assertEqual(detect_language("이것은 한국어 문장입니다."), "ko")
+        self.assertEqual(detect_language("這是一個繁體中文的句子，我們會說話。"), "zh-TW")
+        self.assertEqual(detect_language("这是一个简体中文的句子，我们会说话。"), "zh-CN")
+        self.assertEqual(detect_language("Это русский текст для проверки."), "ru")
+
+    def test_latin_languages(self):
+        """測試以常用字判斷的拉丁字母語言"""
+        samples = {
+            "en": "The pump is rated for continuous operation and it should be installed with care.",
+            "fr": "Le moteur est prévu pour une utilisation continue et doit être installé avec soin.",
+            "de": "Die Pumpe ist für den Dauerbetrieb ausgelegt und wird mit dem Gehäuse geliefert.",
+            "es": "La bomba está diseñada para el uso continuo y se entrega con los accesorios.",
+        }
+        for code, text in samples.items():
+            self.assertEqual(detect_language(text), code, text)
+
+    def test_undetermined(self):
+        """測試文字不足時無法判斷"""
+        self.assertIsNone(detect_language("12.5 / 34"))
+        self.assertIsNone(detect_language("Datasheet XR-200"))
+
+    def test_document_sample(self):
+        """測試文件語言只取樣前面的文字"""
+        pages = ["Figure 1", "The device and the cable are shown in the figure."] + ["Der"] * 1000
+        self.assertEqual(detect_document_language(pages, sample_chars=60), "en")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+文件庫索引測試
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import fitz
+from src.library import LibraryIndex
+
+
+def write_pdf(path, pages, fontname="helv"):
+    """建立每頁一行文字的 PDF"""
+    document = fitz.open()
+    for text in pages:
+        document.new_page().insert_text((72, 72), text, fontname=fontname)
+    document.save(path)
+    document.close()
+
+
+class TestLibraryIndex(unittest.TestCase):
+    """文件庫索引測試類別"""
+
+    def setUp(self):
+        """測試前置設定"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.folder = os.path.join(self.temp_dir, "docs_1")
+        os.makedirs(self.folder)
+        self.manual = os.path.join(self.folder, "manual.pdf")
+        self.notes = os.path.join(self.folder, "notes.pdf")
+        write_pdf(self.manual, ["Install the printer driver", "Replace the toner cartridge"])
+        write_pdf(self.notes, ["繁體中文說明", "Meeting notes"], fontname="china-t")
+        self.library = LibraryIndex(os.path.join(self.temp_dir, "library.db"))
+
+    def test_index_and_search(self):
+        """測試索引後跨文件搜尋（包含部分單詞與單一漢字）"""
+        stats = self.library.update(self.folder, max_workers=1)
+        self.assertEqual(stats["added"], 2)
+        self.assertEqual(self.library.document_count(), 2)
+
+        hits = self.library.search("toner cartridge")
+        self.assertEqual([hit.path for hit in hits], [self.manual])
+        self.assertEqual(hits[0].pages[0][:2], (1, 1))
+
+        self.assertEqual([hit.path for hit in self.library.search("artrid")], [self.manual])
+        self.assertEqual([hit.path for hit in self.library.search("說")], [self.notes])
+        self.assertEqual(self.library.search("nothing here"), [])
+
+    def test_rescan(self):
+        """測試重新掃描只處理新增、修改與刪除的檔案"""
+        self.library.update(self.folder, max_workers=1)
+        stats = self.library.update(self.folder, max_workers=1)
+        self.assertEqual(stats["unchanged"], 2)
+
+        write_pdf(self.manual, ["Clean the paper tray"])
+        os.remove(self.notes)
+        stats = self.library.update(self.folder, max_workers=1)
+        self.assertEqual((stats["updated"], stats["removed"]), (1, 1))
+        self.assertEqual(self.library.search("toner"), [])
+        self.assertEqual([hit.path for hit in self.library.search("paper tray")], [self.manual])
+
+    def test_folder_name_with_wildcards(self):
+        """測試資料夾名稱中的 _ 不會比對到其他資料夾"""
+        sibling = os.path.join(self.temp_dir, "docsX1")
+        os.makedirs(sibling)
+        other = os.path.join(sibling, "other.pdf")
+        write_pdf(other, ["Sibling folder document"])
+        self.library.update(sibling, max_workers=1)
+
+        stats = self.library.update(self.folder, max_workers=1)
+        self.assertEqual(stats["removed"], 0)
+        self.assertEqual(self.library.document_count(), 3)
+        self.assertEqual([hit.path for hit in self.library.search("sibling folder")], [other])
+
+    def test_partial_word_uses_index(self):
+        """測試單一單詞與片段結尾的單一漢字以索引查詢，不掃描詞彙表"""
+        self.library.update(self.folder, max_workers=1)
+        statements = []
+        self.library.connection.set_trace_callback(statements.append)
+        self.assertEqual([hit.path for hit in self.library.search("artrid")], [self.manual])
+        self.assertEqual([hit.path for hit in self.library.search("明")], [self.notes])
+        self.assertFalse([sql for sql in statements if "instr(" in sql])
+
+    def test_remove_deletes_unused_terms(self):
+        """測試移除文件時一併刪除沒有其他文件使用的詞彙"""
+        self.library.update(self.folder, max_workers=1)
+        os.remove(self.notes)
+        self.library.update(self.folder, max_workers=1)
+
+        connection = self.library.connection
+        terms = {token for (token,) in connection.execute("SELECT token FROM terms")}
+        trigram = {token for (token,) in connection.execute("SELECT token FROM terms_trigram")}
+        self.assertNotIn("meeting", terms)
+        self.assertIn("toner", terms)
+        self.assertEqual(trigram, {token for token in terms if len(token) >= 3})
+        self.assertEqual(self.library.search("eetin"), [])
+
+    def tearDown(self):
+        """測試後清理"""
+        self.library.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
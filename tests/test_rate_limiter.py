@@ -0,0 +1,70 @@
+"""
+速率限制測試
+"""
+
+import threading
+import unittest
+from src.rate_limiter import TokenBucket, RetryPolicy, call_with_retry
+
+
+class TestRateLimiter(unittest.TestCase):
+    """速率限制測試類別"""
+
+    def test_bucket_allows_burst_then_limits(self):
+        """測試令牌桶允許容量內的突發請求"""
+        bucket = TokenBucket(rate=0.001, capacity=3)
+        self.assertTrue(all(bucket.try_acquire() for _ in range(3)))
+        self.assertFalse(bucket.try_acquire())
+        self.assertFalse(bucket.acquire(timeout=0.01))
+
+    def test_bucket_reserve(self):
+        """測試低優先權請求保留令牌"""
+        bucket = TokenBucket(rate=0.001, capacity=3)
+        self.assertTrue(bucket.try_acquire(reserve=1))
+        self.assertTrue(bucket.try_acquire(reserve=1))
+        self.assertFalse(bucket.try_acquire(reserve=1))
+        self.assertTrue(bucket.try_acquire())
+
+    def test_acquire_cancelled(self):
+        """測試取消等待"""
+        bucket = TokenBucket(rate=0.001, capacity=1)
+        bucket.try_acquire()
+        cancel = threading.Event()
+        cancel.set()
+        self.assertFalse(bucket.acquire(cancel_event=cancel))
+
+    def test_retry_until_success(self):
+        """測試失敗後重試直到成功"""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError("temporary")
+            return "ok"
+
+        policy = RetryPolicy(max_retries=3, base_delay=0.001)
+        self.assertEqual(call_with_retry(flaky, policy), "ok")
+        self.assertEqual(len(calls), 3)
+
+    def test_retry_gives_up(self):
+        """測試超過重試次數後拋出例外"""
+        calls = []
+
+        def failing():
+            calls.append(1)
+            raise ConnectionError("down")
+
+        policy = RetryPolicy(max_retries=2, base_delay=0.001)
+        with self.assertRaises(ConnectionError):
+            call_with_retry(failing, policy)
+        self.assertEqual(len(calls), 3)
+
+    def test_backoff_grows(self):
+        """測試等待時間以指數成長並有上限"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0, jitter=0)
+        self.assertEqual([policy.delay(i) for i in range(1, 5)], [1.0, 2.0, 4.0, 4.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+搜尋索引測試
+"""
+
+import unittest
+from src.search_index import (SearchIndex, SearchOptions, TextMatcher,
+                              normalize_for_search, tokenize, query_tokens)
+
+
+class TestSearchIndex(unittest.TestCase):
+    """搜尋索引測試類別"""
+    
+    def setUp(self):
+        """測試前置設定"""
+        self.index = SearchIndex(ngram=2)
+        self.index.add_page(0, "本文件說明\n翻譯功能的使用方式")
+        self.index.add_page(1, "PDF 閱讀器支援離線翻譯。\nThe offline translation engine")
+        self.index.add_page(2, "日本語のテキストを検索します")
+    
+    def test_tokenize_mixed_script(self):
+        """測試中英混合斷詞"""
+        tokens = tokenize(normalize_for_search("PDF閱讀器"))
+        self.assertEqual(tokens, ["pdf", "閱讀", "讀器"])
+    
+    def test_query_tokens_skip_partial_edges(self):
+        """測試查詢邊緣的拉丁單詞不列入詞彙"""
+        self.assertEqual(query_tokens("the offline trans"), ["offline"])
+    
+    def test_cjk_phrase_search(self):
+        """測試中文片語搜尋"""
+        self.assertEqual(self.index.search("翻譯"), [0, 1])
+        self.assertEqual(self.index.search("離線翻譯"), [1])
+        self.assertEqual(self.index.search("テキスト"), [2])
+    
+    def test_phrase_across_line_break(self):
+        """測試跨行的中文片語"""
+        self.assertEqual(self.index.search("說明翻譯"), [0])
+    
+    def test_latin_search_is_case_insensitive(self):
+        """測試英文搜尋不分大小寫"""
+        self.assertEqual(self.index.search("Translation Engine"), [1])
+        self.assertEqual(self.index.search("ransla"), [1])
+    
+    def test_no_match(self):
+        """測試找不到的查詢"""
+        self.assertEqual(self.index.search("簽章"), [])
+    
+    def test_remove_page(self):
+        """測試移除頁面"""
+        self.index.remove_page(1)
+        self.assertEqual(self.index.search("翻譯"), [0])
+        self.assertNotIn("離線", self.index.postings)
+
+
+
+class TestTextMatcher(unittest.TestCase):
+    """文字比對器測試類別"""
+    
+    def test_width_folding(self):
+        """測試全形半形視為相同"""
+        text = "型號：ＡＢＣ－１２３"
+        spans = TextMatcher("abc－123").find(text)
+        self.assertEqual(spans, [(3, 10)])
+    
+    def test_diacritic_folding(self):
+        """測試忽略重音符號"""
+        self.assertEqual(TextMatcher("cafe").find("Café au lait"), [(0, 4)])
+        options = SearchOptions(diacritic_sensitive=True)
+        self.assertEqual(TextMatcher("cafe", options).find("Café au lait"), [])
+    
+    def test_case_sensitive(self):
+        """測試區分大小寫"""
+        options = SearchOptions(case_sensitive=True)
+        self.assertEqual(TextMatcher("PDF", options).find("pdf PDF"), [(4, 7)])
+    
+    def test_regex(self):
+        """測試規則運算式"""
+        text = "零件 AB-1234 與 ab-99"
+        spans = TextMatcher(r"[a-z]{2}-\d{3,}", SearchOptions(regex=True)).find(text)
+        self.assertEqual([text[s:e] for s, e in spans], ["AB-1234"])
+    
+    def test_offsets_across_line_break(self):
+        """測試跨行比對的位置對應"""
+        text = "翻譯\n功能"
+        self.assertEqual(TextMatcher("譯功").find(text), [(1, 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+文字分段測試
+"""
+
+import unittest
+from src.segmenter import (
+    split_paragraphs, split_sentences, segment_text, reassemble, DocumentSegments,
+    split_long_text, pack_segments
+)
+
+
+PAGE = """Annual Report
+This is the first line of a long paragraph that
+continues here. It has two.
+Short line.
+
+本文件僅供參考。請勿轉載！
+12"""
+
+
+class TestSegmenter(unittest.TestCase):
+    """文字分段測試類別"""
+
+    def test_split_paragraphs(self):
+        """測試合併排版行並辨識標題與短行"""
+        paragraphs = split_paragraphs(PAGE)
+        self.assertEqual(paragraphs[0], "Annual Report")
+        self.assertTrue(paragraphs[1].startswith("This is the first line of a long paragraph that continues"))
+        self.assertEqual(paragraphs[2], "Short line.")
+        self.assertEqual(paragraphs[-1], "12")
+
+    def test_hyphenated_line_break(self):
+        """測試連字號斷字合併"""
+        self.assertEqual(split_paragraphs("a long line with a hyphen-\nated word."),
+                         ["a long line with a hyphenated word."])
+
+    def test_split_sentences(self):
+        """測試切分句子並保留縮寫"""
+        self.assertEqual(split_sentences("Dr. Smith left. He said e.g. this. 你好。再見！"),
+                         ["Dr. Smith left.", "He said e.g. this.", "你好。", "再見！"])
+
+    def test_reassemble_round_trip(self):
+        """測試沒有譯文時組合回原本的段落"""
+        segments = segment_text(PAGE)
+        text = reassemble(segments, {})
+        self.assertIn("It has two.\n\nShort line.", text)
+        self.assertIn("本文件僅供參考。請勿轉載！", text)
+
+    def test_document_deduplication(self):
+        """測試跨頁重複的句子只翻譯一次"""
+        footer = "\n\nConfidential. Do not distribute."
+        pages = ["First page text." + footer, "Second page text." + footer, footer]
+        document = DocumentSegments(pages)
+        unique = document.unique_segments()
+        self.assertEqual(len(unique), 4)
+        self.assertEqual(document.duplicate_count(), 4)
+
+        translations = {segment: segment.upper() for segment in unique}
+        self.assertTrue(document.page_ready(1, translations))
+        self.assertEqual(document.assemble(1, translations),
+                         "SECOND PAGE TEXT.\n\nCONFIDENTIAL. DO NOT DISTRIBUTE.")
+
+    def test_numbers_are_not_translated(self):
+        """測試頁碼等不含文字的片段不送出翻譯"""
+        document = DocumentSegments(["Hello world.\n\n12"])
+        self.assertEqual(document.unique_segments(), ["Hello world."])
+
+    def test_split_long_text_at_boundaries(self):
+        """測試長文字只在段落或句子邊界切開"""
+        text = "First sentence here. Second one follows.\n\nNew paragraph starts. And ends."
+        chunks = split_long_text(text, 45)
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(len(chunk) <= 45 for chunk in chunks))
+        self.assertEqual(chunks[0], "First sentence here. Second one follows.\n\n")
+        self.assertTrue(chunks[1].startswith("New paragraph"))
+
+    def test_split_long_word(self):
+        """測試單一詞彙超過上限時才切斷"""
+        chunks = split_long_text("aaaaaaaaaa bb", 4)
+        self.assertEqual("".join(chunks), "aaaaaaaaaa bb")
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+
+    def test_pack_segments(self):
+        """測試片段打包在上限內並保持順序"""
+        segments = ["aaaa", "bbb", "cc", "dddddddddd", "e"]
+        packs = pack_segments(segments, 9)
+        self.assertEqual(packs, [[0, 1], [2], [3], [4]])
+        self.assertEqual(pack_segments(["a", "b", "c"], 100), [[0, 1, 2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
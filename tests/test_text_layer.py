@@ -0,0 +1,48 @@
+"""
+文字層測試
+"""
+
+import unittest
+from src.search_index import TextMatcher
+from src.text_layer import PageTextLayer
+
+
+def _line(text, x, y):
+    """建立單行 rawdict 結構，每個字元寬 10"""
+    chars = [
+        {"c": c, "bbox": (x + i * 10, y, x + (i + 1) * 10, y + 12)}
+        for i, c in enumerate(text)
+    ]
+    return {"spans": [{"chars": chars}]}
+
+
+class TestPageTextLayer(unittest.TestCase):
+    """文字層測試類別"""
+    
+    def setUp(self):
+        """測試前置設定"""
+        raw = {"blocks": [
+            {"type": 0, "bbox": (0, 0, 100, 40),
+             "lines": [_line("Part AB", 0, 0), _line("-1234", 0, 20)]},
+            {"type": 1, "bbox": (0, 50, 100, 100)},
+        ]}
+        self.layer = PageTextLayer.from_rawdict(raw)
+    
+    def test_text(self):
+        """測試文字與區塊"""
+        self.assertEqual(self.layer.text, "Part AB\n-1234\n")
+        self.assertEqual(len(self.layer.blocks), 1)
+    
+    def test_rects_for_range_merges_lines(self):
+        """測試跨行範圍換算為每行一個矩形"""
+        start, end = TextMatcher("ab -12").find(self.layer.text)[0]
+        rects = self.layer.rects_for_range(start, end)
+        self.assertEqual(rects, [(50.0, 0.0, 70.0, 12.0), (0.0, 20.0, 30.0, 32.0)])
+    
+    def test_text_blocks(self):
+        """測試區塊文字與矩形"""
+        self.assertEqual(self.layer.text_blocks(), [("Part AB\n-1234", (0, 0, 100, 40))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+翻譯後端測試
+"""
+
+import threading
+import unittest
+from unittest import mock
+from src.translation_backends import (
+    MockTranslationServer, HttpBackend, GoogleBackend, OfflineBackend, BackendError,
+    BackendUnavailable, TransientBackendError, is_transient, run_benchmark
+)
+from src.rate_limiter import RetryPolicy
+from src.offline_engine import model_name_for, add_target_token, MarianBackend, MarianEngine
+
+
+class CharTokenizer:
+    """每個字元一個詞元（另加結尾詞元）的分詞器替身"""
+
+    def __call__(self, texts):
+        return {"input_ids": [list(text) + ["</s>"] for text in texts]}
+
+
+class TestTranslationBackends(unittest.TestCase):
+    """翻譯後端測試類別"""
+
+    def test_http_backend_batch(self):
+        """測試以單一請求翻譯多段文字"""
+        with MockTranslationServer(latency=0) as server:
+            backend = HttpBackend(server.url)
+            self.assertEqual(backend.translate_batch(["a", "b"], "en", "ja"), ["[ja] a", "[ja] b"])
+            self.assertEqual(backend.translate("c", "en", "ja"), "[ja] c")
+            self.assertEqual(server.request_count, 2)
+
+    def test_failures_are_transient(self):
+        """測試伺服器錯誤視為暫時性錯誤"""
+        with MockTranslationServer(latency=0, failure_rate=1.0) as server:
+            backend = HttpBackend(server.url)
+            with self.assertRaises(TransientBackendError) as context:
+                backend.translate("a", "en", "ja")
+            self.assertTrue(is_transient(context.exception))
+
+    def test_google_errors_are_classified(self):
+        """測試 Google 後端只把網路與伺服器錯誤視為暫時性錯誤"""
+        import requests
+        from deep_translator import GoogleTranslator
+        from deep_translator.exceptions import LanguageNotSupportedException, TooManyRequests
+
+        backend = GoogleBackend()
+        for error, transient in ((requests.ConnectionError("reset"), True),
+                                 (TooManyRequests(), True),
+                                 (LanguageNotSupportedException("xx"), False)):
+            with mock.patch.object(GoogleTranslator, "translate", side_effect=error):
+                with self.assertRaises(BackendError) as context:
+                    backend.translate("a", "en", "ja")
+            self.assertEqual(is_transient(context.exception), transient)
+        self.assertFalse(is_transient(TypeError("bug")))
+
+    def test_offline_backend(self):
+        """測試離線後端不重試"""
+        with self.assertRaises(BackendUnavailable) as context:
+            OfflineBackend().translate("a", "en", "ja")
+        self.assertFalse(is_transient(context.exception))
+
+    def test_benchmark_retries(self):
+        """測試效能測試在失敗時重試並完成所有請求"""
+        segments = [f"s{i}" for i in range(20)]
+        with MockTranslationServer(latency=0, failure_rate=0.3, seed=1) as server:
+            stats = run_benchmark(HttpBackend(server.url), segments, workers=4, batch_size=5,
+                                  policy=RetryPolicy(max_retries=10, base_delay=0.001))
+        self.assertEqual(stats["requests"], 4)
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(server.segment_count, 20)
+        self.assertEqual(stats["retries"], server.failure_count)
+
+    def test_offline_model_names(self):
+        """測試語言對應的離線模型名稱"""
+        self.assertEqual(model_name_for("en", "zh-TW"), "Helsinki-NLP/opus-mt-en-zh")
+        self.assertEqual(model_name_for("ja", "en"), "Helsinki-NLP/opus-mt-jap-en")
+        self.assertIsNone(model_name_for("ja", "ko"))
+        self.assertFalse(MarianBackend().supports("fr", "de"))
+
+    def test_offline_target_tokens(self):
+        """測試多目標模型的輸入加上目標語言標記"""
+        self.assertEqual(add_target_token(["Hello"], "zh-TW"), [">>cmn_Hant<< Hello"])
+        self.assertEqual(add_target_token(["Hello"], "zh-CN"), [">>cmn_Hans<< Hello"])
+        self.assertEqual(add_target_token(["Hello"], "ja"), ["Hello"])
+
+    def test_offline_backend_requires_downloaded_model(self):
+        """測試未下載的模型不視為可用"""
+        backend = MarianBackend()
+        with mock.patch("src.offline_engine.is_model_downloaded", return_value=False):
+            self.assertFalse(backend.supports("en", "zh-TW"))
+        with mock.patch("src.offline_engine.is_model_downloaded", return_value=True):
+            self.assertTrue(backend.supports("en", "zh-TW"))
+
+    def test_offline_input_is_never_truncated(self):
+        """測試超過詞元上限的片段切開翻譯，送入模型的輸入都不超過上限且沒有遺漏"""
+        engine = MarianEngine(max_length=20)
+        sent = []
+
+        def generate(tokenizer, model, model_lock, texts):
+            sent.extend(texts)
+            return [f"<{text}>" for text in texts]
+
+        long_text = "第一句很長的中文句子。第二句也很長的中文句子。\n第三句。" * 3
+        with mock.patch.object(engine, "_load", return_value=(CharTokenizer(), None, threading.Lock())), \
+                mock.patch.object(engine, "_generate", side_effect=generate):
+            results = engine.translate_batch([long_text, "短句。"], "zh-TW", "en")
+
+        self.assertTrue(all(len(text) + 1 <= 20 for text in sent))
+        self.assertEqual(results[1], "<短句。>")
+        self.assertEqual(results[0].replace("<", "").replace(">", ""), long_text)
+        self.assertLessEqual(MarianBackend.max_request_chars, 512)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+翻譯快取測試
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from src.translation_cache import TranslationCache, make_cache_key
+
+
+class TestTranslationCache(unittest.TestCase):
+    """翻譯快取測試類別"""
+    
+    def setUp(self):
+        """測試前置設定"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "cache.db")
+        self.cache = TranslationCache(self.db_path)
+    
+    def test_cache_key_is_stable(self):
+        """測試鍵值與行尾空白無關，且區分語言對"""
+        key = make_cache_key("Hello world", "en", "zh-TW")
+        self.assertEqual(key, make_cache_key("Hello world  \n", "en", "zh-TW"))
+        self.assertNotEqual(key, make_cache_key("Hello world", "en", "ja"))
+        self.assertTrue(key.startswith("en:zh-TW:"))
+    
+    def test_put_and_get(self):
+        """測試寫入與查詢"""
+        key = make_cache_key("Hello", "en", "zh-TW")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "Hello", "你好", "en", "zh-TW")
+        self.assertEqual(self.cache.get(key), "你好")
+        self.assertEqual(self.cache.count(), 1)
+    
+    def test_persists_across_instances(self):
+        """測試重新開啟後仍可命中"""
+        key = make_cache_key("Hello", "en", "zh-TW")
+        self.cache.put(key, "Hello", "你好", "en", "zh-TW")
+        self.cache.close()
+        
+        self.cache = TranslationCache(self.db_path)
+        self.assertEqual(self.cache.get(make_cache_key("Hello", "en", "zh-TW")), "你好")
+    
+    def test_batched_writes(self):
+        """測試累積寫入：未寫入前可查詢，關閉時寫入"""
+        self.cache.close()
+        self.cache = TranslationCache(self.db_path, batch_size=100, flush_interval=3600)
+        key = make_cache_key("Hello", "en", "zh-TW")
+        self.cache.put(key, "Hello", "你好", "en", "zh-TW")
+        self.assertEqual(self.cache.get(key), "你好")
+        self.assertEqual(len(self.cache._pending), 1)
+        self.cache.close()
+        
+        self.cache = TranslationCache(self.db_path)
+        self.assertEqual(self.cache.get(key), "你好")
+    
+    def test_lazy_open(self):
+        """測試建立時不開啟資料庫"""
+        cache = TranslationCache(os.path.join(self.temp_dir, "lazy.db"))
+        self.assertIsNone(cache.connection)
+        self.assertFalse(os.path.exists(cache.db_path))
+    
+    def test_compression_round_trip(self):
+        """測試長內容壓縮保存"""
+        source = "Long paragraph. " * 100
+        key = make_cache_key(source, "en", "zh-TW")
+        self.cache.put(key, source, "長段落。" * 100, "en", "zh-TW")
+        self.cache.flush()
+        row = self.cache.connection.execute(
+            "SELECT compressed FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        self.assertEqual(row[0], 1)
+        self.assertEqual(self.cache.get(key), "長段落。" * 100)
+    
+    def test_lru_eviction(self):
+        """測試超過上限時淘汰最久未使用的項目"""
+        self.cache.close()
+        self.cache = TranslationCache(self.db_path, batch_size=1, max_entries=10)
+        keys = [make_cache_key(f"text {i}", "en", "ja") for i in range(10)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, f"text {i}", f"テキスト {i}", "en", "ja")
+            # 固定使用時間，避免時鐘解析度造成順序不定
+            self.cache.connection.execute(
+                "UPDATE translations SET last_used = ? WHERE key = ?", (i, key)
+            )
+        self.cache.get(keys[0])  # 最早寫入但最近使用
+        self.cache.flush()
+        
+        extra = make_cache_key("text extra", "en", "ja")
+        self.cache.put(extra, "text extra", "テキスト", "en", "ja")
+        self.assertEqual(self.cache.count(), 9)
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(extra))
+    
+    def test_overwrites_do_not_grow_count(self):
+        """測試覆寫既有翻譯不增加估計筆數"""
+        self.cache.close()
+        self.cache = TranslationCache(self.db_path, batch_size=1, max_entries=5)
+        key = make_cache_key("Hello", "en", "ja")
+        for i in range(20):
+            self.cache.put(key, "Hello", f"こんにちは {i}", "en", "ja")
+        self.assertEqual(self.cache._estimated_count, 1)
+        self.assertEqual(self.cache.count(), 1)
+    
+    def test_contains_does_not_touch(self):
+        """測試成員檢查不記錄使用"""
+        key = make_cache_key("Hello", "en", "ja")
+        self.cache.put(key, "Hello", "こんにちは", "en", "ja")
+        self.cache.flush()
+        self.assertIn(key, self.cache)
+        self.assertNotIn(make_cache_key("Bye", "en", "ja"), self.cache)
+        self.assertEqual(self.cache._touches, {})
+    
+    def test_clear(self):
+        """測試清除"""
+        self.cache.put(make_cache_key("Hello", "en", "ja"), "Hello", "こんにちは", "en", "ja")
+        self.cache.clear()
+        self.assertEqual(self.cache.count(), 0)
+    
+    def tearDown(self):
+        """測試後清理"""
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+翻譯匯出測試
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import fitz
+from src.translation_export import TranslationExportWorker
+
+
+class FakeManager:
+    """翻譯管理器替身：譯文為「<原文>」，包含 fail 的請求失敗"""
+
+    max_request_chars = 4500
+    max_concurrency = 2
+
+    def __init__(self, cached=None, on_translate=None):
+        self.cached = cached or {}
+        self.on_translate = on_translate
+        self.requests = []
+
+    def get_cached(self, text, from_code, to_code):
+        return self.cached.get(text)
+
+    def bind_cancel_event(self, cancel_event):
+        pass
+
+    def translate_packed(self, segments, from_code, to_code, raise_errors=False):
+        self.requests.append(list(segments))
+        if self.on_translate:
+            self.on_translate()
+        if any("fail" in segment for segment in segments):
+            raise RuntimeError("請求失敗")
+        return [f"<{segment}>" for segment in segments]
+
+    def flush_cache(self):
+        pass
+
+
+class TestTranslationExport(unittest.TestCase):
+    """翻譯匯出測試類別"""
+
+    def setUp(self):
+        """測試前置設定：兩頁各一個文字區塊的文件"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.pdf_path = os.path.join(self.temp_dir, "source.pdf")
+        self.output_path = os.path.join(self.temp_dir, "translated.pdf")
+        document = fitz.open()
+        for text in ("Hello there.", "Second page."):
+            document.new_page().insert_text((72, 72), text)
+        document.save(self.pdf_path)
+        document.close()
+
+    def make_worker(self, manager, file_path=None):
+        """建立匯出執行緒並記錄完成與錯誤信號"""
+        worker = TranslationExportWorker(file_path or self.pdf_path, self.output_path,
+                                         "en", "de", manager)
+        self.completed = []
+        self.errors = []
+        worker.export_completed.connect(lambda *args: self.completed.append(args))
+        worker.error_occurred.connect(self.errors.append)
+        return worker
+
+    def test_translate_page(self):
+        """測試快取的句子不送出，失敗的請求保留原文並計數"""
+        manager = FakeManager(cached={"Cached one.": "[cached]"})
+        worker = self.make_worker(manager)
+        blocks = [("Cached one. Fresh one.", (0, 0, 100, 20)), ("Please fail.", (0, 30, 100, 50))]
+        manager.max_request_chars = 15  # 每個句子各自一個請求
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = worker._translate_page(executor, blocks)
+
+        self.assertEqual(result, [((0, 0, 100, 20), "[cached] <Fresh one.>"),
+                                  ((0, 30, 100, 50), "Please fail.")])
+        self.assertNotIn(["Cached one."], manager.requests)
+        self.assertEqual(worker.failed, 1)
+
+    def test_export(self):
+        """測試匯出的每頁文字替換為譯文"""
+        worker = self.make_worker(FakeManager())
+        worker.run()
+
+        self.assertEqual(self.errors, [])
+        self.assertEqual(self.completed, [(self.output_path, 0, 0)])
+        with fitz.open(self.output_path) as document:
+            self.assertIn("<Hello there.>", document[0].get_text())
+            self.assertNotIn("Hello there.\n", document[0].get_text().replace("<Hello there.>", ""))
+            self.assertIn("<Second page.>", document[1].get_text())
+
+    def test_cancel_does_not_write(self):
+        """測試取消後不寫出檔案也不回報錯誤"""
+        holder = {}
+        worker = self.make_worker(FakeManager(on_translate=lambda: holder["worker"].cancel()))
+        holder["worker"] = worker
+        worker.run()
+
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertEqual(self.completed, [])
+        self.assertEqual(self.errors, [])
+
+    def test_open_error(self):
+        """測試來源無法開啟時回報錯誤"""
+        worker = self.make_worker(FakeManager(), os.path.join(self.temp_dir, "missing.pdf"))
+        worker.run()
+
+        self.assertEqual(len(self.errors), 1)
+        self.assertEqual(self.completed, [])
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def test_overflow_is_written_and_counted(self):
+        """測試最小字級仍放不下的譯文仍寫入並計數"""
+        worker = self.make_worker(FakeManager())
+        with fitz.open() as document:
+            page = document.new_page()
+            worker._write_page(page, [((72, 72, 90, 78), "long translation " * 40)])
+            self.assertIn("long", page.get_text())
+        self.assertEqual(worker.overflowed, 1)
+
+    def test_overflow_stops_at_next_block(self):
+        """測試放不下的譯文不會延伸到下方區塊"""
+        worker = self.make_worker(FakeManager())
+        with fitz.open() as document:
+            page = document.new_page()
+            worker._write_page(page, [((72, 72, 200, 80), "long translation " * 150),
+                                      ((72, 200, 200, 220), "Next block.")])
+            words = page.get_text("words")
+            self.assertTrue(any(word[4] == "long" for word in words))
+            self.assertTrue(all(word[3] <= 200 for word in words if word[4] == "long"))
+            self.assertIn("Next block.", page.get_text())
+        self.assertEqual(worker.overflowed, 1)
+
+    def test_redaction_keeps_graphics(self):
+        """測試移除原文時保留底色與區塊內的向量圖形"""
+        worker = self.make_worker(FakeManager())
+        with fitz.open() as document:
+            page = document.new_page()
+            page.draw_rect(fitz.Rect(60, 50, 300, 100), color=None, fill=(0.8, 0.9, 1))
+            page.draw_line((72, 80), (250, 80))
+            page.insert_text((72, 72), "Shaded text.")
+            before = len(page.get_drawings())
+            worker._write_page(page, [((60, 50, 300, 100), "Translated.")])
+            self.assertEqual(len(page.get_drawings()), before)
+            self.assertNotIn("Shaded text.", page.get_text())
+            self.assertNotEqual(page.get_pixmap(clip=fitz.Rect(280, 90, 290, 98)).pixel(0, 0), (255, 255, 255))
+
+    def tearDown(self):
+        """測試後清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
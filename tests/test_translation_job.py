@@ -0,0 +1,51 @@
+"""
+翻譯工作紀錄測試
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from src.translation_job import TranslationJobStore, make_job_id, STATUS_PAUSED
+
+
+class TestTranslationJob(unittest.TestCase):
+    """翻譯工作紀錄測試類別"""
+
+    def setUp(self):
+        """測試前置設定"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "jobs.db")
+        self.pdf_path = os.path.join(self.temp_dir, "doc.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4")
+
+    def test_job_id_depends_on_languages(self):
+        """測試工作編號區分語言對"""
+        self.assertEqual(make_job_id(self.pdf_path, "en", "ja"), make_job_id(self.pdf_path, "en", "ja"))
+        self.assertNotEqual(make_job_id(self.pdf_path, "en", "ja"), make_job_id(self.pdf_path, "en", "ko"))
+
+    def test_resume_after_restart(self):
+        """測試重新開啟後繼續已完成的句子"""
+        job_id = make_job_id(self.pdf_path, "en", "ja")
+        store = TranslationJobStore(self.db_path)
+        self.assertEqual(store.start(job_id, self.pdf_path, "en", "ja", 3), {})
+        store.record(job_id, [("One.", "一。"), ("Two.", "二。")])
+        store.set_status(job_id, STATUS_PAUSED)
+        store.close()
+
+        store = TranslationJobStore(self.db_path)
+        self.assertEqual(store.progress(job_id), (STATUS_PAUSED, 2, 3))
+        self.assertEqual(store.start(job_id, self.pdf_path, "en", "ja", 3), {"One.": "一。", "Two.": "二。"})
+        store.finish(job_id)
+        self.assertIsNone(store.progress(job_id))
+        self.assertEqual(store.unfinished_jobs(), [])
+        store.close()
+
+    def tearDown(self):
+        """測試後清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
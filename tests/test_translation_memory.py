@@ -0,0 +1,100 @@
+"""
+翻譯記憶測試
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from src.translation_memory import TranslationMemory, make_template, fill_translation
+
+
+class TestTranslationMemory(unittest.TestCase):
+    """翻譯記憶測試類別"""
+
+    def setUp(self):
+        """測試前置設定"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.memory = TranslationMemory(os.path.join(self.temp_dir, "memory.db"), threshold=0.6)
+
+    def tearDown(self):
+        """測試後清理"""
+        self.memory.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_make_template(self):
+        """測試數字與日期替換為佔位符"""
+        template, values = make_template("Released on 2024-01-31,  version 3.2 fixes 12 bugs.")
+        self.assertEqual(values, ["2024-01-31", "3.2", "12"])
+        self.assertEqual(template, make_template("Released on 2025-06-01, version 4.0 fixes 7 bugs.")[0])
+
+    def test_fill_translation(self):
+        """測試替換譯文中的數值"""
+        self.assertEqual(fill_translation("第 3 節參見第 4 節", ["3", "4"], ["4", "4"]), "第 4 節參見第 4 節")
+        self.assertIsNone(fill_translation("3 和 3", ["3"], ["5"]))
+        self.assertIsNone(fill_translation("二〇二四年", ["2024"], ["2025"]))
+
+    def test_lookup_applies_new_values(self):
+        """測試只差在數字的句子直接套用"""
+        self.memory.add("See section 3 on page 12.", "請參閱第 12 頁的第 3 節。", "en", "zh-TW")
+        self.assertEqual(self.memory.lookup("See section 5 on page 40.", "en", "zh-TW"),
+                         "請參閱第 40 頁的第 5 節。")
+        self.assertIsNone(self.memory.lookup("See section 5 on page 40.", "en", "ja"))
+        self.assertIsNone(self.memory.lookup("See chapter 5 on page 40.", "en", "zh-TW"))
+
+    def test_suggest_similar(self):
+        """測試相似句子的參考翻譯（寫入資料庫後仍可查詢）"""
+        self.memory.add("The device must be switched off before cleaning.", "清潔前必須關閉裝置。", "en", "zh-TW")
+        self.memory.flush()
+        suggestions = self.memory.suggest("The device must be switched off before servicing.", "en", "zh-TW")
+        self.assertEqual(len(suggestions), 1)
+        self.assertEqual(suggestions[0][2], "清潔前必須關閉裝置。")
+        self.assertEqual(self.memory.suggest("Completely unrelated text here.", "en", "zh-TW"), [])
+
+    def test_lookup_ignores_whitespace(self):
+        """測試只差在空白的句子直接套用"""
+        self.memory.add("Press  the red button.", "按下紅色按鈕。", "en", "zh-TW")
+        self.assertEqual(self.memory.lookup("Press the red\nbutton. ", "en", "zh-TW"), "按下紅色按鈕。")
+
+    def test_recall_does_not_apply_inserted_negation(self):
+        """測試長句插入否定詞時不直接套用（相似句子預設只作為參考）"""
+        source = ("Before cleaning or replacing the filter, the operator shall ensure that the "
+                  "device has been switched off, disconnected from the mains supply and allowed "
+                  "to cool down completely, and that all moving parts have come to a full stop, "
+                  "as described in the maintenance section of this manual and on the label.")
+        self.memory.add(source, "清潔或更換濾網前，操作人員應確認裝置已關閉。", "en", "zh-TW")
+        for negated in (source.replace("switched off", "switched on"),
+                        source.replace("shall ensure", "shall not ensure"),
+                        source.replace("has been switched", "has not been switched")):
+            self.assertIsNone(self.memory.recall(negated, "en", "zh-TW"))
+            self.assertEqual(len(self.memory.suggest(negated, "en", "zh-TW")), 1)
+
+    def test_recall_similar_when_enabled(self):
+        """測試設定 auto_threshold 時才套用相似度很高的句子"""
+        memory = TranslationMemory(os.path.join(self.temp_dir, "auto.db"), auto_threshold=0.95)
+        source = "Before cleaning the filter, always make sure that the device is switched off and unplugged."
+        memory.add(source, "清潔濾網前，務必確認裝置已關閉並拔除插頭。", "en", "zh-TW")
+        self.assertEqual(memory.recall(source[:-1] + "!", "en", "zh-TW"),
+                         "清潔濾網前，務必確認裝置已關閉並拔除插頭。")
+        self.assertIsNone(memory.recall(source.replace("always", "never"), "en", "zh-TW"))
+        memory.close()
+
+    def test_max_entries(self):
+        """測試超過筆數上限時淘汰最舊的翻譯與其索引"""
+        memory = TranslationMemory(os.path.join(self.temp_dir, "small.db"), batch_size=5, max_entries=10)
+        for i in range(30):
+            memory.add(f"Sentence {'x' * i} here.", f"句子 {i}", "en", "ja")
+        memory.flush()
+        connection = memory._connect()
+        count = connection.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+        orphans = connection.execute(
+            "SELECT COUNT(*) FROM memory_bands WHERE key NOT IN (SELECT key FROM memory)"
+        ).fetchone()[0]
+        self.assertLessEqual(count, 10)
+        self.assertEqual(orphans, 0)
+        self.assertIsNotNone(memory.lookup(f"Sentence {'x' * 29} here.", "en", "ja"))
+        memory.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+翻譯統計測試
+"""
+
+import unittest
+from src.translation_metrics import LatencyHistogram, TranslationMetrics
+
+
+class TestTranslationMetrics(unittest.TestCase):
+    """翻譯統計測試類別"""
+
+    def test_percentiles(self):
+        """測試百分位數的估計誤差在區間比例內"""
+        histogram = LatencyHistogram(factor=1.2)
+        for ms in range(1, 101):
+            histogram.record(ms / 1000)
+        self.assertAlmostEqual(histogram.mean(), 0.0505)
+        for p, expected in ((50, 0.050), (90, 0.090), (99, 0.099)):
+            estimate = histogram.percentile(p)
+            self.assertGreaterEqual(estimate, expected)
+            self.assertLessEqual(estimate, expected * 1.2)
+        self.assertEqual(histogram.percentile(100), 0.1)
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+    def test_counters(self):
+        """測試快取命中率與各後端的請求統計"""
+        metrics = TranslationMetrics()
+        metrics.record_lookup(True)
+        metrics.record_lookup(True, from_memory=True)
+        metrics.record_lookup(False, from_memory=True)
+        metrics.record_lookup(False)
+        metrics.record_request("http", 100, 0.2)
+        metrics.record_request("http", 50, 1.0, ok=False)
+        metrics.record_retry()
+
+        data = metrics.snapshot()
+        self.assertEqual(data["hit_ratio"], 0.5)
+        self.assertEqual(data["memory_hits"], 1)
+        self.assertEqual(data["requests"], 2)
+        self.assertEqual(data["characters"], 100)
+        self.assertEqual(data["retries"], 1)
+        self.assertEqual(data["backends"]["http"]["errors"], 1)
+        self.assertIn("快取命中 50%", metrics.summary())
+
+        metrics.reset()
+        self.assertIsNone(metrics.hit_ratio())
+        self.assertEqual(metrics.summary(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+翻譯疊加測試
+"""
+
+import unittest
+from src.translation_overlay import (
+    TranslationOverlayCache, visible_blocks, block_segments, assemble_block
+)
+
+
+class TestTranslationOverlay(unittest.TestCase):
+    """翻譯疊加測試類別"""
+
+    def test_visible_blocks(self):
+        """測試只選擇可見且有文字的區塊"""
+        blocks = [
+            ("Title", (0, 0, 100, 20)),
+            ("   ", (0, 30, 100, 50)),
+            ("Body text.", (0, 300, 100, 400)),
+        ]
+        self.assertEqual(visible_blocks(blocks, (0, 0, 200, 100)), [0])
+        self.assertEqual(visible_blocks(blocks, (0, 0, 200, 100), margin=250), [0, 2])
+        self.assertEqual(visible_blocks(blocks, None), [0, 2])
+
+    def test_block_segments_shared(self):
+        """測試區塊之間重複的句子只翻譯一次"""
+        segmented, unique = block_segments(["Hello world. Page 1", "Hello world."])
+        self.assertEqual(unique, ["Hello world.", "Page 1"])
+        translations = {"Hello world.": "你好。", "Page 1": "第 1 頁"}
+        self.assertEqual(assemble_block(segmented[0], translations), "你好。 第 1 頁")
+        self.assertEqual(assemble_block(segmented[1], translations), "你好。")
+
+    def test_cache_per_language_pair(self):
+        """測試快取依頁碼與語言對區分，並只保留最近的頁面"""
+        cache = TranslationOverlayCache(max_pages=2)
+        cache.put(0, "en", "ja", {0: "a"})
+        self.assertEqual(cache.get(0, "en", "ja"), {0: "a"})
+        self.assertEqual(cache.get(0, "en", "ko"), {})
+        self.assertEqual(cache.missing(0, "en", "ja", [0, 1]), [1])
+
+        cache.put(1, "en", "ja", {0: "b"})
+        cache.get(0, "en", "ja")
+        cache.put(2, "en", "ja", {0: "c"})
+        self.assertEqual(cache.get(1, "en", "ja"), {})
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+翻譯快取包測試
+"""
+
+import os
+import shutil
+import gzip
+import tempfile
+import unittest
+from src.translation_cache import TranslationCache, make_cache_key
+from src.translation_pack import write_pack, read_pack, document_fingerprint
+
+
+class TestTranslationPack(unittest.TestCase):
+    """翻譯快取包測試類別"""
+
+    def setUp(self):
+        """測試前置設定"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.pack_path = os.path.join(self.temp_dir, "manual.tpack.gz")
+
+    def test_round_trip(self):
+        """測試寫入後逐筆讀回"""
+        entries = [("en", "zh-TW", "Hello", "你好"), ("en", "zh-TW", "Bye", "再見")]
+        count = write_pack(self.pack_path, iter(entries), {"document": "manual.pdf"})
+        header, read = read_pack(self.pack_path)
+        self.assertEqual(count, 2)
+        self.assertEqual(header["document"], "manual.pdf")
+        self.assertEqual(list(read), entries)
+        self.assertFalse(os.path.exists(self.pack_path + ".part"))
+
+    def test_merge_keeps_local_translations(self):
+        """測試合併時去除重複，本機已有的翻譯不被覆寫"""
+        cache = TranslationCache(os.path.join(self.temp_dir, "cache.db"))
+        cache.put(make_cache_key("Hello", "en", "zh-TW"), "Hello", "哈囉", "en", "zh-TW")
+        write_pack(self.pack_path, [
+            ("en", "zh-TW", "Hello", "你好"),
+            ("en", "zh-TW", "Bye", "再見"),
+            ("en", "zh-TW", "Bye", "再見"),
+        ])
+
+        _, entries = read_pack(self.pack_path)
+        self.assertEqual(cache.merge(entries, batch_size=2), 1)
+        self.assertEqual(cache.get(make_cache_key("Hello", "en", "zh-TW")), "哈囉")
+        self.assertEqual(cache.get(make_cache_key("Bye  ", "en", "zh-TW")), "再見")
+        self.assertEqual(cache.count(), 2)
+        cache.close()
+
+    def test_invalid_pack(self):
+        """測試非快取包的檔案"""
+        with gzip.open(self.pack_path, "wt", encoding="utf-8") as stream:
+            stream.write('{"format": "other"}\n')
+        with self.assertRaises(ValueError):
+            read_pack(self.pack_path)
+
+    def test_truncated_pack(self):
+        """測試不完整的快取包在讀取時拋出 ValueError"""
+        entries = [("en", "ja", f"Sentence {i}", f"文 {i}") for i in range(2000)]
+        write_pack(self.pack_path, entries)
+        with open(self.pack_path, "rb") as f:
+            data = f.read()
+        with open(self.pack_path, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        _, read = read_pack(self.pack_path)
+        with self.assertRaises(ValueError):
+            list(read)
+
+    def test_non_string_fields(self):
+        """測試欄位不是字串的翻譯視為格式錯誤"""
+        with gzip.open(self.pack_path, "wt", encoding="utf-8") as stream:
+            stream.write('{"format": "pdfreader-translation-pack", "version": 1}\n')
+            stream.write('{"source_lang": "en", "target_lang": "ja", "source": 5, "translation": "五"}\n')
+        _, read = read_pack(self.pack_path)
+        with self.assertRaises(ValueError):
+            list(read)
+
+    def test_fingerprint_ignores_path(self):
+        """測試指紋只取決於檔案內容"""
+        first = os.path.join(self.temp_dir, "a.pdf")
+        second = os.path.join(self.temp_dir, "b.pdf")
+        for path in (first, second):
+            with open(path, "wb") as f:
+                f.write(b"%PDF-1.4 same")
+        self.assertEqual(document_fingerprint(first), document_fingerprint(second))
+
+    def tearDown(self):
+        """測試後清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
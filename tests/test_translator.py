@@ -0,0 +1,132 @@
+"""
+翻譯管理器測試
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from src.translator import TranslationManager
+from src.translation_backends import TranslationBackend, BackendError
+
+
+class BlockingBackend(TranslationBackend):
+    """第一次請求等到 release 設定後才返回；fail 為 True 時請求失敗"""
+
+    name = "blocking"
+
+    def __init__(self, fail: bool = True):
+        self.fail = fail
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def translate(self, text: str, from_code: str, to_code: str) -> str:
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.fail:
+            raise BackendError("無法翻譯")
+        return f"<{text}>"
+
+
+class EchoBackend(TranslationBackend):
+    """立即返回「<原文>」"""
+
+    name = "echo"
+
+    def translate(self, text: str, from_code: str, to_code: str) -> str:
+        return f"<{text}>"
+
+
+class TestTranslationManager(unittest.TestCase):
+    """翻譯管理器測試類別"""
+
+    def setUp(self):
+        """測試前置設定"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.backend = BlockingBackend()
+        self.manager = TranslationManager(
+            cache_path=os.path.join(self.temp_dir, "cache.db"),
+            memory_path=os.path.join(self.temp_dir, "memory.db"),
+            job_path=os.path.join(self.temp_dir, "jobs.db"),
+            backend=self.backend,
+        )
+
+    def test_coalesced_failure_is_not_shared_as_translation(self):
+        """測試共用請求失敗時，等待者收到例外而非錯誤訊息"""
+        results = {}
+
+        def owner():
+            results["owner"] = self.manager.translate("Hello world", "en", "ja")
+
+        def waiter():
+            try:
+                results["waiter"] = self.manager.translate_packed(
+                    ["Hello world"], "en", "ja", raise_errors=True
+                )
+            except BackendError as e:
+                results["waiter"] = e
+
+        first = threading.Thread(target=owner)
+        first.start()
+        self.assertTrue(self.backend.started.wait(5))
+        second = threading.Thread(target=waiter)
+        second.start()
+        time.sleep(0.2)  # 等第二個執行緒開始等待進行中的請求
+        self.backend.release.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertTrue(results["owner"].startswith("[翻譯失敗"))
+        self.assertIsInstance(results["waiter"], BackendError)
+        self.assertEqual(self.backend.calls, 1)
+        self.assertIsNone(self.manager.get_cached("Hello world", "en", "ja"))
+
+        # 失敗沒有寫入快取，之後可以重新翻譯
+        self.backend.fail = False
+        self.assertEqual(self.manager.translate("Hello world", "en", "ja"), "<Hello world>")
+
+    def test_prefetch_with_low_rate_limit(self):
+        """測試每秒請求數低於保留令牌數時仍可預先翻譯"""
+        manager = TranslationManager(
+            cache_path=os.path.join(self.temp_dir, "low.db"),
+            memory_path=os.path.join(self.temp_dir, "low_memory.db"),
+            job_path=os.path.join(self.temp_dir, "low_jobs.db"),
+            backend=EchoBackend(), requests_per_second=1,
+        )
+        try:
+            self.assertEqual(manager.prefetch_reserve(), 0.0)
+            manager.prefetch(["Page one."], "en", "ja")
+            deadline = time.monotonic() + 5
+            while manager.get_cached("Page one.", "en", "ja") is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(manager.get_cached("Page one.", "en", "ja"), "<Page one.>")
+        finally:
+            manager.close()
+
+    def test_similar_memory_match_is_not_cached(self):
+        """測試相似句子的翻譯不寫入快取，樣板完全相同者才寫入"""
+        self.manager.translation_memory.add("Page 3 of the manual is switched off.", "手冊第 3 頁已關閉。",
+                                            "en", "ja")
+        self.manager.translation_memory.auto_threshold = 0.5
+        self.assertEqual(self.manager.get_cached("Page 3 of the manual is switched on.", "en", "ja"),
+                         "手冊第 3 頁已關閉。")
+        self.assertNotIn(self.manager._get_cache_key("Page 3 of the manual is switched on.", "en", "ja"),
+                         self.manager.translation_cache)
+
+        self.assertEqual(self.manager.get_cached("Page 7 of the manual is switched off.", "en", "ja"),
+                         "手冊第 7 頁已關閉。")
+        self.assertIn(self.manager._get_cache_key("Page 7 of the manual is switched off.", "en", "ja"),
+                      self.manager.translation_cache)
+
+    def tearDown(self):
+        """測試後清理"""
+        self.manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()